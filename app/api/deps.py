@@ -1,24 +1,28 @@
-from typing import Optional, List 
-from fastapi import Depends, HTTPException, status, Header
-import re
+from typing import Dict, Optional, List, Type
+from fastapi import Depends, HTTPException, status, Query, Request
+from pydantic import BaseModel
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 import redis
+import redis.asyncio as aioredis
 
+from app.core.audit import AuditActor
 from app.core.security import verify_token
-from app.db.session import get_db
+from app.db.session import get_db, validate_tenant_schema  # noqa: F401
 from app.core.config import settings
+from app.core.redis_client import redis_manager
+from app.core.tracing import set_span_attributes, traced
+from app.core.versioning import compute_etag, etag_matches, version_store
 from app.services.user_role import UserRoleService
 
 # Optional: Redis dependency
 def get_redis() -> Optional[redis.Redis]:
-    """Get Redis connection (optional)"""
-    try:
-        if settings.REDIS_URL:
-            return redis.from_url(settings.REDIS_URL, decode_responses=True)
-    except ImportError:
-        return None
-    return None
+    """Shared Redis client, or None when not configured or the circuit is open"""
+    return redis_manager.client() if redis_manager.available else None
+
+def get_async_redis() -> Optional[aioredis.Redis]:
+    """Shared asyncio Redis client, or None when not configured or the circuit is open"""
+    return redis_manager.async_client() if redis_manager.available else None
 
 # JWT Bearer token
 security = HTTPBearer(auto_error=False)
@@ -36,14 +40,29 @@ def get_current_user(
     if not payload:
         return None
     
+    set_span_attributes({"enduser.id": payload.get("sub")})
+    
     # Return user info dari token
     return {
         "user_id": payload.get("sub"),
         "username": payload.get("username"),
         "email": payload.get("email"),
         "status": payload.get("status"),
+        "expires_at": payload.get("exp"),
     }
 
+def client_ip(request: Request) -> str:
+    """Client address (jalankan uvicorn dengan --proxy-headers di belakang proxy)"""
+    return request.client.host if request.client else "unknown"
+
+def audit_actor(
+    request: Request,
+    current_user: Optional[dict] = Depends(get_current_user)
+) -> AuditActor:
+    """The authenticated caller and client address, for audit events"""
+    user_id = current_user.get("user_id") if current_user else None
+    return AuditActor(user_id=int(user_id) if user_id else None, ip=client_ip(request))
+
 def require_auth(
     current_user: Optional[dict] = Depends(get_current_user)
 ) -> dict:
@@ -60,6 +79,7 @@ class PermissionChecker:
     def __init__(self, required_permission: str):
         self.required_permission = required_permission
     
+    @traced("PermissionChecker")
     def __call__(
         self,
         db: Session = Depends(get_db),
@@ -73,7 +93,7 @@ class PermissionChecker:
             )
         
         user_role_service = UserRoleService()
-        user_permissions = user_role_service.get_user_permissions(db, int(user_id))
+        user_permissions = user_role_service.get_cached_user_permissions(db, int(user_id))
         
         # Super admin check
         if "*" in user_permissions:
@@ -85,16 +105,8 @@ class PermissionChecker:
                 detail=f"Not enough permissions. Requires: {self.required_permission}"
             )
         
-def validate_tenant_schema(schema_name: str = Header(None, alias="X-Tenant-Schema")):
-    """Validate tenant schema name"""
-    if schema_name and not re.match(r'^[a-zA-Z][a-zA-Z0-9_]{0,62}$', schema_name):
-        raise HTTPException(
-            status_code=400,
-            detail="Invalid schema name format. Must start with letter, contain only alphanumeric characters and underscores, and be 63 characters or less"
-        )
-    return schema_name or settings.DEFAULT_SCHEMA
-
 def require_app_access(app_code: str):
+    @traced("require_app_access")
     def _require_app_access(
         db: Session = Depends(get_db),
         current_user: dict = Depends(require_auth)
@@ -107,7 +119,7 @@ def require_app_access(app_code: str):
             )
 
         user_role_service = UserRoleService()
-        user_roles = user_role_service.get_user_roles(db, int(user_id))
+        user_roles = user_role_service.get_cached_user_roles(db, int(user_id))
 
         if any(role.app_code == settings.APP_NAME and role.role_code == "SUPER_ADMIN" for role in user_roles):
             return
@@ -123,6 +135,7 @@ def require_role_level(allowed_levels: List[int]):
     """
     Dependency to check if the user has one of the allowed role levels for the current app.
     """
+    @traced("require_role_level")
     def _require_role_level(
         db: Session = Depends(get_db),
         current_user: dict = Depends(require_auth)
@@ -134,7 +147,7 @@ def require_role_level(allowed_levels: List[int]):
                 detail="Could not validate credentials for permission check"
             )
         user_role_service = UserRoleService()
-        user_roles = user_role_service.get_user_roles(db, int(user_id))
+        user_roles = user_role_service.get_cached_user_roles(db, int(user_id))
 
         # Cek apakah ada peran dalam aplikasi saat ini (ATLAS) yang levelnya diizinkan
         has_access = any(
@@ -154,4 +167,89 @@ def require_role_level(allowed_levels: List[int]):
                 detail=f"Forbidden. Required role level: {', '.join(map(str, allowed_levels))}"
             )
             
-    return _require_role_level
\ No newline at end of file
+    return _require_role_level
+
+class ConditionalGet:
+    """
+    Conditional GET dependency. Combines the version counters named by
+    ``key_templates`` into an ETag and answers ``304 Not Modified`` when
+    ``If-None-Match`` matches, before a database session is opened.
+
+    Templates may reference path parameters (``"e:roles:{role_id}"``) and,
+    with ``per_user=True``, the authenticated ``{user_id}``. Returns the ETag
+    to send with the full response, or None when versions are unavailable.
+    """
+    def __init__(self, *key_templates: str, per_user: bool = False):
+        self.key_templates = key_templates
+        self.per_user = per_user
+    
+    def __call__(
+        self,
+        request: Request,
+        tenant_schema: str = Depends(validate_tenant_schema),
+        current_user: Optional[dict] = Depends(get_current_user)
+    ) -> Optional[str]:
+        params = {
+            # "05" dan "5" harus menghasilkan kunci yang sama
+            key: str(int(value)) if value.isdigit() else value
+            for key, value in request.path_params.items()
+        }
+        scope = f"{request.url.path}?{request.url.query}"
+        if self.per_user:
+            # Tanpa user biarkan endpoint yang menolak request (401)
+            if not current_user or not current_user.get("user_id"):
+                return None
+            params["user_id"] = str(current_user["user_id"])
+            scope = f"{scope}|{params['user_id']}"
+        
+        try:
+            keys = [template.format(**params) for template in self.key_templates]
+        except (KeyError, ValueError):
+            return None
+        
+        versions = version_store.get_many(tenant_schema, keys)
+        if versions is None:
+            return None
+        
+        etag = compute_etag(tenant_schema, scope, versions)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers=cache_headers(etag)
+            )
+        return etag
+
+def cache_headers(etag: Optional[str]) -> Optional[Dict[str, str]]:
+    """Validator headers for a response produced under ConditionalGet"""
+    if not etag:
+        return None
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+def sparse_fields(schema: Type[BaseModel], primary_key: str):
+    """
+    Dependency parsing a ``fields=a,b,c`` sparse fieldset for list endpoints.
+    Only fields of ``schema`` are accepted; the primary key is always included.
+    """
+    allowed = list(schema.model_fields)
+
+    def _sparse_fields(
+        fields: Optional[str] = Query(
+            None, description=f"Comma-separated subset of: {', '.join(allowed)}"
+        )
+    ) -> Optional[List[str]]:
+        if not fields:
+            return None
+
+        requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+        unknown = [f for f in requested if f not in allowed]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}"
+            )
+
+        if primary_key not in requested:
+            requested.insert(0, primary_key)
+        return requested
+
+    return _sparse_fields
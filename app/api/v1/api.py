@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends
 from app.api.deps import require_app_access, require_role_level 
 from app.core.config import settings
 
-from app.api.v1.endpoints import health, auth, users, applications, roles, tenants
+from app.api.v1.endpoints import health, auth, users, applications, roles, tenants, audit, changes, policy
 
 api_router = APIRouter()
 
@@ -43,4 +43,23 @@ api_router.include_router(
     prefix="/roles", 
     tags=["roles"], 
     dependencies=[Depends(require_atlas_access), Depends(require_admin_level)]
-)
\ No newline at end of file
+)
+api_router.include_router(
+    audit.router, 
+    prefix="/audit", 
+    tags=["audit"], 
+    dependencies=[Depends(require_atlas_access), Depends(require_admin_level)]
+)
+# Konsumen downstream (service account) cukup punya permission changes:read
+api_router.include_router(
+    changes.router, 
+    prefix="/changes", 
+    tags=["changes"], 
+    dependencies=[Depends(require_atlas_access)]
+)
+api_router.include_router(
+    policy.router, 
+    prefix="/policy", 
+    tags=["policy"], 
+    dependencies=[Depends(require_atlas_access)]
+)
@@ -1,7 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from typing import Optional, List
 
 from app.db.session import get_db
+from app.api.deps import ConditionalGet, cache_headers, sparse_fields
+from app.core.responses import sparse_page_response, page_response, data_response
 from app.services.application import ApplicationService
 from app.schemas.application import (
     Application,
@@ -18,37 +21,48 @@ application_service = ApplicationService()
 def get_applications(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[List[str]] = Depends(sparse_fields(Application, "app_id")),
+    etag: Optional[str] = Depends(ConditionalGet("c:applications")),
     db: Session = Depends(get_db),
     # current_user: dict = Depends(require_auth)  # Uncomment untuk require auth
 ):
     """Get list of applications with pagination"""
-    applications = application_service.get_applications(db, skip=skip, limit=limit)
     total = application_service.get_total_applications(db)
+    if fields:
+        rows = application_service.get_applications_fields(db, fields, skip=skip, limit=limit)
+        return sparse_page_response(
+            "Applications retrieved successfully", rows, total, skip, limit, headers=cache_headers(etag)
+        )
+
+    applications = application_service.get_applications(db, skip=skip, limit=limit)
     
-    return PaginationResponse(
-        success=True,
-        message="Applications retrieved successfully",
-        data=applications,
-        total=total,
-        page=skip // limit + 1,
-        size=limit,
-        pages=(total + limit - 1) // limit
+    return page_response(
+        Application, "Applications retrieved successfully", applications, total, skip, limit,
+        headers=cache_headers(etag)
     )
 
 @router.get("/{app_id}", response_model=DataResponse[ApplicationWithRoles])
 def get_application(
     app_id: int,
+    include: str = Query(
+        "users", pattern="^(users|count)$",
+        description="'users' (default) embeds the first page of users per role, 'count' only the member counts"
+    ),
+    users_limit: int = Query(100, ge=1, le=1000),
+    etag: Optional[str] = Depends(
+        ConditionalGet("c:applications", "c:roles", "c:user_roles", "c:users")
+    ),
     db: Session = Depends(get_db)
 ):
-    """Get single application by ID with roles and users"""
-    application = application_service.get_application_details(db, app_id)
+    """Get single application by ID with roles, member counts and (unless include=count) a page of users per role"""
+    application = application_service.get_application_details(
+        db, app_id, include_users=include == "users", users_limit=users_limit
+    )
     if not application:
         raise HTTPException(status_code=404, detail="Application not found")
     
-    return DataResponse(
-        success=True,
-        message="Application retrieved successfully",
-        data=application
+    return data_response(
+        ApplicationWithRoles, "Application retrieved successfully", application, headers=cache_headers(etag)
     )
 
 @router.post("/", response_model=DataResponse[Application])
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.api.deps import PermissionChecker
+from app.db.session import get_db
+from app.repositories.audit_event import AuditEventRepository
+from app.schemas.audit import AuditEvent
+from app.schemas.common import CursorResponse
+
+router = APIRouter()
+audit_event_repo = AuditEventRepository()
+
+def encode_cursor(event) -> str:
+    return f"{event.created_at.isoformat()}_{event.ae_id}"
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, ae_id = cursor.rsplit("_", 1)
+        return datetime.fromisoformat(created_at), int(ae_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+@router.get("/", response_model=CursorResponse[AuditEvent])
+def get_audit_events(
+    since: Optional[datetime] = Query(None, description="Start of the range (default: 24 hours ago)"),
+    until: Optional[datetime] = Query(None, description="End of the range, exclusive (default: now)"),
+    event_type: Optional[str] = Query(None, alias="type", description="Filter by ae_type"),
+    user_id: Optional[int] = Query(None, description="Filter by the user the event is about"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    db: Session = Depends(get_db),
+    _: dict = Depends(PermissionChecker("audit:read"))
+):
+    """Audit events of the tenant, newest first, with keyset pagination"""
+    until = until or datetime.now()
+    since = since or until - timedelta(days=1)
+    before = decode_cursor(cursor) if cursor else None
+
+    events = audit_event_repo.get_range(
+        db, since, until,
+        event_type=event_type,
+        user_id=user_id,
+        before=before,
+        limit=limit
+    )
+    # Halaman penuh: kemungkinan masih ada event yang lebih lama
+    next_cursor = encode_cursor(events[-1]) if len(events) == limit else None
+
+    return CursorResponse[AuditEvent](
+        success=True,
+        message="Audit events retrieved successfully",
+        data=[AuditEvent.model_validate(event) for event in events],
+        next_cursor=next_cursor
+    )
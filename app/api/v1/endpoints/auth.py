@@ -1,16 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
+from typing import Optional
 
 from app.db.session import get_db
 from app.services.auth import AuthService
 from app.schemas.auth import (
     LoginRequest, LoginResponse, RefreshTokenRequest, 
-    RefreshTokenResponse, LogoutRequest, UserInfo,
+    RefreshTokenResponse, LogoutRequest, UserInfo, PermissionSnapshot,
     ForgotPasswordRequest, ResetPasswordRequest, RequestEmailVerificationRequest
 )
 from app.schemas.common import ResponseBase, DataResponse
-from app.api.deps import require_auth
+from app.api.deps import ConditionalGet, cache_headers, client_ip, require_auth
+from app.core.activity import activity_tracker
+from app.core.audit import AuditActor, audit_log
 from app.core.security import verify_token
+from app.core.metrics import LOGINS, TOKEN_REFRESHES, tenant_label
+from app.core.responses import data_response
 
 router = APIRouter()
 auth_service = AuthService()
@@ -18,18 +23,24 @@ auth_service = AuthService()
 @router.post("/login", response_model=DataResponse[LoginResponse])
 def login(
     login_data: LoginRequest,
+    http_request: Request,
     db: Session = Depends(get_db)
 ):
     """Login user with username/email and password"""
     user = auth_service.authenticate_user(db, login_data.username, login_data.password)
+    LOGINS.labels("success" if user else "failure", tenant_label(db.info.get("tenant_schema"))).inc()
+    actor = AuditActor(user_id=user.u_id if user else None, ip=client_ip(http_request))
     
     if not user:
+        audit_log.record(db, "login_failed", actor=actor, username=login_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials or inactive account"
         )
     
     tokens = auth_service.create_tokens(db, user)
+    audit_log.record(db, "login", user_id=user.u_id, actor=actor)
+    activity_tracker.touch(db, user.u_id, login=True)
     
     return DataResponse(
         success=True,
@@ -40,6 +51,7 @@ def login(
 @router.post("/refresh", response_model=DataResponse[RefreshTokenResponse])
 def refresh_token(
     refresh_data: RefreshTokenRequest,
+    http_request: Request,
     db: Session = Depends(get_db)
 ):
     """Refresh access token using refresh token"""
@@ -47,6 +59,7 @@ def refresh_token(
     payload = verify_token(refresh_data.refresh_token)
     
     if not payload or not payload.get("sub"):
+        TOKEN_REFRESHES.labels("failure").inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired refresh token"
@@ -61,12 +74,18 @@ def refresh_token(
         user_id=user_id
     )
     
+    actor = AuditActor(user_id=user_id, ip=client_ip(http_request))
     if not new_token:
+        TOKEN_REFRESHES.labels("failure").inc()
+        audit_log.record(db, "token_refresh_failed", user_id=user_id, actor=actor)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired refresh token"
         )
     
+    TOKEN_REFRESHES.labels("success").inc()
+    audit_log.record(db, "token_refresh", user_id=user_id, actor=actor)
+    activity_tracker.touch(db, user_id)
     return DataResponse(
         success=True,
         message="Token refreshed successfully",
@@ -76,6 +95,7 @@ def refresh_token(
 @router.post("/logout", response_model=ResponseBase)
 def logout(
     logout_data: LogoutRequest,
+    http_request: Request,
     db: Session = Depends(get_db)
 ):
     """Logout user by invalidating refresh token"""
@@ -95,6 +115,10 @@ def logout(
         refresh_token=logout_data.refresh_token, 
         user_id=user_id
     )
+    if success:
+        audit_log.record(
+            db, "logout", user_id=user_id, actor=AuditActor(user_id=user_id, ip=client_ip(http_request))
+        )
     
     return ResponseBase(
         success=success,
@@ -103,8 +127,11 @@ def logout(
 
 @router.get("/me", response_model=DataResponse[UserInfo])
 def get_current_user_info(
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(require_auth)
+    current_user: dict = Depends(require_auth),
+    etag: Optional[str] = Depends(ConditionalGet(
+        "e:users:{user_id}", "e:users:{user_id}:roles", "c:roles", "c:applications", per_user=True
+    )),
+    db: Session = Depends(get_db)
 ):
     """Get current user information"""
     user_info = auth_service.get_user_info(db, int(current_user["user_id"]))
@@ -115,21 +142,33 @@ def get_current_user_info(
             detail="User not found"
         )
     
-    return DataResponse(
-        success=True,
-        message="User info retrieved successfully",
-        data=user_info
+    return data_response(UserInfo, "User info retrieved successfully", user_info, headers=cache_headers(etag))
+
+@router.get("/me/permissions", response_model=DataResponse[PermissionSnapshot])
+def get_current_user_permissions(
+    current_user: dict = Depends(require_auth),
+    etag: Optional[str] = Depends(ConditionalGet(
+        "e:users:{user_id}:roles", "c:roles", "c:applications", per_user=True
+    )),
+    db: Session = Depends(get_db)
+):
+    """Flattened permissions and roles of the current user, for client-side authorization"""
+    snapshot = auth_service.get_permission_snapshot(db, int(current_user["user_id"]))
+    
+    return data_response(
+        PermissionSnapshot, "Permissions retrieved successfully", snapshot, headers=cache_headers(etag)
     )
 
 @router.post("/request-verification", response_model=ResponseBase)
-async def request_verification_email(
+def request_verification_email(
     request: RequestEmailVerificationRequest,
+    http_request: Request,
     db: Session = Depends(get_db)
 ):
     """
     Request a new email verification link.
     """
-    await auth_service.request_email_verification(db, request.email)
+    auth_service.request_email_verification(db, request.email, client_ip(http_request))
     
     return ResponseBase(
         success=True, 
@@ -153,15 +192,16 @@ def verify_user_email(
     return ResponseBase(success=True, message="Email berhasil diverifikasi.")
 
 @router.post("/forgot-password", response_model=ResponseBase)
-async def forgot_password(
+def forgot_password(
     request: ForgotPasswordRequest,
+    http_request: Request,
     db: Session = Depends(get_db)
 ):
     """
     Request a password reset link.
     """
-    # Jalankan langsung di foreground untuk debugging
-    await auth_service.forgot_password(db, request.email)
+    # Hanya memasukkan email ke outbox; pengiriman dilakukan worker background
+    auth_service.forgot_password(db, request.email, client_ip(http_request))
     
     return ResponseBase(
         success=True,
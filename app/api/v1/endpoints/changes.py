@@ -0,0 +1,120 @@
+import asyncio
+import time
+from typing import List, Optional, cast
+
+from fastapi import APIRouter, Depends, Header, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.api.deps import PermissionChecker, require_auth
+from app.core.config import settings
+from app.db.session import get_db, open_tenant_session, validate_tenant_schema
+from app.repositories.change_event import ChangeEventRepository
+from app.schemas.change_event import ChangeEvent, ChangeFeedResponse
+from app.services.user_role import UserRoleService
+
+STREAM_PERMISSION = "changes:read"
+
+router = APIRouter()
+change_event_repo = ChangeEventRepository()
+user_role_service = UserRoleService()
+
+@router.get("/", response_model=ChangeFeedResponse)
+def get_changes(
+    since: int = Query(0, ge=0, description="Last sequence number already processed"),
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+    _: dict = Depends(PermissionChecker(STREAM_PERMISSION))
+):
+    """
+    Role, assignment and user status changes after ``since``, in commit
+    order. Poll again with ``since=last_seq``; with no new events
+    ``last_seq`` equals ``since``.
+    """
+    events = change_event_repo.get_since(db, since, limit)
+    return ChangeFeedResponse(
+        success=True,
+        message="Changes retrieved successfully",
+        data=[ChangeEvent.model_validate(event) for event in events],
+        last_seq=cast(int, events[-1].ce_seq) if events else since
+    )
+
+def fetch_changes(tenant_schema: str, since: int, limit: int) -> List[ChangeEvent]:
+    db = open_tenant_session(tenant_schema)
+    try:
+        return [ChangeEvent.model_validate(event) for event in change_event_repo.get_since(db, since, limit)]
+    finally:
+        db.close()
+
+def has_stream_permission(tenant_schema: str, user_id: int) -> bool:
+    db = open_tenant_session(tenant_schema)
+    try:
+        permissions = user_role_service.get_cached_user_permissions(db, user_id)
+    finally:
+        db.close()
+    return "*" in permissions or STREAM_PERMISSION in permissions
+
+def format_event(event: ChangeEvent) -> str:
+    return f"id: {event.ce_seq}\nevent: {event.ce_type}\ndata: {event.model_dump_json()}\n\n"
+
+@router.get("/stream")
+def stream_changes(
+    request: Request,
+    since: Optional[int] = Query(None, ge=0, description="Last sequence number already processed"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    tenant_schema: str = Depends(validate_tenant_schema),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_auth),
+    _: dict = Depends(PermissionChecker(STREAM_PERMISSION))
+):
+    """
+    Server-Sent Events stream of the change feed. Each event's ``id`` is its
+    sequence number, so a reconnecting EventSource resumes via
+    ``Last-Event-ID``. Without ``since`` the stream starts at the current end.
+    The stream ends when the access token expires or, checked every
+    ``CHANGE_FEED_REAUTH_SECONDS``, the caller loses ``changes:read``.
+    """
+    if since is None and last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+    if since is None:
+        since = change_event_repo.get_last_seq(db)
+    # Koneksi dikembalikan ke pool; stream memakai session baru per polling
+    db.close()
+    user_id = int(current_user["user_id"])
+    expires_at = float(current_user.get("expires_at") or 0)
+
+    async def events():
+        last_seq = since
+        idle = 0.0
+        reauth_at = time.monotonic() + settings.CHANGE_FEED_REAUTH_SECONDS
+        while not await request.is_disconnected():
+            # Token kedaluwarsa atau permission dicabut: akhiri stream, klien reconnect dengan token baru
+            if time.time() >= expires_at:
+                return
+            if time.monotonic() >= reauth_at:
+                if not await run_in_threadpool(has_stream_permission, tenant_schema, user_id):
+                    return
+                reauth_at = time.monotonic() + settings.CHANGE_FEED_REAUTH_SECONDS
+
+            batch = await run_in_threadpool(
+                fetch_changes, tenant_schema, last_seq, settings.CHANGE_FEED_BATCH_SIZE
+            )
+            for event in batch:
+                yield format_event(event)
+                last_seq = event.ce_seq
+            if len(batch) == settings.CHANGE_FEED_BATCH_SIZE:
+                continue
+
+            idle = 0.0 if batch else idle + settings.CHANGE_FEED_POLL_SECONDS
+            if idle >= settings.CHANGE_FEED_HEARTBEAT_SECONDS:
+                # Komentar SSE menjaga koneksi tetap hidup melewati proxy
+                yield ": keep-alive\n\n"
+                idle = 0.0
+            await asyncio.sleep(settings.CHANGE_FEED_POLL_SECONDS)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
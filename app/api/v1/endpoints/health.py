@@ -1,39 +1,40 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import text
-from typing import Optional
-import redis
+from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
 
-from app.db.session import get_db
-from app.api.deps import get_redis
+from app.core.health import health_checker
+from app.core.startup import startup_timer
+from app.core.warmup import warmup
 from app.schemas.common import ResponseBase
 
 router = APIRouter()
 
 @router.get("/", response_model=ResponseBase)
-async def health_check(
-    db: Session = Depends(get_db),
-    redis_client: Optional[redis.Redis] = Depends(get_redis)
-):
-    """Health check endpoint"""
-    # Check database
-    try:
-        db.execute(text("SELECT 1"))
-        db_status = "healthy"
-    except Exception as e:
-        db_status = f"unhealthy ({e})"
-
-    
-    # Check Redis (if configured)
-    redis_status = "not configured"
-    if redis_client:
-        try:
-            redis_client.ping()
-            redis_status = "healthy"
-        except Exception:
-            redis_status = "unhealthy"
+def health_check():
+    """Health check endpoint (summary of the latest background checks)"""
+    snapshot = health_checker.snapshot()
+    checks = snapshot["checks"]
+    summary = ", ".join(
+        f"{name}: {'healthy' if check['ok'] else 'unhealthy'}" for name, check in checks.items()
+    )
     
     return ResponseBase(
-        success=True,
-        message=f"Database: {db_status}, Redis: {redis_status}"
-    )
\ No newline at end of file
+        success=snapshot["ready"],
+        message=summary or snapshot["reason"]
+    )
+
+@router.get("/livez")
+def liveness():
+    """Liveness probe: the process is serving requests (no dependency checks)"""
+    return ORJSONResponse(content={"status": "ok"})
+
+@router.get("/readyz")
+def readiness():
+    """Readiness probe: latest background check results, 503 when a threshold is breached or warm-up is running"""
+    snapshot = health_checker.snapshot()
+    if not warmup.finished:
+        snapshot = {**snapshot, "ready": False, "reason": "warm-up in progress"}
+    return ORJSONResponse(
+        content={**snapshot, "startup": startup_timer.report(), "warmup": warmup.report()},
+        status_code=200 if snapshot["ready"] else 503,
+        headers={"Cache-Control": "no-store"}
+    )
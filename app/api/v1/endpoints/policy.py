@@ -0,0 +1,36 @@
+from typing import Iterator, Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import PermissionChecker
+from app.db.session import open_tenant_session, validate_tenant_schema
+from app.services.policy_bundle import PolicyBundleService
+
+router = APIRouter()
+policy_bundle_service = PolicyBundleService()
+
+def bundle_lines(tenant_schema: str, since: Optional[int]) -> Iterator[bytes]:
+    # Session sendiri: session dari get_db sudah ditutup sebelum body di-stream
+    db = open_tenant_session(tenant_schema)
+    try:
+        yield from policy_bundle_service.stream(db, tenant_schema, since)
+    finally:
+        db.close()
+
+@router.get("/bundle")
+def get_policy_bundle(
+    since: Optional[int] = Query(None, ge=0, description="Version of the consumer's last bundle; returns a delta"),
+    tenant_schema: str = Depends(validate_tenant_schema),
+    _: dict = Depends(PermissionChecker("policy:read"))
+):
+    """
+    The tenant's applications, roles and user role assignments as NDJSON
+    (see app.services.policy_bundle), streamed from the database. With
+    ``since``, only users changed after that version are included.
+    """
+    return StreamingResponse(
+        bundle_lines(tenant_schema, since),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-store"}
+    )
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Optional, List
 
 from app.db.session import get_db
-from app.api.deps import PermissionChecker
+from app.api.deps import ConditionalGet, PermissionChecker, audit_actor, cache_headers, sparse_fields
+from app.core.audit import AuditActor
+from app.core.responses import sparse_page_response, page_response, data_response
 from app.services.role import RoleService
 from app.schemas.role import Role, RoleCreate, RoleUpdate, RoleWithDetails
 from app.schemas.permission import PermissionsUpdate
@@ -17,38 +19,47 @@ def get_roles(
     app_id: Optional[int] = Query(None, description="Filter by application ID"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[List[str]] = Depends(sparse_fields(Role, "r_id")),
+    etag: Optional[str] = Depends(ConditionalGet("c:roles")),
     db: Session = Depends(get_db),
     # current_user: dict = Depends(require_auth)  # Uncomment untuk require auth
 ):
     """Get list of roles with pagination and optional filtering by application"""
-    roles = role_service.get_roles(db, app_id=app_id, skip=skip, limit=limit)
     total = role_service.get_total_roles(db, app_id=app_id)
+    if fields:
+        rows = role_service.get_roles_fields(db, fields, app_id=app_id, skip=skip, limit=limit)
+        return sparse_page_response(
+            "Roles retrieved successfully", rows, total, skip, limit, headers=cache_headers(etag)
+        )
+
+    roles = role_service.get_roles(db, app_id=app_id, skip=skip, limit=limit)
     
-    return PaginationResponse(
-        success=True,
-        message="Roles retrieved successfully",
-        data=roles,
-        total=total,
-        page=skip // limit + 1,
-        size=limit,
-        pages=(total + limit - 1) // limit
+    return page_response(
+        Role, "Roles retrieved successfully", roles, total, skip, limit, headers=cache_headers(etag)
     )
 
 @router.get("/{role_id}", response_model=DataResponse[RoleWithDetails])
 def get_role(
     role_id: int,
+    include: str = Query(
+        "users", pattern="^(users|count)$",
+        description="'users' (default) embeds a page of assigned users, 'count' only the member count"
+    ),
+    users_limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[int] = Query(None, description="Return users with ID greater than this (next_cursor of the previous page)"),
+    etag: Optional[str] = Depends(
+        ConditionalGet("e:roles:{role_id}", "c:applications", "c:user_roles", "c:users")
+    ),
     db: Session = Depends(get_db)
 ):
-    """Get single role by ID with application info and assigned users"""
-    role = role_service.get_role_with_details(db, role_id)
+    """Get single role by ID with application info, member count and (unless include=count) a page of users"""
+    role = role_service.get_role_with_details(
+        db, role_id, include_users=include == "users", users_limit=users_limit, cursor=cursor
+    )
     if not role:
         raise HTTPException(status_code=404, detail="Role not found")
     
-    return DataResponse(
-        success=True,
-        message="Role retrieved successfully",
-        data=role
-    )
+    return data_response(RoleWithDetails, "Role retrieved successfully", role, headers=cache_headers(etag))
 
 @router.post("/", response_model=DataResponse[Role])
 def create_role(
@@ -74,10 +85,11 @@ def create_role(
 def update_role(
     role_id: int,
     role: RoleUpdate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    actor: AuditActor = Depends(audit_actor)
 ):
     """Update existing role"""
-    updated_role = role_service.update_role(db, role_id, role)
+    updated_role = role_service.update_role(db, role_id, role, actor)
     
     if not updated_role:
         raise HTTPException(
@@ -113,11 +125,12 @@ def update_permissions_for_role(
     permissions_data: PermissionsUpdate,
     db: Session = Depends(get_db),
     # Lindungi endpoint ini, hanya yang punya izin boleh mengakses
-    _: dict = Depends(PermissionChecker("roles:update_permissions"))
+    _: dict = Depends(PermissionChecker("roles:update_permissions")),
+    actor: AuditActor = Depends(audit_actor)
 ):
     """Update permissions for a role."""
     updated_role = role_service.update_role_permissions(
-        db, role_id, permissions_data.permissions
+        db, role_id, permissions_data.permissions, actor
     )
 
     if not updated_role:
@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.session import get_db, open_tenant_session
 from app.services.tenant import TenantService
-from app.schemas.tenant import TenantCreate, TenantInfo, TenantList
+from app.schemas.tenant import TenantCreate, TenantInfo, TenantList, TenantRecord, TenantUpdate
 from app.schemas.common import DataResponse, ResponseBase
 from app.utils.database_init import seed_new_tenant_data
 
@@ -37,7 +37,7 @@ def create_tenant(
         )
     
     # Create tenant schema
-    success = tenant_service.create_tenant(db, tenant.schema_name)
+    success = tenant_service.create_tenant(db, tenant.schema_name, plan=tenant.plan)
     
     if not success:
         raise HTTPException(
@@ -45,12 +45,21 @@ def create_tenant(
             detail="Failed to create tenant schema"
         )
     
-    seed_new_tenant_data(db, tenant.schema_name)
+    record = tenant_service.get_tenant(db, tenant.schema_name)
+    tenant_db = open_tenant_session(tenant.schema_name, shard=record.t_shard if record else None)
+    try:
+        seed_new_tenant_data(tenant_db, tenant.schema_name)
+    finally:
+        tenant_db.close()
     
     tenant_info = TenantInfo(
         schema_name=tenant.schema_name,
         table_count=5,  # We create 5 tables per tenant
-        created=True
+        created=True,
+        status=record.t_status if record else None,
+        shard=record.t_shard if record else None,
+        plan=record.t_plan if record else None,
+        created_at=record.created_at if record else None
     )
     
     return DataResponse(
@@ -63,12 +72,13 @@ def create_tenant(
 def list_tenants(
     db: Session = Depends(get_db)
 ):
-    """List all tenant schemas"""
-    schemas = tenant_service.list_tenant_schemas(db)
+    """List all registered tenants"""
+    tenants = tenant_service.list_tenants(db)
     
     tenant_list = TenantList(
-        schemas=schemas,
-        count=len(schemas)
+        schemas=[t.t_schema_name for t in tenants],
+        count=len(tenants),
+        tenants=tenants
     )
     
     return DataResponse(
@@ -83,7 +93,8 @@ def get_tenant(
     db: Session = Depends(get_db)
 ):
     """Get tenant information"""
-    if not tenant_service.schema_exists(db, schema_name):
+    record = tenant_service.get_tenant(db, schema_name)
+    if not record:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Tenant schema not found"
@@ -92,7 +103,11 @@ def get_tenant(
     tenant_info = TenantInfo(
         schema_name=schema_name,
         table_count=5,
-        created=True
+        created=True,
+        status=record.t_status,
+        shard=record.t_shard,
+        plan=record.t_plan,
+        created_at=record.created_at
     )
     
     return DataResponse(
@@ -101,6 +116,32 @@ def get_tenant(
         data=tenant_info
     )
 
+@router.put("/{schema_name}", response_model=DataResponse[TenantRecord])
+def update_tenant(
+    schema_name: str,
+    tenant: TenantUpdate,
+    db: Session = Depends(get_db)
+):
+    """Update tenant metadata (status, plan)"""
+    if tenant.status is not None and tenant.status not in ("active", "suspended"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Status must be 'active' or 'suspended'"
+        )
+    
+    updated = tenant_service.update_tenant(db, schema_name, tenant)
+    if not updated:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tenant schema not found"
+        )
+    
+    return DataResponse(
+        success=True,
+        message="Tenant updated successfully",
+        data=updated
+    )
+
 @router.delete("/{schema_name}", response_model=ResponseBase)
 def delete_tenant(
     schema_name: str,
@@ -1,12 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
 from app.db.session import get_db
-from app.api.deps import PermissionChecker
+from app.api.deps import PermissionChecker, audit_actor, sparse_fields
+from app.core.audit import AuditActor
+from app.core.responses import sparse_page_response, page_response, data_response
 from app.services.user import UserService
 from app.services.user_role import UserRoleService
-from app.schemas.user import User, UserCreate, UserUpdate
+from app.schemas.user import User, UserActivity, UserCreate, UserUpdate, UserFilter
 from app.schemas.user_role import (
     UserRoleAssignBulkRequest, 
     UserRoleWithDetails
@@ -23,24 +26,62 @@ user_role_service = UserRoleService()
 def get_users(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    search: Optional[str] = Query(None, min_length=1, max_length=100, description="Substring match on username, email or full name"),
+    user_status: Optional[str] = Query(None, alias="status", description="Filter by u_status"),
+    email_verified: Optional[bool] = Query(None, description="Filter by u_email_verified"),
+    role_id: Optional[int] = Query(None, description="Only users assigned to this role"),
+    app_id: Optional[int] = Query(None, description="Only users with any role in this application"),
+    sort: str = Query("id", pattern=r"^-?(id|username|email|full_name|status|created_at)$", description="Sort field, prefix with '-' for descending"),
+    fields: Optional[List[str]] = Depends(sparse_fields(User, "u_id")),
     db: Session = Depends(get_db),
     _: dict = Depends(PermissionChecker("users:read"))
     # current_user: dict = Depends(require_auth)  # Uncomment untuk require auth
 ):
-    """Get list of users with pagination"""
-    users = user_service.get_users(db, skip=skip, limit=limit)
-    total = user_service.get_total_users(db)
+    """
+    Get list of users with pagination, search, filters and sorting.
+    With ``fields``, only those columns are selected and returned.
+    Filtered totals are counted up to USER_SEARCH_COUNT_CAP; beyond that
+    ``total_capped`` is true and ``total``/``pages`` are lower bounds.
+    """
+    filters = UserFilter(
+        search=search,
+        status=user_status,
+        email_verified=email_verified,
+        role_id=role_id,
+        app_id=app_id,
+        sort=sort
+    )
+    total, total_capped = user_service.get_total_users(db, filters=filters)
+    if fields:
+        rows = user_service.get_users_fields(db, fields, skip=skip, limit=limit, filters=filters)
+        return sparse_page_response(
+            "Users retrieved successfully", rows, total, skip, limit, total_capped=total_capped
+        )
+
+    users = user_service.get_users(db, skip=skip, limit=limit, filters=filters)
     
-    return PaginationResponse(
-        success=True,
-        message="Users retrieved successfully",
-        data=users,
-        total=total,
-        page=skip // limit + 1,
-        size=limit,
-        pages=(total + limit - 1) // limit
+    return page_response(
+        User, "Users retrieved successfully", users, total, skip, limit, total_capped=total_capped
     )
 
+@router.get("/inactive", response_model=PaginationResponse[UserActivity])
+def get_inactive_users(
+    since: datetime = Query(..., description="Users not seen (login or token refresh) since this time"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    _: dict = Depends(PermissionChecker("users:read"))
+):
+    """
+    Dormant accounts: users whose last activity is before ``since``, or who
+    were created before it and never seen. Activity is written in batches,
+    so the last ``ACTIVITY_FLUSH_SECONDS`` may not be reflected yet.
+    """
+    total = user_service.count_inactive_users(db, since)
+    users = user_service.get_inactive_users(db, since, skip=skip, limit=limit)
+    
+    return page_response(UserActivity, "Inactive users retrieved successfully", users, total, skip, limit)
+
 @router.get("/{user_id}", response_model=DataResponse[User])
 def get_user(
     user_id: int,
@@ -52,11 +93,7 @@ def get_user(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    return DataResponse(
-        success=True,
-        message="User retrieved successfully",
-        data=user
-    )
+    return data_response(User, "User retrieved successfully", user)
 
 @router.post("/", response_model=DataResponse[User])
 def create_user(
@@ -125,7 +162,8 @@ def delete_user(
 def assign_roles_to_user(
     user_id: int,
     role_request: UserRoleAssignBulkRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    actor: AuditActor = Depends(audit_actor)
 ):
     """Assign multiple roles to user"""
     # Check if user exists
@@ -134,7 +172,7 @@ def assign_roles_to_user(
         raise HTTPException(status_code=404, detail="User not found")
     
     # Assign roles
-    user_role_service.assign_roles_to_user(db, user_id, role_request.role_ids)
+    user_role_service.assign_roles_to_user(db, user_id, role_request.role_ids, actor)
     
     # Return updated user roles
     user_roles = user_role_service.get_user_roles(db, user_id)
@@ -168,7 +206,8 @@ def get_user_roles(
 def remove_role_from_user(
     user_id: int,
     role_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    actor: AuditActor = Depends(audit_actor)
 ):
     """Remove role from user"""
     # Check if user exists
@@ -176,7 +215,7 @@ def remove_role_from_user(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    removed = user_role_service.remove_role_from_user(db, user_id, role_id)
+    removed = user_role_service.remove_role_from_user(db, user_id, role_id, actor)
     
     if not removed:
         raise HTTPException(status_code=404, detail="Role assignment not found")
@@ -0,0 +1,189 @@
+"""
+Write-coalesced user activity tracking.
+
+Login and token refresh call ``activity_tracker.touch``, which only updates
+an in-memory map keyed by (tenant, user). A background thread flushes it
+every ``ACTIVITY_FLUSH_SECONDS`` as one ``UPDATE users ... FROM (VALUES ...)``
+per tenant and batch, so a user who refreshes a hundred times between
+flushes costs one row update.
+
+Timestamps are merged with ``GREATEST``, so flushes from several workers
+(each with its own map) may arrive in any order. The map holds one entry
+per active user; reaching ``ACTIVITY_BATCH_SIZE`` entries triggers an early
+flush. Without the thread (scripts) that flush runs inline.
+
+With ``SERVERLESS_MODE`` nothing is kept in memory: timestamps wait in
+``session.info`` and are written in the request's own transaction, like
+serverless audit events (see ``app.core.audit``).
+"""
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import ACTIVITY_PENDING, ACTIVITY_UPDATES
+from app.core.versioning import session_tenant
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = "user_activity"
+
+# (last_login_at, last_seen_at)
+Activity = Tuple[Optional[datetime], Optional[datetime]]
+
+def _latest(a: Optional[datetime], b: Optional[datetime]) -> Optional[datetime]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return max(a, b)
+
+class ActivityTracker:
+    """Coalesces last-login/last-seen timestamps and writes them in bulk"""
+
+    def __init__(self, flush_seconds: float, batch_size: int, enabled: bool = True, transactional: bool = False):
+        self.enabled = enabled
+        self.transactional = transactional
+        self.flush_seconds = flush_seconds
+        self.batch_size = batch_size
+        self._pending: Dict[Tuple[str, int], Activity] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def touch(self, db: Session, user_id: int, login: bool = False) -> None:
+        """Record that a user was seen now (and logged in, with ``login``)"""
+        if not self.enabled:
+            return
+        now = datetime.now()
+        if self.transactional:
+            recorded: Dict[int, Activity] = db.info.setdefault(PENDING_KEY, {})
+            last_login, last_seen = recorded.get(user_id, (None, None))
+            recorded[user_id] = (now if login else last_login, now)
+            return
+
+        pending = self._merge({(session_tenant(db), user_id): (now if login else None, now)})
+
+        if pending >= self.batch_size:
+            if self._thread is None:
+                self.flush()
+            else:
+                self._wakeup.set()
+
+    def write_pending(self, db: Session) -> None:
+        """Write timestamps recorded on ``db`` in its committing transaction"""
+        recorded: Optional[Dict[int, Activity]] = db.info.pop(PENDING_KEY, None)
+        if not recorded:
+            return
+        # Import lokal: repository bergantung pada modul core
+        from app.repositories.user import UserRepository
+
+        rows = sorted((user_id, last_login, last_seen) for user_id, (last_login, last_seen) in recorded.items())
+        # Best effort: kegagalan (mis. kolom belum ada di tenant lama) tidak boleh menggagalkan commit request
+        db.execute(text("SAVEPOINT user_activity"))
+        try:
+            UserRepository().update_activity(db, rows)
+        except SQLAlchemyError as e:
+            db.execute(text("ROLLBACK TO SAVEPOINT user_activity"))
+            logger.warning("Writing activity for %d users failed: %s", len(rows), e)
+            ACTIVITY_UPDATES.labels("failed").inc()
+            return
+        db.execute(text("RELEASE SAVEPOINT user_activity"))
+        ACTIVITY_UPDATES.labels("written").inc(len(rows))
+
+    def discard(self, db: Session) -> None:
+        """Drop timestamps recorded on ``db`` (its transaction rolled back)"""
+        db.info.pop(PENDING_KEY, None)
+
+    def _merge(self, entries: Dict[Tuple[str, int], Activity]) -> int:
+        with self._lock:
+            for key, (last_login, last_seen) in entries.items():
+                current_login, current_seen = self._pending.get(key, (None, None))
+                self._pending[key] = (_latest(current_login, last_login), _latest(current_seen, last_seen))
+            pending = len(self._pending)
+            ACTIVITY_PENDING.set(pending)
+        return pending
+
+    def flush(self) -> int:
+        """Write all pending timestamps. Returns the number of users written."""
+        # Import lokal: session bergantung pada modul core
+        from app.db.session import open_tenant_session
+        from app.repositories.user import UserRepository
+
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                ACTIVITY_PENDING.set(0)
+            if not pending:
+                return 0
+
+            by_tenant: Dict[str, List[Tuple[int, Optional[datetime], Optional[datetime]]]] = defaultdict(list)
+            for (tenant, user_id), (last_login, last_seen) in pending.items():
+                by_tenant[tenant].append((user_id, last_login, last_seen))
+
+            repository = UserRepository()
+            written = 0
+            for tenant, rows in by_tenant.items():
+                # Urut per u_id: worker lain mengunci baris dengan urutan yang sama
+                rows.sort()
+                db = open_tenant_session(tenant)
+                try:
+                    for start in range(0, len(rows), self.batch_size):
+                        batch = rows[start:start + self.batch_size]
+                        repository.update_activity(db, batch)
+                        db.commit()
+                        written += len(batch)
+                        ACTIVITY_UPDATES.labels("written").inc(len(batch))
+                except Exception as e:
+                    db.rollback()
+                    logger.warning("Writing activity for %s failed: %s", tenant, e)
+                    ACTIVITY_UPDATES.labels("failed").inc()
+                    # Simpan lagi untuk flush berikutnya; yang sudah ter-commit ikut ditulis ulang (idempoten)
+                    self._merge({(tenant, user_id): (last_login, last_seen) for user_id, last_login, last_seen in rows})
+                finally:
+                    db.close()
+            return written
+
+    def start(self) -> None:
+        """Start the background flush thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="activity-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flush thread and write what is still pending"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        try:
+            self.flush()
+        except Exception as e:
+            logger.warning("Final activity flush failed: %s", e)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_seconds)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning("Activity flush failed: %s", e)
+
+activity_tracker = ActivityTracker(
+    settings.ACTIVITY_FLUSH_SECONDS,
+    settings.ACTIVITY_BATCH_SIZE,
+    settings.ACTIVITY_TRACKING_ENABLED,
+    transactional=settings.SERVERLESS_MODE,
+)
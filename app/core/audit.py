@@ -0,0 +1,227 @@
+"""
+Batched, asynchronous audit log.
+
+``audit_log.record`` only appends to a bounded in-memory buffer, so the
+request path never waits on the database. A background writer thread
+drains the buffer every ``AUDIT_FLUSH_SECONDS`` (or as soon as a batch is
+full) and writes each tenant's events to ``<tenant>.audit_events`` with
+one multi-row INSERT.
+
+When the buffer holds ``AUDIT_BUFFER_SIZE`` events, ``AUDIT_OVERFLOW_POLICY``
+decides what is lost: ``drop_oldest`` (ring buffer, the default) or
+``drop_newest``. Drops are counted in ``atlas_audit_events_total``.
+Scripts without the writer thread write inline once a batch fills and call
+``flush()`` before exiting.
+
+With ``SERVERLESS_MODE`` there is no writer thread and an instance may be
+frozen right after a response, so nothing is buffered: events wait in
+``session.info`` and are inserted into the request's own transaction by a
+``before_commit`` hook, like the change feed. ``get_db`` commits events
+recorded after the request's last commit (see ``commit_recorded``).
+"""
+import logging
+import threading
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import AUDIT_BUFFER_DEPTH, AUDIT_EVENTS
+from app.core.versioning import session_tenant
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = "audit_events"
+
+@dataclass
+class AuditActor:
+    """Who performed an action (the authenticated user) and from where"""
+    user_id: Optional[int] = None
+    ip: Optional[str] = None
+
+class AuditLog:
+    """Bounded event buffer with a background batch writer"""
+
+    # Batch yang gagal ditulis dicoba ulang sampai sejumlah ini
+    MAX_ATTEMPTS = 3
+
+    def __init__(
+        self,
+        capacity: int,
+        batch_size: int,
+        flush_seconds: float,
+        overflow_policy: str,
+        enabled: bool = True,
+        transactional: bool = False
+    ):
+        self.enabled = enabled
+        self.transactional = transactional
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.overflow_policy = overflow_policy
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(
+        self,
+        db: Session,
+        event_type: str,
+        user_id: Optional[int] = None,
+        actor: Optional[AuditActor] = None,
+        **details: Any
+    ) -> None:
+        """Queue one event for the session's tenant (never blocks on I/O)"""
+        if not self.enabled:
+            return
+        row = {
+            "ae_type": event_type,
+            "ae_user_id": user_id,
+            "ae_actor_id": actor.user_id if actor else None,
+            "ae_ip": actor.ip if actor else None,
+            "ae_details": details,
+            "created_at": datetime.now(),
+        }
+        if self.transactional:
+            db.info.setdefault(PENDING_KEY, []).append(row)
+            AUDIT_EVENTS.labels("recorded").inc()
+            return
+
+        event = {"tenant": session_tenant(db), "attempts": 0, "row": row}
+        with self._lock:
+            if len(self._buffer) >= self.capacity:
+                AUDIT_EVENTS.labels("dropped").inc()
+                if self.overflow_policy == "drop_newest":
+                    return
+                self._buffer.popleft()
+            self._buffer.append(event)
+            pending = len(self._buffer)
+            AUDIT_BUFFER_DEPTH.set(pending)
+        AUDIT_EVENTS.labels("recorded").inc()
+
+        if pending >= self.batch_size:
+            if self._thread is None:
+                self.flush()
+            else:
+                self._wakeup.set()
+
+    def write_pending(self, db: Session) -> None:
+        """Insert events recorded on ``db`` into its committing transaction"""
+        rows = db.info.pop(PENDING_KEY, None)
+        if not rows:
+            return
+        # Import lokal: repository bergantung pada modul core
+        from app.repositories.audit_event import AuditEventRepository
+
+        AuditEventRepository().add_many(db, rows)
+        AUDIT_EVENTS.labels("written").inc(len(rows))
+
+    def discard(self, db: Session) -> None:
+        """Drop events recorded on ``db`` (its transaction rolled back)"""
+        rows = db.info.pop(PENDING_KEY, None)
+        if rows:
+            AUDIT_EVENTS.labels("dropped").inc(len(rows))
+
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            batch = [self._buffer.popleft() for _ in range(min(limit, len(self._buffer)))]
+            AUDIT_BUFFER_DEPTH.set(len(self._buffer))
+        return batch
+
+    def _requeue(self, events: List[Dict[str, Any]]) -> None:
+        """Put failed events back in front, oldest first, within capacity"""
+        with self._lock:
+            for event in reversed(events):
+                if len(self._buffer) >= self.capacity:
+                    AUDIT_EVENTS.labels("dropped").inc()
+                    continue
+                self._buffer.appendleft(event)
+
+    def write_batch(self) -> int:
+        """Write up to one batch, grouped by tenant. Returns the number of events taken."""
+        # Import lokal: session bergantung pada modul core
+        from app.db.session import open_tenant_session
+        from app.repositories.audit_event import AuditEventRepository
+
+        batch = self._drain(self.batch_size)
+        by_tenant: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for event in batch:
+            by_tenant[event["tenant"]].append(event)
+
+        repository = AuditEventRepository()
+        for tenant, events in by_tenant.items():
+            db = open_tenant_session(tenant)
+            try:
+                repository.insert_many(db, [event["row"] for event in events])
+                AUDIT_EVENTS.labels("written").inc(len(events))
+            except Exception as e:
+                db.rollback()
+                logger.warning("Writing %d audit events for %s failed: %s", len(events), tenant, e)
+                retry = []
+                for event in events:
+                    event["attempts"] += 1
+                    if event["attempts"] < self.MAX_ATTEMPTS:
+                        retry.append(event)
+                    else:
+                        AUDIT_EVENTS.labels("failed").inc()
+                self._requeue(retry)
+            finally:
+                db.close()
+        return len(batch)
+
+    def flush(self) -> None:
+        """Write everything currently buffered"""
+        with self._flush_lock:
+            pending = len(self._buffer)
+            while pending > 0:
+                taken = self.write_batch()
+                if not taken:
+                    break
+                pending -= taken
+
+    def start(self) -> None:
+        """Start the background writer thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the writer and write what is still buffered"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        try:
+            self.flush()
+        except Exception as e:
+            logger.warning("Final audit flush failed: %s", e)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_seconds)
+            self._wakeup.clear()
+            try:
+                with self._flush_lock:
+                    while self.write_batch() >= self.batch_size and not self._stop.is_set():
+                        pass
+            except Exception as e:
+                logger.warning("Audit flush failed: %s", e)
+
+audit_log = AuditLog(
+    settings.AUDIT_BUFFER_SIZE,
+    settings.AUDIT_BATCH_SIZE,
+    settings.AUDIT_FLUSH_SECONDS,
+    settings.AUDIT_OVERFLOW_POLICY,
+    settings.AUDIT_ENABLED,
+    transactional=settings.SERVERLESS_MODE,
+)
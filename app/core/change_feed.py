@@ -0,0 +1,46 @@
+"""
+Per-tenant change feed (transactional outbox).
+
+Services call ``change_feed.emit`` right before the repository call that
+commits a mutation. Emitted events wait in ``session.info`` and are
+inserted into ``<tenant>.change_events`` by a ``before_commit`` hook on
+the session, so an event exists if and only if its mutation committed.
+Consumers read the feed by sequence number (``GET /changes?since=``) or
+stream it (``GET /changes/stream``) and invalidate their caches precisely.
+"""
+from typing import Any, Dict, List
+
+from sqlalchemy.orm import Session
+
+PENDING_KEY = "change_events"
+
+class ChangeFeed:
+    """Collects change events on a session and writes them at commit"""
+
+    def emit(self, db: Session, event_type: str, entity: str, entity_id: int, **details: Any) -> None:
+        """Queue an event for the next commit of ``db``"""
+        pending: List[Dict[str, Any]] = db.info.setdefault(PENDING_KEY, [])
+        pending.append({
+            "ce_type": event_type,
+            "ce_entity": entity,
+            "ce_entity_id": entity_id,
+            "ce_details": details,
+        })
+
+    def discard(self, db: Session) -> None:
+        """Drop queued events (the mutation did not happen)"""
+        db.info.pop(PENDING_KEY, None)
+
+    def write_pending(self, db: Session) -> None:
+        """Insert queued events into the committing transaction"""
+        pending = db.info.pop(PENDING_KEY, None)
+        if not pending:
+            return
+        # Import lokal: repository bergantung pada modul core
+        from app.repositories.change_event import ChangeEventRepository
+
+        # Flush dulu agar semua lock baris mutasi sudah diambil sebelum lock feed
+        db.flush()
+        ChangeEventRepository().append(db, pending)
+
+change_feed = ChangeFeed()
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -9,9 +9,27 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    # Shard tambahan dalam format JSON, mis. {"shard_b": "postgresql://..."}.
+    # DATABASE_URL selalu menjadi shard "default" dan menyimpan registry tenant.
+    DATABASE_SHARDS: Dict[str, str] = {}
+    # Pool koneksi: "queue" (pool per proses) atau "null" (koneksi per checkout,
+    # untuk serverless di belakang pooler eksternal seperti PgBouncer). Default
+    # mengikuti SERVERLESS_MODE.
+    DATABASE_POOL: Optional[str] = None
+    
+    # Serverless (mis. Vercel): tanpa thread background dan tanpa DDL saat startup,
+    # semua resource dibuat saat pertama dipakai
+    SERVERLESS_MODE: bool = False
     
     # Redis (optional)
     REDIS_URL: Optional[str] = None
+    REDIS_MAX_CONNECTIONS: int = 50
+    # Timeout (detik) socket dan tunggu koneksi pool; Redis lambat = dilewati
+    REDIS_SOCKET_TIMEOUT: float = 0.1
+    REDIS_POOL_TIMEOUT: float = 0.05
+    # Circuit breaker: jumlah kegagalan beruntun sebelum Redis dilewati, dan lama (detik) dilewati
+    REDIS_BREAKER_THRESHOLD: int = 5
+    REDIS_BREAKER_RESET_SECONDS: float = 30
     
     # JWT Configuration
     SECRET_KEY: str
@@ -21,6 +39,37 @@ class Settings(BaseSettings):
     
     # Multi-tenant
     DEFAULT_SCHEMA: str = "public"
+    # Interval (detik) polling registry tenant sebagai fallback LISTEN/NOTIFY
+    TENANT_CATALOG_REFRESH_SECONDS: int = 30
+    
+    # Readiness probe: interval pengecekan background dan ambang batasnya
+    HEALTH_CHECK_INTERVAL_SECONDS: float = 5
+    HEALTH_MAX_POOL_SATURATION: float = 0.9
+    # Lag replikasi hanya dilaporkan (replica_lag_exceeded), tidak menggagalkan readiness
+    HEALTH_MAX_REPLICA_LAG_SECONDS: float = 30
+    HEALTH_MAX_REDIS_LATENCY_MS: float = 50
+    # Jika False, Redis yang gagal hanya dilaporkan (ATLAS tetap jalan tanpa Redis)
+    HEALTH_REQUIRE_REDIS: bool = False
+    
+    # Warm-up saat startup (isi pool, query panas, crypto); readiness belum siap sampai selesai
+    WARMUP_ENABLED: bool = True
+    # Tenant yang izin user-nya dimuat ke cache saat warm-up (JSON list), dan jumlah user per tenant
+    WARMUP_TENANTS: List[str] = []
+    WARMUP_USERS_PER_TENANT: int = 200
+    
+    # Total list user yang difilter dihitung paling banyak sampai batas ini (di atasnya: total_capped)
+    USER_SEARCH_COUNT_CAP: int = 10000
+    
+    # Metrics: jumlah maksimum nilai label tenant (sisanya dilaporkan sebagai "other")
+    METRICS_MAX_TENANTS: int = 50
+    
+    # Tracing OpenTelemetry (opsional, butuh paket opentelemetry-sdk)
+    TRACING_ENABLED: bool = False
+    # console | file | otlp
+    TRACING_EXPORTER: str = "console"
+    TRACING_FILE_PATH: str = "traces.jsonl"
+    TRACING_OTLP_ENDPOINT: Optional[str] = None
+    TRACING_SAMPLE_RATIO: float = 1.0
 
     MAIL_USERNAME: Optional[str] = None
     MAIL_PASSWORD: Optional[str] = None
@@ -30,6 +79,55 @@ class Settings(BaseSettings):
     MAIL_SERVER: Optional[str] = None
     MAIL_STARTTLS: bool = True
     MAIL_SSL_TLS: bool = False
+    MAIL_TIMEOUT_SECONDS: float = 10
+    # Koneksi SMTP yang idle lebih lama dari ini dicek dengan NOOP sebelum dipakai
+    MAIL_SMTP_IDLE_SECONDS: float = 30
+    
+    # Locale template email tanpa sufiks (verify_email.html); varian lain: verify_email.en.html
+    EMAIL_DEFAULT_LOCALE: str = "id"
+    
+    # Outbox email: worker background mengirim dalam batch dengan retry + backoff
+    EMAIL_WORKER_ENABLED: bool = True
+    EMAIL_POLL_SECONDS: float = 2
+    EMAIL_BATCH_SIZE: int = 50
+    EMAIL_MAX_ATTEMPTS: int = 5
+    EMAIL_RETRY_BASE_SECONDS: float = 30
+    EMAIL_RETRY_MAX_SECONDS: float = 3600
+    # Throttle endpoint email tanpa autentikasi (forgot-password, request-verification):
+    # per alamat tujuan (kelebihan diserap diam-diam) dan per IP klien (429)
+    EMAIL_THROTTLE_RECIPIENT_LIMIT: int = 1
+    EMAIL_THROTTLE_RECIPIENT_WINDOW_SECONDS: int = 300
+    EMAIL_THROTTLE_IP_LIMIT: int = 20
+    EMAIL_THROTTLE_IP_WINDOW_SECONDS: int = 3600
+    # Lama (detik) email yang tidak terdaftar diingat tanpa query ulang
+    EMAIL_NEGATIVE_CACHE_SECONDS: int = 300
+    # Email berstatus 'sending' lebih lama dari ini dianggap yatim (worker crash) dan diklaim ulang
+    EMAIL_STALE_SECONDS: int = 300
+    # Email terkirim/gagal dihapus dari outbox setelah sekian hari (0 = tidak pernah)
+    EMAIL_OUTBOX_RETENTION_DAYS: int = 30
+    
+    # Log audit: buffer in-memory per proses, ditulis batch oleh thread background.
+    # Jika buffer penuh: drop_oldest (ring buffer) atau drop_newest
+    AUDIT_ENABLED: bool = True
+    AUDIT_BUFFER_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_SECONDS: float = 1
+    AUDIT_OVERFLOW_POLICY: str = "drop_oldest"
+    
+    # last_login_at/last_seen_at: dikumpulkan in-memory, ditulis bulk tiap interval
+    ACTIVITY_TRACKING_ENABLED: bool = True
+    ACTIVITY_FLUSH_SECONDS: float = 30
+    ACTIVITY_BATCH_SIZE: int = 1000
+    
+    # Change feed (GET /changes/stream): interval polling, heartbeat SSE dan cek ulang permission
+    CHANGE_FEED_POLL_SECONDS: float = 1
+    CHANGE_FEED_HEARTBEAT_SECONDS: float = 15
+    CHANGE_FEED_REAUTH_SECONDS: float = 60
+    CHANGE_FEED_BATCH_SIZE: int = 500
+    
+    # Policy bundle (GET /policy/bundle): kunci HMAC opsional dan ukuran fetch cursor
+    POLICY_BUNDLE_SIGNING_KEY: Optional[str] = None
+    POLICY_BUNDLE_FETCH_SIZE: int = 5000
     
     # URL Frontend (untuk membuat link di email)
     FRONTEND_URL: str = "http://localhost:3000"
@@ -0,0 +1,195 @@
+"""
+Background sender for the ``public.email_outbox`` table.
+
+Every process runs one sender thread. Batches are claimed with
+``FOR UPDATE SKIP LOCKED``, so several workers never send the same message.
+Failed messages are retried with exponential backoff until
+``EMAIL_MAX_ATTEMPTS`` is reached, then marked ``failed``. Sent and
+failed messages lose their template body (reset/verification links) and
+are deleted after ``EMAIL_OUTBOX_RETENTION_DAYS``.
+
+With ``SERVERLESS_MODE`` the API processes start no sender; run one as a
+separate long-lived process instead:
+
+    python -m app.core.email_worker
+"""
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.mailer import SMTPMailer, build_message, email_templates
+from app.core.metrics import EMAIL_OUTBOX_MESSAGES, EMAIL_QUEUE_DEPTH
+
+logger = logging.getLogger(__name__)
+
+def retry_delay(attempts: int) -> float:
+    """Backoff (seconds) before the next attempt after ``attempts`` failures"""
+    return min(
+        settings.EMAIL_RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0)),
+        settings.EMAIL_RETRY_MAX_SECONDS
+    )
+
+class EmailOutboxWorker:
+    """Sends queued emails over one persistent SMTP connection"""
+
+    # Pesan lama dihapus paling sering sekali per interval ini, per batch
+    PURGE_INTERVAL_SECONDS = 3600
+    PURGE_BATCH_SIZE = 1000
+
+    def __init__(self, poll_seconds: float, batch_size: int):
+        self.poll_seconds = poll_seconds
+        self.batch_size = batch_size
+        self.mailer = SMTPMailer()
+        self._purged_at: Optional[float] = None
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def wake(self) -> None:
+        """Signal that new messages were enqueued"""
+        self._wakeup.set()
+
+    def run_once(self) -> int:
+        """Claim and send one batch. Returns the number of messages claimed."""
+        # Import lokal untuk menghindari circular import dengan app.db.session
+        from app.db.session import SessionLocal
+        from app.repositories.email_outbox import EmailOutboxRepository
+
+        repository = EmailOutboxRepository()
+        db = SessionLocal()
+        try:
+            batch = repository.claim_batch(db, self.batch_size, settings.EMAIL_STALE_SECONDS)
+            if batch:
+                sent, failures = self._send_batch(batch)
+                repository.mark_sent(db, sent)
+                repository.mark_failed(db, failures)
+            EMAIL_QUEUE_DEPTH.set(repository.count_pending(db))
+            return len(batch)
+        finally:
+            db.close()
+
+    def purge_expired(self) -> int:
+        """Delete sent/failed messages past retention. Returns the number deleted."""
+        from app.db.session import SessionLocal
+        from app.repositories.email_outbox import EmailOutboxRepository
+
+        if settings.EMAIL_OUTBOX_RETENTION_DAYS <= 0:
+            return 0
+        repository = EmailOutboxRepository()
+        db = SessionLocal()
+        try:
+            deleted = 0
+            while True:
+                count = repository.purge(db, settings.EMAIL_OUTBOX_RETENTION_DAYS, self.PURGE_BATCH_SIZE)
+                deleted += count
+                if count < self.PURGE_BATCH_SIZE or self._stop.is_set():
+                    return deleted
+        finally:
+            db.close()
+
+    def _purge_if_due(self) -> None:
+        now = time.monotonic()
+        if self._purged_at is not None and now - self._purged_at < self.PURGE_INTERVAL_SECONDS:
+            return
+        self._purged_at = now
+        try:
+            deleted = self.purge_expired()
+            if deleted:
+                logger.info("Purged %d old outbox messages", deleted)
+        except Exception as e:
+            logger.warning("Email outbox purge failed: %s", e)
+
+    def _send_batch(self, batch) -> Tuple[List[int], List[Dict[str, Any]]]:
+        sent: List[int] = []
+        failures: List[Dict[str, Any]] = []
+        rendered = self._render_batch(batch)
+        for row in batch:
+            try:
+                if row.eo_id not in rendered:
+                    raise RuntimeError(f"email {row.eo_id} was not rendered")
+                html = rendered[row.eo_id]
+                if isinstance(html, Exception):
+                    raise html
+                self.mailer.send(build_message(row.eo_subject, row.eo_recipient, html))
+                sent.append(row.eo_id)
+                EMAIL_OUTBOX_MESSAGES.labels("sent").inc()
+            except Exception as e:
+                final = row.eo_attempts >= settings.EMAIL_MAX_ATTEMPTS
+                failures.append({
+                    "id": row.eo_id,
+                    "error": str(e)[:1000],
+                    "retry_in": retry_delay(row.eo_attempts),
+                    "final": final,
+                })
+                EMAIL_OUTBOX_MESSAGES.labels("failed" if final else "retried").inc()
+                logger.warning(
+                    "Email %s to %s failed (attempt %s): %s",
+                    row.eo_id, row.eo_recipient, row.eo_attempts, e
+                )
+        return sent, failures
+
+    def _render_batch(self, batch) -> Dict[int, Any]:
+        """Render a batch grouped by (template, locale): one lookup per group"""
+        groups: Dict[Tuple[str, Any], List[Any]] = defaultdict(list)
+        for row in batch:
+            groups[(row.eo_template, row.eo_locale)].append(row)
+
+        rendered: Dict[int, Any] = {}
+        for (template_name, locale), rows in groups.items():
+            try:
+                bodies = email_templates.render_many(
+                    template_name, [row.eo_template_body or {} for row in rows], locale
+                )
+            except Exception as e:
+                # Template rusak/tidak ada: catat sebagai kegagalan per pesan
+                rendered.update({row.eo_id: e for row in rows})
+                continue
+            rendered.update({row.eo_id: html for row, html in zip(rows, bodies)})
+        return rendered
+
+    def start(self) -> None:
+        """Start the background sender thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background sender thread and close the SMTP connection"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.mailer.close()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._purge_if_due()
+            try:
+                claimed = self.run_once()
+            except Exception as e:
+                logger.warning("Email outbox run failed: %s", e)
+                claimed = 0
+
+            # Batch penuh: kemungkinan masih ada antrian, langsung lanjut
+            if claimed >= self.batch_size:
+                continue
+            self._wakeup.wait(self.poll_seconds)
+            self._wakeup.clear()
+
+email_worker = EmailOutboxWorker(settings.EMAIL_POLL_SECONDS, settings.EMAIL_BATCH_SIZE)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    logger.info("Email outbox sender started")
+    try:
+        email_worker._run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        email_worker.mailer.close()
@@ -0,0 +1,163 @@
+"""
+Background dependency checks for the readiness probe.
+
+A daemon thread runs the checks every ``HEALTH_CHECK_INTERVAL_SECONDS``
+and publishes an immutable snapshot; probe endpoints only read the latest
+snapshot, so they never wait on the database or Redis.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+from app.core.redis_client import redis_manager
+from app.db.shards import DEFAULT_SHARD, MAX_OVERFLOW, POOL_SIZE, shard_router
+
+logger = logging.getLogger(__name__)
+
+# Lag replikasi, hanya dilaporkan: di replica idle now() - replay terakhir terus naik tanpa ada
+# yang tertinggal, dan lag replica tidak membuat primary tidak siap
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN pg_is_in_recovery() THEN
+            COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+        ELSE
+            COALESCE((SELECT MAX(EXTRACT(EPOCH FROM replay_lag)) FROM pg_stat_replication), 0)
+    END
+""")
+
+class HealthChecker:
+    """Periodically checks the database shards and Redis against thresholds"""
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Latest check results; not ready when missing or stale"""
+        # Tanpa thread checker (mis. skrip/serverless) cek dijalankan inline saat kedaluwarsa
+        if self._thread is None and time.monotonic() - self._checked_at > self.interval_seconds:
+            try:
+                self.run_checks()
+            except Exception as e:
+                logger.warning("Health checks failed: %s", e)
+
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {"ready": False, "reason": "checks have not run yet", "checks": {}}
+
+        age = time.monotonic() - self._checked_at
+        if age > self.interval_seconds * 3:
+            return {**snapshot, "ready": False, "reason": f"checks are stale ({age:.0f}s old)"}
+        return snapshot
+
+    def run_checks(self) -> Dict[str, Any]:
+        """Run all checks once and publish the snapshot"""
+        checks: Dict[str, Any] = {}
+        for shard, engine in self._engines().items():
+            checks[f"database:{shard}"] = self._check_database(engine)
+        checks["redis"] = self._check_redis()
+
+        failed = [name for name, check in checks.items() if check.get("required", True) and not check["ok"]]
+        snapshot = {
+            "ready": not failed,
+            "reason": f"failing: {', '.join(failed)}" if failed else None,
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+            "checks": checks,
+        }
+        self._snapshot = snapshot
+        self._checked_at = time.monotonic()
+        return snapshot
+
+    def _engines(self):
+        # Shard default selalu dicek; shard lain hanya jika engine-nya sudah dipakai
+        engines = shard_router.engines()
+        engines.setdefault(DEFAULT_SHARD, shard_router.get_engine())
+        return engines
+
+    def _check_database(self, engine) -> Dict[str, Any]:
+        result: Dict[str, Any] = {}
+        pool = engine.pool
+        # NullPool (serverless) tidak punya batas pool di proses; saturasi ada di pooler eksternal
+        if isinstance(pool, QueuePool):
+            checked_out = pool.checkedout()
+            saturation = checked_out / (POOL_SIZE + MAX_OVERFLOW)
+            result.update(pool_checked_out=checked_out, pool_saturation=round(saturation, 3))
+
+            # Pool penuh: jangan ikut antre koneksi, langsung laporkan tidak siap
+            if saturation >= settings.HEALTH_MAX_POOL_SATURATION:
+                result.update(ok=False, error="connection pool saturated")
+                return result
+
+        try:
+            with engine.connect() as conn:
+                started = time.perf_counter()
+                conn.execute(text("SELECT 1"))
+                result["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+                result["ok"] = True
+                try:
+                    lag = float(conn.execute(REPLICA_LAG_SQL).scalar() or 0)
+                    result["replica_lag_seconds"] = round(lag, 3)
+                    result["replica_lag_exceeded"] = lag > settings.HEALTH_MAX_REPLICA_LAG_SECONDS
+                except Exception as e:
+                    result["replica_lag_error"] = str(e)
+        except Exception as e:
+            result.update(ok=False, error=str(e))
+        return result
+
+    def _check_redis(self) -> Dict[str, Any]:
+        if not redis_manager.configured:
+            return {"ok": True, "required": False, "status": "not configured"}
+
+        result: Dict[str, Any] = {
+            "required": settings.HEALTH_REQUIRE_REDIS,
+            "circuit": redis_manager.breaker.state,
+        }
+
+        def _ping(client) -> float:
+            started = time.perf_counter()
+            client.ping()
+            return (time.perf_counter() - started) * 1000
+
+        latency = redis_manager.execute(_ping)
+        if latency is None:
+            result.update(ok=False, error="unreachable")
+        elif latency > settings.HEALTH_MAX_REDIS_LATENCY_MS:
+            result.update(ok=False, latency_ms=round(latency, 2), error="latency above threshold")
+        else:
+            result.update(ok=True, latency_ms=round(latency, 2))
+        return result
+
+    def start(self) -> None:
+        """Start the background checker thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="health-checker", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background checker thread"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_checks()
+            except Exception as e:
+                logger.warning("Health checks failed: %s", e)
+            if self._stop.wait(self.interval_seconds):
+                break
+
+health_checker = HealthChecker(settings.HEALTH_CHECK_INTERVAL_SECONDS)
@@ -1,45 +1,185 @@
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
+import smtplib
+import ssl
+import threading
+import time
+from email.message import EmailMessage
+from email.utils import formataddr, make_msgid
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 
 from app.core.config import settings
+from app.core.metrics import EMAIL_SECONDS
+from app.core.tracing import traced
 
-# Konfigurasi berdasarkan settings
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=settings.MAIL_PASSWORD,
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_STARTTLS=settings.MAIL_STARTTLS,
-    MAIL_SSL_TLS=settings.MAIL_SSL_TLS,
-    USE_CREDENTIALS=True,
-    VALIDATE_CERTS=True,
-    TEMPLATE_FOLDER=Path(__file__).parent.parent / 'templates' / 'emails'
-)
-
-# Inisialisasi FastMail
-fm = FastMail(conf)
-
-async def send_email(
+TEMPLATE_FOLDER = Path(__file__).parent.parent / 'templates' / 'emails'
+
+class TemplateRegistry:
+    """
+    Email templates compiled once and cached by (name, locale).
+
+    A localized variant is a file named ``<base>.<locale>.<ext>``, e.g.
+    ``verify_email.en.html`` for ``verify_email.html``; files without a
+    locale suffix belong to ``EMAIL_DEFAULT_LOCALE``. Lookups fall back to
+    the default locale. Jinja2 is imported and the environment built on
+    first use, so importing this module stays cheap on cold starts.
+    """
+
+    def __init__(self, folder: Path, default_locale: str):
+        self.folder = folder
+        self.default_locale = default_locale
+        self._env: Any = None
+        self._templates: Dict[Tuple[str, str], Any] = {}
+
+    @property
+    def env(self):
+        if self._env is None:
+            from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+            self._env = Environment(
+                loader=FileSystemLoader(self.folder),
+                autoescape=select_autoescape(["html", "xml"]),
+                # Template sudah dikompilasi di registry; tidak perlu cek mtime file
+                auto_reload=False,
+            )
+        return self._env
+
+    def _split(self, filename: str) -> Tuple[str, str]:
+        """``verify_email.en.html`` -> (``verify_email.html``, ``en``)"""
+        parts = filename.split(".")
+        if len(parts) == 3:
+            return f"{parts[0]}.{parts[2]}", parts[1]
+        return filename, self.default_locale
+
+    def load(self) -> int:
+        """Compile every template in the folder. Returns the number loaded."""
+        templates: Dict[Tuple[str, str], Any] = {}
+        for path in sorted(self.folder.glob("*.*")):
+            name, locale = self._split(path.name)
+            templates[(name, locale)] = self.env.get_template(path.name)
+        self._templates = templates
+        return len(templates)
+
+    def get(self, name: str, locale: Optional[str] = None):
+        """Compiled template for ``name`` in ``locale`` (or the default locale)"""
+        locale = locale or self.default_locale
+        template = self._templates.get((name, locale)) or self._templates.get((name, self.default_locale))
+        if template is None:
+            # Belum di-load (mis. skrip tanpa lifespan): kompilasi sekali lalu simpan
+            template = self.env.get_template(name)
+            self._templates[(name, self.default_locale)] = template
+        return template
+
+    def render(self, name: str, body: Dict[str, Any], locale: Optional[str] = None) -> str:
+        return self.get(name, locale).render(body)
+
+    def render_many(
+        self,
+        name: str,
+        bodies: Iterable[Dict[str, Any]],
+        locale: Optional[str] = None,
+        shared: Optional[Dict[str, Any]] = None
+    ) -> List[str]:
+        """
+        Render one template for many recipients. The template is looked up
+        once; ``shared`` values are merged under each recipient's body.
+        """
+        template = self.get(name, locale)
+        if shared:
+            return [template.render({**shared, **body}) for body in bodies]
+        return [template.render(body) for body in bodies]
+
+email_templates = TemplateRegistry(TEMPLATE_FOLDER, settings.EMAIL_DEFAULT_LOCALE)
+
+def render_template(template_name: str, template_body: Dict[str, Any], locale: Optional[str] = None) -> str:
+    """Render an email template to HTML"""
+    return email_templates.render(template_name, template_body, locale)
+
+def build_message(subject: str, recipient: str, html: str) -> EmailMessage:
+    """Build a MIME message from the configured sender"""
+    message = EmailMessage()
+    message["Subject"] = subject
+    message["From"] = formataddr((settings.MAIL_FROM_NAME or "", settings.MAIL_FROM or ""))
+    message["To"] = recipient
+    message["Message-ID"] = make_msgid()
+    message.set_content(html, subtype="html")
+    return message
+
+class SMTPMailer:
+    """
+    Persistent SMTP connection reused across messages.
+
+    The connection is opened on first use, checked with NOOP after it has
+    been idle for ``MAIL_SMTP_IDLE_SECONDS`` and reopened once if the server
+    dropped it. Sends are serialized, so each sender thread should own one.
+    """
+
+    def __init__(self):
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        timeout = settings.MAIL_TIMEOUT_SECONDS
+        if settings.MAIL_SSL_TLS:
+            smtp: smtplib.SMTP = smtplib.SMTP_SSL(
+                settings.MAIL_SERVER or "localhost", settings.MAIL_PORT,
+                timeout=timeout, context=ssl.create_default_context()
+            )
+        else:
+            smtp = smtplib.SMTP(settings.MAIL_SERVER or "localhost", settings.MAIL_PORT, timeout=timeout)
+            if settings.MAIL_STARTTLS:
+                smtp.starttls(context=ssl.create_default_context())
+        if settings.MAIL_USERNAME and settings.MAIL_PASSWORD:
+            smtp.login(settings.MAIL_USERNAME, settings.MAIL_PASSWORD)
+        return smtp
+
+    def _connection(self) -> smtplib.SMTP:
+        if self._smtp is not None and time.monotonic() - self._last_used > settings.MAIL_SMTP_IDLE_SECONDS:
+            try:
+                self._smtp.noop()
+            except (smtplib.SMTPException, OSError):
+                self.close()
+        if self._smtp is None:
+            self._smtp = self._connect()
+        return self._smtp
+
+    @traced("SMTPMailer.send")
+    def send(self, message: EmailMessage) -> None:
+        """Send one message, reconnecting once if the connection was dropped"""
+        started = time.perf_counter()
+        with self._lock:
+            try:
+                try:
+                    self._connection().send_message(message)
+                except smtplib.SMTPServerDisconnected:
+                    self.close()
+                    self._connection().send_message(message)
+            except Exception:
+                EMAIL_SECONDS.labels("failure").observe(time.perf_counter() - started)
+                raise
+            self._last_used = time.monotonic()
+        EMAIL_SECONDS.labels("success").observe(time.perf_counter() - started)
+
+    def close(self) -> None:
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+
+def send_email(
     subject: str,
     recipient: str,
     template_name: str,
     template_body: Dict[str, Any]
 ):
     """
-    Mengirim email menggunakan template.
+    Mengirim satu email secara langsung (tanpa outbox), mis. dari skrip.
+    Alur request sebaiknya memakai EmailService.enqueue.
     """
+    mailer = SMTPMailer()
     try:
-        message = MessageSchema(
-            subject=subject,
-            recipients=[recipient],
-            template_body=template_body,
-            subtype="html"
-        )
-        await fm.send_message(message, template_name=template_name)
-    except Exception as e:
-        print(f"Error sending email: {e}")
-        # Di lingkungan produksi, Anda mungkin ingin log error ini
-        # atau menambahkannya ke sistem antrian jika pengiriman gagal.
\ No newline at end of file
+        mailer.send(build_message(subject, recipient, render_template(template_name, template_body)))
+    finally:
+        mailer.close()
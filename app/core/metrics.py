@@ -0,0 +1,172 @@
+"""
+Prometheus metrics.
+
+Works in multi-process mode: when ``PROMETHEUS_MULTIPROC_DIR`` is set
+(before the workers start) every worker writes its samples to that
+directory and ``/metrics`` aggregates them. The directory must be emptied
+between deployments.
+"""
+import os
+import re
+import threading
+import time
+from typing import Optional, Set
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from app.core.config import settings
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+# Bucket latensi HTTP (detik); bcrypt butuh bucket yang lebih lebar
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BCRYPT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 1, 2)
+
+HTTP_REQUESTS = Counter(
+    "atlas_http_requests_total", "HTTP requests", ["method", "route", "status", "tenant"]
+)
+HTTP_LATENCY = Histogram(
+    "atlas_http_request_duration_seconds", "HTTP request latency", ["method", "route"],
+    buckets=LATENCY_BUCKETS
+)
+HTTP_IN_FLIGHT = Gauge(
+    "atlas_http_requests_in_flight", "HTTP requests being served", multiprocess_mode="livesum"
+)
+
+LOGINS = Counter("atlas_login_total", "Login attempts", ["result", "tenant"])
+TOKEN_REFRESHES = Counter("atlas_token_refresh_total", "Access token refreshes", ["result"])
+BCRYPT_SECONDS = Histogram(
+    "atlas_bcrypt_duration_seconds", "bcrypt hash/verify time", ["operation"], buckets=BCRYPT_BUCKETS
+)
+PERMISSION_CACHE = Counter(
+    "atlas_permission_cache_total", "Role/permission lookups by the auth dependencies", ["result"]
+)
+EMAIL_SECONDS = Histogram(
+    "atlas_email_send_duration_seconds", "Email send latency", ["result"], buckets=LATENCY_BUCKETS
+)
+EMAIL_QUEUE_DEPTH = Gauge(
+    "atlas_email_outbox_pending", "Emails waiting in the outbox", multiprocess_mode="livemax"
+)
+EMAIL_THROTTLE = Counter(
+    "atlas_email_throttle_total", "Unauthenticated email requests by throttling outcome", ["outcome"]
+)
+EMAIL_OUTBOX_MESSAGES = Counter(
+    "atlas_email_outbox_messages_total", "Outbox delivery attempts by outcome", ["result"]
+)
+
+AUDIT_EVENTS = Counter(
+    "atlas_audit_events_total", "Audit events by outcome (recorded, written, dropped, failed)", ["result"]
+)
+AUDIT_BUFFER_DEPTH = Gauge(
+    "atlas_audit_buffer_events", "Audit events waiting in the in-memory buffer", multiprocess_mode="livesum"
+)
+ACTIVITY_UPDATES = Counter(
+    "atlas_activity_updates_total", "User activity rows written, and failed flushes", ["result"]
+)
+ACTIVITY_PENDING = Gauge(
+    "atlas_activity_pending_users", "Users with activity not yet written", multiprocess_mode="livesum"
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "atlas_db_pool_checked_out", "Connections checked out of the pool", ["shard"],
+    multiprocess_mode="livesum"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "atlas_db_pool_overflow", "Overflow connections in use", ["shard"], multiprocess_mode="livesum"
+)
+DB_POOL_WAIT = Histogram(
+    "atlas_db_pool_wait_seconds", "Time spent waiting for a pooled connection", ["shard"],
+    buckets=LATENCY_BUCKETS
+)
+
+# Label tenant dibatasi: tenant di luar METRICS_MAX_TENANTS pertama dilaporkan sebagai "other"
+_TENANT_PATTERN = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]{0,62}$")
+_tenant_labels: Set[str] = set()
+_tenant_lock = threading.Lock()
+
+def tenant_label(schema: Optional[str]) -> str:
+    """Bounded-cardinality tenant label for a (possibly unvalidated) schema name"""
+    if not schema:
+        return settings.DEFAULT_SCHEMA
+    if schema in _tenant_labels:
+        return schema
+    if not _TENANT_PATTERN.match(schema):
+        return "invalid"
+
+    # Import lokal: catalog bergantung pada app.db.session
+    from app.db.tenant_catalog import tenant_catalog
+    # Dipanggil dari middleware async: hanya snapshot in-memory, tanpa refresh ke DB
+    if schema != settings.DEFAULT_SCHEMA and tenant_catalog.peek(schema) is None:
+        return "unknown"
+
+    with _tenant_lock:
+        if len(_tenant_labels) >= settings.METRICS_MAX_TENANTS:
+            return "other"
+        _tenant_labels.add(schema)
+    return schema
+
+class PrometheusMiddleware:
+    """ASGI middleware recording per-route latency, status codes and in-flight requests"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.dec()
+
+            # Pakai template route (/users/{user_id}), bukan path mentah, agar label tetap terbatas
+            route = scope.get("route")
+            route_label = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            tenant = None
+            for name, value in scope.get("headers", []):
+                if name == b"x-tenant-schema":
+                    tenant = value.decode("latin-1")
+                    break
+
+            HTTP_LATENCY.labels(method, route_label).observe(elapsed)
+            HTTP_REQUESTS.labels(method, route_label, str(status_code), tenant_label(tenant)).inc()
+
+def record_pool_state(shard: str, pool) -> None:
+    """Update pool gauges from a QueuePool (called on checkout/checkin)"""
+    DB_POOL_CHECKED_OUT.labels(shard).set(pool.checkedout())
+    DB_POOL_OVERFLOW.labels(shard).set(max(pool.overflow(), 0))
+
+def render_metrics() -> bytes:
+    """Exposition output for /metrics (aggregated over workers in multi-process mode)"""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges on shutdown (multi-process mode)"""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
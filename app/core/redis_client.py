@@ -0,0 +1,239 @@
+"""
+Process-wide Redis clients.
+
+One bounded, blocking connection pool per flavor (sync and asyncio) is
+shared by the whole process. Every call goes through a circuit breaker:
+after ``REDIS_BREAKER_THRESHOLD`` consecutive failures Redis is skipped
+for ``REDIS_BREAKER_RESET_SECONDS`` and callers fall back to their
+DB-only path instead of waiting on socket timeouts.
+"""
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, TypeVar, cast
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker (closed -> open -> half-open).
+    Half-open admits a single probe call; everyone else keeps falling back
+    until the probe records its outcome.
+    """
+
+    def __init__(self, threshold: int, reset_seconds: float):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may go to Redis; in half-open this claims the probe"""
+        state = self.state
+        if state != "half-open":
+            return state == "closed"
+        with self._lock:
+            now = time.monotonic()
+            # Probe yang tidak pernah melapor (mis. exception lain) dianggap hilang setelah reset_seconds
+            if self._probe_started is not None and now - self._probe_started < self.reset_seconds:
+                return False
+            self._probe_started = now
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_started = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_started = None
+            if self._failures >= self.threshold or self._opened_at is not None:
+                if self._opened_at is None:
+                    logger.warning("Redis circuit opened after %d failures", self._failures)
+                self._opened_at = time.monotonic()
+
+class RedisManager:
+    """Shared sync/async Redis clients with pipelined batch helpers"""
+
+    def __init__(
+        self,
+        url: Optional[str],
+        max_connections: int,
+        socket_timeout: float,
+        pool_timeout: float,
+        breaker: CircuitBreaker
+    ):
+        self.url = url
+        self.max_connections = max_connections
+        self.socket_timeout = socket_timeout
+        self.pool_timeout = pool_timeout
+        self.breaker = breaker
+        self._client: Optional[redis.Redis] = None
+        self._async_client: Optional[aioredis.Redis] = None
+        self._lock = threading.Lock()
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.url)
+
+    @property
+    def available(self) -> bool:
+        """Redis is configured and the circuit is not open (does not claim the half-open probe)"""
+        return self.configured and self.breaker.state != "open"
+
+    def _pool_kwargs(self) -> Dict[str, Any]:
+        return {
+            "max_connections": self.max_connections,
+            "timeout": self.pool_timeout,
+            "socket_timeout": self.socket_timeout,
+            "socket_connect_timeout": self.socket_timeout,
+            "decode_responses": True,
+        }
+
+    def start(self) -> None:
+        """Create both clients (connections are opened on first use)"""
+        self.client()
+        self.async_client()
+
+    def client(self) -> Optional[redis.Redis]:
+        """Shared sync client, or None when not configured"""
+        if not self.url:
+            return None
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    pool = redis.BlockingConnectionPool.from_url(self.url, **self._pool_kwargs())
+                    self._client = redis.Redis(connection_pool=pool)
+        return self._client
+
+    def async_client(self) -> Optional[aioredis.Redis]:
+        """Shared asyncio client, or None when not configured"""
+        if not self.url:
+            return None
+        if self._async_client is None:
+            with self._lock:
+                if self._async_client is None:
+                    pool = aioredis.BlockingConnectionPool.from_url(self.url, **self._pool_kwargs())
+                    self._async_client = aioredis.Redis(connection_pool=pool)
+        return self._async_client
+
+    def execute(self, operation: Callable[[redis.Redis], T], default: Optional[T] = None) -> Optional[T]:
+        """
+        Run ``operation`` with the sync client under the circuit breaker.
+        Returns ``default`` when Redis is unconfigured, the circuit is open
+        or the call fails.
+        """
+        client = self.client()
+        if client is None or not self.breaker.allow():
+            return default
+        try:
+            result = operation(client)
+        except redis.RedisError as e:
+            self.breaker.record_failure()
+            logger.debug("Redis call failed: %s", e)
+            return default
+        self.breaker.record_success()
+        return result
+
+    async def aexecute(
+        self, operation: Callable[[aioredis.Redis], Awaitable[T]], default: Optional[T] = None
+    ) -> Optional[T]:
+        """Async counterpart of ``execute``"""
+        client = self.async_client()
+        if client is None or not self.breaker.allow():
+            return default
+        try:
+            result = await operation(client)
+        except redis.RedisError as e:
+            self.breaker.record_failure()
+            logger.debug("Redis call failed: %s", e)
+            return default
+        self.breaker.record_success()
+        return result
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[str]]:
+        """MGET in one round trip; all None when Redis is unavailable"""
+        if not keys:
+            return []
+        values = self.execute(lambda client: cast(List[Optional[str]], client.mget(keys)))
+        return list(values) if values is not None else [None] * len(keys)
+
+    def set_many(self, mapping: Dict[str, str], ttl: Optional[int] = None) -> bool:
+        """Pipelined SET of all keys (with optional TTL in seconds)"""
+        if not mapping:
+            return True
+
+        def _set(client: redis.Redis) -> bool:
+            pipe = client.pipeline(transaction=False)
+            for key, value in mapping.items():
+                pipe.set(key, value, ex=ttl)
+            pipe.execute()
+            return True
+
+        return bool(self.execute(_set, default=False))
+
+    async def aget_many(self, keys: Sequence[str]) -> List[Optional[str]]:
+        if not keys:
+            return []
+        values = await self.aexecute(lambda client: client.mget(keys))
+        return list(values) if values is not None else [None] * len(keys)
+
+    async def aset_many(self, mapping: Dict[str, str], ttl: Optional[int] = None) -> bool:
+        if not mapping:
+            return True
+
+        async def _set(client: aioredis.Redis) -> bool:
+            pipe = client.pipeline(transaction=False)
+            for key, value in mapping.items():
+                pipe.set(key, value, ex=ttl)
+            await pipe.execute()
+            return True
+
+        return bool(await self.aexecute(_set, default=False))
+
+    async def aping(self) -> Optional[float]:
+        """Round-trip latency in milliseconds, or None when unavailable"""
+        async def _ping(client: aioredis.Redis) -> float:
+            started = time.perf_counter()
+            await client.ping()
+            return (time.perf_counter() - started) * 1000
+
+        return await self.aexecute(_ping)
+
+    async def aclose(self) -> None:
+        """Close both pools (shutdown)"""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        if self._client is not None:
+            self._client.close()
+            self._client.connection_pool.disconnect()
+            self._client = None
+
+redis_manager = RedisManager(
+    settings.REDIS_URL,
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+    socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+    pool_timeout=settings.REDIS_POOL_TIMEOUT,
+    breaker=CircuitBreaker(settings.REDIS_BREAKER_THRESHOLD, settings.REDIS_BREAKER_RESET_SECONDS),
+)
@@ -0,0 +1,90 @@
+"""
+Fast response serialization.
+
+Services return models that were validated exactly once. These helpers
+wrap them in the standard envelopes with ``model_construct`` (no second
+validation) and serialize with pydantic-core straight to bytes. Because a
+``Response`` is returned, FastAPI skips ``response_model`` validation and
+serialization, while the declared ``response_model`` still drives OpenAPI.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Type
+
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+from app.schemas.common import DataResponse, PaginationResponse
+
+def json_response(
+    model: BaseModel,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """Serialize an already-validated model once, without re-validation"""
+    return Response(
+        content=model.model_dump_json(),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json"
+    )
+
+def data_response(
+    schema: Type[BaseModel],
+    message: str,
+    data: Optional[BaseModel],
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """DataResponse[schema] envelope around a validated model"""
+    envelope = DataResponse[schema].model_construct(  # type: ignore[valid-type]
+        success=True,
+        message=message,
+        data=data
+    )
+    return json_response(envelope, headers=headers)
+
+def page_response(
+    schema: Type[BaseModel],
+    message: str,
+    data: Sequence[BaseModel],
+    total: int,
+    skip: int,
+    limit: int,
+    headers: Optional[Dict[str, str]] = None,
+    total_capped: bool = False
+) -> Response:
+    """PaginationResponse[schema] envelope around validated models"""
+    envelope = PaginationResponse[schema].model_construct(  # type: ignore[valid-type]
+        success=True,
+        message=message,
+        data=list(data),
+        total=total,
+        page=skip // limit + 1,
+        size=limit,
+        pages=(total + limit - 1) // limit,
+        total_capped=total_capped
+    )
+    return json_response(envelope, headers=headers)
+
+def sparse_page_response(
+    message: str,
+    data: List[Dict[str, Any]],
+    total: int,
+    skip: int,
+    limit: int,
+    headers: Optional[Dict[str, str]] = None,
+    total_capped: bool = False
+) -> ORJSONResponse:
+    """
+    Pagination envelope for sparse fieldset results (plain row dicts),
+    encoded directly with orjson.
+    """
+    return ORJSONResponse(content={
+        "success": True,
+        "message": message,
+        "data": data,
+        "total": total,
+        "page": skip // limit + 1,
+        "size": limit,
+        "pages": (total + limit - 1) // limit,
+        "total_capped": total_capped,
+    }, headers=headers)
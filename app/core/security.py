@@ -7,6 +7,7 @@ from passlib.context import CryptContext
 import hmac
 
 from app.core.config import settings
+from app.core.metrics import BCRYPT_SECONDS
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -105,11 +106,13 @@ def verify_token(token: str) -> Optional[Dict[str, Any]]:
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password"""
-    return pwd_context.verify(plain_password, hashed_password)
+    with BCRYPT_SECONDS.labels("verify").time():
+        return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Hash password"""
-    return pwd_context.hash(password)
+    with BCRYPT_SECONDS.labels("hash").time():
+        return pwd_context.hash(password)
 
 def create_short_lived_token(data: Dict[str, Any], expires_delta: timedelta) -> str:
     """Create token JWT with custom expiration"""
@@ -0,0 +1,57 @@
+"""
+Startup timing.
+
+``app.main`` wraps its import groups and lifespan steps in
+``startup_timer.stage(...)``. The report is logged once startup finishes
+and included in ``GET /api/v1/health/readyz``. To measure a cold start from a
+fresh interpreter:
+
+    python -m app.core.startup
+"""
+import json
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+class StartupTimer:
+    """Records the duration of named startup stages"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: List[Tuple[str, float]] = []
+        self.finished_at = None
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - started))
+
+    def finish(self) -> None:
+        """Mark startup as complete and log the report"""
+        self.finished_at = time.perf_counter()
+        logger.info("Startup finished: %s", json.dumps(self.report()))
+
+    def report(self) -> Dict[str, Any]:
+        end = self.finished_at or time.perf_counter()
+        return {
+            "stages_ms": {name: round(elapsed * 1000, 1) for name, elapsed in self.stages},
+            "total_ms": round((end - self.started) * 1000, 1),
+            "complete": self.finished_at is not None,
+        }
+
+startup_timer = StartupTimer()
+
+if __name__ == "__main__":
+    import importlib
+
+    started = time.perf_counter()
+    importlib.import_module("app.main")
+    report = startup_timer.report()
+    report["import_app_main_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    print(json.dumps(report, indent=2))
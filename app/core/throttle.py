@@ -0,0 +1,122 @@
+"""
+Sliding-window throttling and short-lived negative lookup caching for the
+unauthenticated email endpoints.
+
+Counters use the sliding-window counter approximation: the current fixed
+window's count plus the previous window's count weighted by how much of
+it still overlaps the sliding window. That is O(1) per key, and with
+Redis it is one pipelined round trip. Without Redis (or while the Redis
+circuit is open) counters are kept per process.
+"""
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import redis
+
+from app.core.config import settings
+from app.core.redis_client import RedisManager, redis_manager
+
+class SlidingWindowLimiter:
+    """Approximate sliding-window rate limiter backed by Redis or process memory"""
+
+    # Batas jumlah key in-memory sebelum key kedaluwarsa dibersihkan
+    MAX_LOCAL_KEYS = 100_000
+
+    def __init__(self, manager: RedisManager, prefix: str = "atlas:throttle"):
+        self.manager = manager
+        self.prefix = prefix
+        self._local: Dict[str, Tuple[int, int, int]] = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: int, window_seconds: int) -> Tuple[bool, int]:
+        """
+        Count one request for ``key``. Returns ``(allowed, retry_after)``;
+        ``retry_after`` is the number of seconds until the next request fits.
+        """
+        now = time.time()
+        window = int(now // window_seconds)
+        elapsed = (now % window_seconds) / window_seconds
+
+        counts = self._redis_hit(key, window, window_seconds)
+        if counts is None:
+            counts = self._local_hit(key, window)
+        current, previous = counts
+
+        estimated = current + previous * (1 - elapsed)
+        if estimated <= limit:
+            return True, 0
+        return False, max(1, int(window_seconds * (1 - elapsed)))
+
+    def _redis_hit(self, key: str, window: int, window_seconds: int) -> Optional[Tuple[int, int]]:
+        if not self.manager.available:
+            return None
+        current_key = f"{self.prefix}:{key}:{window}"
+        previous_key = f"{self.prefix}:{key}:{window - 1}"
+
+        def _hit(client: redis.Redis) -> Tuple[int, int]:
+            pipe = client.pipeline(transaction=False)
+            pipe.incr(current_key)
+            pipe.expire(current_key, window_seconds * 2)
+            pipe.get(previous_key)
+            current, _, previous = pipe.execute()
+            return int(current), int(previous or 0)
+
+        return self.manager.execute(_hit)
+
+    def _local_hit(self, key: str, window: int) -> Tuple[int, int]:
+        with self._lock:
+            entry_window, current, previous = self._local.get(key, (window, 0, 0))
+            if entry_window == window - 1:
+                previous, current = current, 0
+            elif entry_window != window:
+                previous, current = 0, 0
+            current += 1
+            self._local[key] = (window, current, previous)
+
+            if len(self._local) > self.MAX_LOCAL_KEYS:
+                self._local = {
+                    k: v for k, v in self._local.items() if v[0] >= window - 1
+                }
+            return current, previous
+
+class NegativeCache:
+    """Remembers lookups that found nothing, for ``ttl_seconds``"""
+
+    MAX_LOCAL_KEYS = 100_000
+
+    def __init__(self, manager: RedisManager, ttl_seconds: int, prefix: str = "atlas:negative"):
+        self.manager = manager
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self._local: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def contains(self, key: str) -> bool:
+        if self.manager.available:
+            exists = self.manager.execute(lambda client: client.exists(f"{self.prefix}:{key}"))
+            if exists is not None:
+                return bool(exists)
+        expires_at = self._local.get(key)
+        return expires_at is not None and expires_at > time.monotonic()
+
+    def add(self, key: str) -> None:
+        if self.manager.available and self.manager.set_many({f"{self.prefix}:{key}": "1"}, ttl=self.ttl_seconds):
+            return
+        with self._lock:
+            now = time.monotonic()
+            if len(self._local) >= self.MAX_LOCAL_KEYS:
+                self._local = {k: v for k, v in self._local.items() if v > now}
+            self._local[key] = now + self.ttl_seconds
+
+    def discard(self, key: str) -> None:
+        """Forget a key (e.g. after a user with that email was created)"""
+        self.manager.execute(lambda client: client.delete(f"{self.prefix}:{key}"))
+        with self._lock:
+            self._local.pop(key, None)
+
+email_limiter = SlidingWindowLimiter(redis_manager)
+missing_email_cache = NegativeCache(redis_manager, settings.EMAIL_NEGATIVE_CACHE_SECONDS)
+
+def missing_email_key(tenant: str, email: str) -> str:
+    return f"{tenant}:{email}"
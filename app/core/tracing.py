@@ -0,0 +1,215 @@
+"""
+Optional OpenTelemetry tracing.
+
+Disabled unless ``TRACING_ENABLED=true`` and the OpenTelemetry SDK is
+installed. While disabled, ``traced`` wrappers and ``span`` only check a
+module global, so instrumented code pays next to nothing.
+
+Exporters (``TRACING_EXPORTER``):
+
+* ``console`` - one JSON span per line on stdout
+* ``file``    - one JSON span per line appended to ``TRACING_FILE_PATH``
+* ``otlp``    - OTLP/HTTP to ``TRACING_OTLP_ENDPOINT`` (needs
+  ``opentelemetry-exporter-otlp-proto-http``)
+"""
+import functools
+import inspect
+import logging
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Tracer aktif; None berarti tracing nonaktif
+_tracer: Any = None
+
+def setup_tracing() -> bool:
+    """Configure the tracer provider and SQL spans. Returns True when enabled."""
+    global _tracer
+    if not settings.TRACING_ENABLED or _tracer is not None:
+        return _tracer is not None
+
+    try:
+        from opentelemetry import trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    except ImportError:
+        logger.warning("TRACING_ENABLED is set but opentelemetry-sdk is not installed; tracing disabled")
+        return False
+
+    exporter = _build_exporter(settings.TRACING_EXPORTER)
+    if exporter is None:
+        return False
+
+    provider = TracerProvider(
+        resource=Resource.create({
+            "service.name": settings.APP_NAME.lower(),
+            "service.version": settings.APP_VERSION,
+        }),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)),
+    )
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer("atlas")
+
+    _instrument_sqlalchemy()
+    logger.info("Tracing enabled (%s exporter)", settings.TRACING_EXPORTER)
+    return True
+
+def shutdown_tracing() -> None:
+    """Flush pending spans"""
+    if _tracer is None:
+        return
+    from opentelemetry import trace
+
+    provider = trace.get_tracer_provider()
+    if hasattr(provider, "shutdown"):
+        provider.shutdown()
+
+def _build_exporter(name: str):
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+    def one_line(span) -> str:
+        return span.to_json(indent=None) + "\n"
+
+    if name == "console":
+        return ConsoleSpanExporter(formatter=one_line)
+    if name == "file":
+        return ConsoleSpanExporter(
+            out=open(settings.TRACING_FILE_PATH, "a", buffering=1, encoding="utf-8"),
+            formatter=one_line,
+        )
+    if name == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            logger.warning("OTLP exporter requested but opentelemetry-exporter-otlp-proto-http is not installed")
+            return None
+        if settings.TRACING_OTLP_ENDPOINT:
+            return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+        return OTLPSpanExporter()
+
+    logger.warning("Unknown TRACING_EXPORTER %r; tracing disabled", name)
+    return None
+
+def _instrument_sqlalchemy() -> None:
+    """One span per SQL statement on every engine"""
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        span = _tracer.start_span(
+            statement.split(None, 1)[0].upper() if statement else "SQL",
+            kind=SpanKind.CLIENT,
+            attributes={
+                "db.system": "postgresql",
+                "db.statement": statement[:2000],
+                "db.name": conn.engine.url.database or "",
+            },
+        )
+        context._atlas_span = span
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_atlas_span", None)
+        if span is not None:
+            span.set_attribute("db.rowcount", cursor.rowcount)
+            span.end()
+
+    @event.listens_for(Engine, "handle_error")
+    def _error(exception_context):
+        context = exception_context.execution_context
+        span = getattr(context, "_atlas_span", None) if context is not None else None
+        if span is not None:
+            span.set_status(Status(StatusCode.ERROR, str(exception_context.original_exception)))
+            span.end()
+
+def traced(name: Optional[str] = None) -> Callable[[F], F]:
+    """
+    Decorator recording a span around each call of a sync or async function.
+    Keeps the wrapped signature, so it is safe on FastAPI dependencies.
+    """
+    def decorator(func: F) -> F:
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if _tracer is None:
+                    return await func(*args, **kwargs)
+                with _tracer.start_as_current_span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with _tracer.start_as_current_span(span_name):
+                return func(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+def span(name: str, attributes: Optional[Dict[str, Any]] = None):
+    """Context manager for an ad-hoc span (no-op while tracing is disabled)"""
+    if _tracer is None:
+        return nullcontext()
+    return _tracer.start_as_current_span(name, attributes=attributes)
+
+def set_span_attributes(attributes: Dict[str, Any]) -> None:
+    """Attach attributes (e.g. tenant, user) to the current span"""
+    if _tracer is None:
+        return
+    from opentelemetry import trace
+
+    current = trace.get_current_span()
+    for key, value in attributes.items():
+        if value is not None:
+            current.set_attribute(key, value)
+
+class TracingMiddleware:
+    """ASGI middleware opening the server span of each HTTP request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if _tracer is None or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        from opentelemetry import propagate
+        from opentelemetry.trace import SpanKind, Status, StatusCode
+
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope.get("headers", [])}
+        with _tracer.start_as_current_span(
+            f"{scope['method']} {scope['path']}",
+            context=propagate.extract(headers),
+            kind=SpanKind.SERVER,
+            attributes={
+                "http.method": scope["method"],
+                "http.target": scope["path"],
+                "atlas.tenant": headers.get("x-tenant-schema", settings.DEFAULT_SCHEMA),
+            },
+        ) as request_span:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    request_span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        request_span.set_status(Status(StatusCode.ERROR))
+                    if "route" in scope:
+                        # Nama span memakai template route agar bisa dikelompokkan
+                        request_span.update_name(f"{scope['method']} {scope['route'].path}")
+                        request_span.set_attribute("http.route", scope["route"].path)
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,149 @@
+"""
+Per-tenant version counters for collections and entities.
+
+Repositories bump counters after every committed write; readers combine
+the counters relevant to a response into a strong ETag, or use them as
+the validity key of cached authorization data. Counters live in Redis
+(shared by all workers). Without ``REDIS_URL``, or while the Redis
+circuit is open, no versions are available, so ETags and cached
+authorization data are skipped.
+"""
+import hashlib
+import logging
+import secrets
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, List, Optional, Set, Tuple, cast
+
+import redis
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.redis_client import RedisManager, redis_manager
+
+logger = logging.getLogger(__name__)
+
+def collection_key(collection: str) -> str:
+    return f"c:{collection}"
+
+def entity_key(collection: str, entity_id: Any) -> str:
+    return f"e:{collection}:{entity_id}"
+
+def user_roles_key(user_id: Any) -> str:
+    """Version of one user's role assignments"""
+    return f"e:users:{user_id}:roles"
+
+def user_access_keys(user_id: Any) -> List[str]:
+    """Counters that invalidate a user's roles/permissions"""
+    return [
+        user_roles_key(user_id),
+        collection_key("roles"),
+        collection_key("applications"),
+    ]
+
+def session_tenant(db: Session) -> str:
+    """Tenant schema a session is bound to"""
+    return db.info.get("tenant_schema", settings.DEFAULT_SCHEMA)
+
+class VersionStore:
+    """Version counters, stored in a Redis hash per tenant"""
+
+    # Epoch acak per tenant: jika hash hilang (flush/eviction), ETag lama tidak akan cocok lagi
+    EPOCH_FIELD = "epoch"
+
+    def __init__(self, manager: RedisManager):
+        self.manager = manager
+        # Tenant yang bump-nya gagal; epoch-nya diganti begitu Redis kembali
+        self._stale: Set[str] = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _hash_key(tenant: str) -> str:
+        return f"atlas:versions:{tenant}"
+
+    def bump(self, tenant: str, keys: Iterable[str]) -> None:
+        """Increment the given counters (best effort)"""
+        keys = list(keys)
+        # Tanpa Redis tidak ada pembaca versi (get_many selalu None)
+        if not keys or not self.manager.configured:
+            return
+
+        def _bump(client: redis.Redis) -> bool:
+            pipe = client.pipeline(transaction=False)
+            for key in keys:
+                pipe.hincrby(self._hash_key(tenant), key, 1)
+            pipe.execute()
+            return True
+
+        if not self.manager.execute(_bump, default=False):
+            logger.warning("Version bump skipped for %s (Redis unavailable)", tenant)
+            with self._lock:
+                self._stale.add(tenant)
+
+    def get_many(self, tenant: str, keys: List[str]) -> Optional[Tuple[Any, ...]]:
+        """
+        Current values of the given counters, prefixed with the tenant epoch.
+        Returns None when Redis is not configured or unreachable (callers
+        must then skip ETags and caching).
+        """
+        # Counter in-process tidak terlihat oleh worker lain: role yang dicabut
+        # bisa tetap berlaku di cache worker lain, jadi tanpa Redis tidak ada versi
+        if not self.manager.configured:
+            return None
+
+        fields = [self.EPOCH_FIELD] + keys
+
+        def _get(client: redis.Redis) -> Tuple[Any, ...]:
+            if tenant in self._stale:
+                # Ada write yang tidak tercatat: batalkan semua ETag/cache tenant ini
+                client.hset(self._hash_key(tenant), self.EPOCH_FIELD, secrets.token_hex(8))
+                with self._lock:
+                    self._stale.discard(tenant)
+            values = cast(List[Any], client.hmget(self._hash_key(tenant), fields))
+            if values[0] is None:
+                client.hsetnx(self._hash_key(tenant), self.EPOCH_FIELD, secrets.token_hex(8))
+                values = cast(List[Any], client.hmget(self._hash_key(tenant), fields))
+            return tuple(values[0:1]) + tuple(int(v or 0) for v in values[1:])
+
+        return self.manager.execute(_get)
+
+class VersionedCache:
+    """
+    Small in-process LRU whose entries are valid only while the version
+    tuple they were stored with is still current.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[Tuple[Any, ...], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, versions: Tuple[Any, ...]) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != versions:
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[1]
+
+    def set(self, key: Hashable, versions: Tuple[Any, ...], value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (versions, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+def compute_etag(tenant: str, scope: str, versions: Tuple[Any, ...]) -> str:
+    """Strong ETag from the tenant, request scope and counter values"""
+    digest = hashlib.sha256(f"{tenant}|{scope}|{versions}".encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluate an If-None-Match header against a strong ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+version_store = VersionStore(redis_manager)
+access_cache = VersionedCache()
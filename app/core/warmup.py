@@ -0,0 +1,170 @@
+"""
+Startup warm-up.
+
+Runs in a background thread started by the lifespan, so liveness answers
+right away while ``/health/readyz`` reports not-ready until it finishes:
+
+1. fill each shard's pool with ``POOL_SIZE`` open connections
+2. load the tenant catalog and run the login/refresh/permission queries
+   once, so their SQL is compiled and cached by SQLAlchemy
+3. initialize the bcrypt and JWT backends
+4. optionally load roles and permissions of the most recently active users
+   of ``WARMUP_TENANTS`` into the in-process access cache
+
+Each step is best effort: a failure is logged and the next step runs.
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class Warmup:
+    """Runs the warm-up steps once and records how long each took"""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.steps: Dict[str, Any] = {}
+
+    @property
+    def finished(self) -> bool:
+        return self._done.is_set()
+
+    def report(self) -> Dict[str, Any]:
+        return {"finished": self.finished, "steps": dict(self.steps)}
+
+    def start(self) -> None:
+        """Run the warm-up in a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._done.clear()
+        self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+        self._thread.start()
+
+    def skip(self) -> None:
+        """Mark warm-up as done without running it (disabled or serverless)"""
+        self._done.set()
+
+    def run(self) -> None:
+        started = time.perf_counter()
+        try:
+            self._step("pool", self.fill_pools)
+            self._step("queries", self.run_hot_queries)
+            self._step("crypto", self.init_crypto)
+            if settings.WARMUP_TENANTS:
+                self._step("permissions", self.preload_permissions)
+        finally:
+            self._done.set()
+            logger.info("Warm-up finished in %.0f ms: %s", (time.perf_counter() - started) * 1000, self.steps)
+
+    def _step(self, name: str, step: Callable[[], Any]) -> None:
+        started = time.perf_counter()
+        try:
+            result = step()
+            self.steps[name] = {"ok": True, "ms": round((time.perf_counter() - started) * 1000, 1)}
+            if result is not None:
+                self.steps[name]["result"] = result
+        except Exception as e:
+            logger.warning("Warm-up step %s failed: %s", name, e)
+            self.steps[name] = {"ok": False, "error": str(e)}
+
+    def fill_pools(self) -> Dict[str, int]:
+        """Open POOL_SIZE connections per shard, then return them to the pool"""
+        from app.db.shards import POOL_SIZE, shard_router
+
+        opened: Dict[str, int] = {}
+        for shard in shard_router.shard_names:
+            engine = shard_router.get_engine(shard)
+            if not isinstance(engine.pool, QueuePool):
+                continue
+            # Ditahan bersamaan agar pool benar-benar berisi POOL_SIZE koneksi
+            connections = []
+            try:
+                for _ in range(POOL_SIZE):
+                    connections.append(engine.connect())
+            finally:
+                for connection in connections:
+                    connection.close()
+            opened[shard] = len(connections)
+        return opened
+
+    def run_hot_queries(self) -> Optional[str]:
+        """Execute the per-request queries once against one tenant"""
+        from app.db.session import open_tenant_session
+        from app.db.tenant_catalog import tenant_catalog
+        from app.repositories.refresh_token import RefreshTokenRepository
+        from app.repositories.user import UserRepository
+        from app.repositories.user_role import UserRoleRepository
+        from app.schemas.user import UserFilter
+
+        tenant_catalog.refresh()
+        tenants = settings.WARMUP_TENANTS or [
+            t.t_schema_name for t in tenant_catalog.all() if t.t_status == "active"
+        ]
+        if not tenants:
+            return None
+
+        user_repo = UserRepository()
+        user_role_repo = UserRoleRepository()
+        db = open_tenant_session(tenants[0])
+        try:
+            # Id/nama yang tidak ada: cukup untuk kompilasi SQL dan plan, tanpa efek samping
+            user_repo.get_by_username_or_email(db, "__warmup__")
+            user_repo.get_by_email(db, "warmup@invalid")
+            user_repo.get(db, 0)
+            user_repo.search(db, UserFilter(), skip=0, limit=1)
+            user_repo.count_search(db, UserFilter())
+            user_role_repo.get_user_roles_with_details(db, 0)
+            user_role_repo.get_user_roles_with_permissions(db, 0)
+            RefreshTokenRepository().get_by_user_id(db, 0)
+        finally:
+            db.close()
+        return tenants[0]
+
+    def init_crypto(self) -> None:
+        """Load the bcrypt backend and the JWT signing path"""
+        from app.core.security import Security, pwd_context
+
+        pwd_context.verify("warmup", pwd_context.hash("warmup"))
+        Security.verify_token(Security.create_access_token({"sub": "0"}), "access")
+
+    def preload_permissions(self) -> Dict[str, int]:
+        """Cache roles/permissions of the latest active users of WARMUP_TENANTS"""
+        from app.db.session import open_tenant_session
+        from app.db.tenant_catalog import tenant_catalog
+        from app.models.refresh_token import RefreshToken
+        from app.services.user_role import UserRoleService
+
+        service = UserRoleService()
+        loaded: Dict[str, int] = {}
+        for tenant in settings.WARMUP_TENANTS:
+            if tenant_catalog.get(tenant) is None:
+                logger.warning("Warm-up tenant %s is not registered", tenant)
+                continue
+
+            db = open_tenant_session(tenant)
+            try:
+                # User aktif = pemilik refresh token terbaru
+                user_ids: List[int] = list(db.execute(
+                    select(RefreshToken.rt_user_id)
+                    .group_by(RefreshToken.rt_user_id)
+                    .order_by(func.max(RefreshToken.created_at).desc())
+                    .limit(settings.WARMUP_USERS_PER_TENANT)
+                ).scalars().all())
+                for user_id in user_ids:
+                    service.get_cached_user_roles(db, user_id)
+                    service.get_cached_user_permissions(db, user_id)
+                db.rollback()
+            finally:
+                db.close()
+            loaded[tenant] = len(user_ids)
+        return loaded
+
+warmup = Warmup()
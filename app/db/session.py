@@ -1,53 +1,171 @@
-from sqlalchemy import create_engine, text
+import logging
+import re
+from sqlalchemy import event, text
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import sessionmaker, Session
 from typing import Generator
+from app.core.activity import PENDING_KEY as ACTIVITY_PENDING_KEY, activity_tracker
+from app.core.audit import PENDING_KEY as AUDIT_PENDING_KEY, audit_log
+from app.core.change_feed import change_feed
 from app.core.config import settings
-from fastapi import Header
+from app.core.tracing import set_span_attributes, span, traced
+from app.db.shards import DEFAULT_SHARD, shard_router
+from app.db.tenant_catalog import tenant_catalog
+from fastapi import Header, HTTPException, status, Depends
 from typing import Optional
 
-# Normalisasi URL database (postgres:// -> postgresql+asyncpg://)
-db_url = settings.DATABASE_URL
-if db_url.startswith("postgres://"):
-    db_url = db_url.replace("postgres://", "postgresql+psycopg2://", 1)
-    # db_url = db_url.replace("postgres://", "postgresql+asyncpg://", 1)
-
-# if "?sslmode" in db_url:
-#     db_url = db_url.split("?sslmode")[0] 
-
-engine = create_engine(
-    db_url,
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True,
-    echo=settings.DEBUG
-    # connect_args={
-    #     # Gunakan 'true' jika Anda ingin koneksi SSL tanpa verifikasi sertifikat (tidak disarankan untuk produksi)
-    #     # Atau gunakan objek ssl.Context untuk konfigurasi SSL yang lebih aman
-    #     "ssl": "require" # atau 'true' tergantung kebutuhan
-    # }
-)
-
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+logger = logging.getLogger(__name__)
+
+class TenantSession(Session):
+    """
+    Session that routes to the shard stored in ``info["shard"]``.
+
+    ORM-mapped tables in the ``public`` schema (tenant registry etc.) always
+    live on the default shard, so they are routed there regardless of the
+    tenant. Raw ``text()`` statements follow the tenant's shard.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if mapper is not None:
+            # mapper bisa berupa Mapper atau class model
+            # Table tidak boleh diuji truthiness-nya (TypeError), cek None secara eksplisit
+            table = getattr(mapper, "local_table", None)
+            if table is None:
+                table = getattr(mapper, "__table__", None)
+            if table is not None and table.schema == "public":
+                return shard_router.get_engine(DEFAULT_SHARD)
+        return shard_router.get_engine(self.info.get("shard", DEFAULT_SHARD))
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, class_=TenantSession)
+
+TENANT_SCHEMA_PATTERN = re.compile(r'^[a-zA-Z][a-zA-Z0-9_]{0,62}$')
+
+@event.listens_for(SessionLocal, "after_begin")
+def _apply_tenant_search_path(session: Session, transaction, connection):
+    """
+    Set search_path for every transaction the session begins.
+
+    SET LOCAL is scoped to the transaction, so the tenant never leaks to the
+    next user of the pooled connection, and no connection is checked out
+    until the session actually runs a query.
+    """
+    schema_name = session.info.get("tenant_schema", settings.DEFAULT_SCHEMA)
+    connection.exec_driver_sql(f'SET LOCAL search_path TO {schema_name}, public')
+
+@event.listens_for(SessionLocal, "before_commit")
+def _write_change_events(session: Session):
+    """Insert change events (and, serverless, audit events and activity) recorded on the session into the same transaction"""
+    audit_log.write_pending(session)
+    activity_tracker.write_pending(session)
+    change_feed.write_pending(session)
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_change_events(session: Session):
+    audit_log.discard(session)
+    activity_tracker.discard(session)
+    change_feed.discard(session)
+
+def commit_recorded(db: Session) -> None:
+    """
+    Commit audit events and activity recorded after the session's last
+    commit (serverless, see ``app.core.audit``). Uncommitted work is rolled
+    back first, as ``close()`` would have done.
+    """
+    recorded = {
+        key: db.info.pop(key)
+        for key in (AUDIT_PENDING_KEY, ACTIVITY_PENDING_KEY)
+        if db.info.get(key)
+    }
+    if not recorded:
+        return
+    try:
+        db.rollback()
+        db.info.update(recorded)
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.warning("Writing recorded audit events/activity failed: %s", e)
+
+@traced()
+def validate_tenant_schema(
+    x_tenant_schema: Optional[str] = Header(None, alias="X-Tenant-Schema")
+) -> str:
+    """Validate tenant schema name against the in-process tenant catalog"""
+    # Bukan "schema_name": nama itu dipakai path parameter di /tenants/{schema_name}
+    schema_name = x_tenant_schema
+    if not schema_name or schema_name == settings.DEFAULT_SCHEMA:
+        return settings.DEFAULT_SCHEMA
+
+    if not TENANT_SCHEMA_PATTERN.match(schema_name):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid schema name format. Must start with letter, contain only alphanumeric characters and underscores, and be 63 characters or less"
+        )
+
+    try:
+        tenant = tenant_catalog.get(schema_name)
+    except SQLAlchemyError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Tenant registry unavailable"
+        )
+
+    if tenant is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Unknown tenant"
+        )
+
+    if tenant.t_status == "migrating":
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Tenant is being moved to another shard",
+            headers={"Retry-After": "30"}
+        )
+
+    if tenant.t_status != "active":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Tenant is {tenant.t_status}"
+        )
+
+    return schema_name
 
 def get_db(
-    tenant_schema: Optional[str] = Header(None, alias="X-Tenant-Schema")
+    tenant_schema: str = Depends(validate_tenant_schema)
 ) -> Generator[Session, None, None]:
     """Dependency to get database session with tenant schema context"""
-    db = SessionLocal()
+    set_span_attributes({"atlas.tenant": tenant_schema})
+    with span("get_db", {"atlas.tenant": tenant_schema}):
+        db = open_tenant_session(tenant_schema)
     try:
-        schema_to_set = tenant_schema or settings.DEFAULT_SCHEMA
-        set_schema_search_path(db, schema_to_set)
         yield db
     finally:
+        # Serverless: event yang dicatat setelah commit terakhir (mis. login gagal) ditulis sebelum close
+        commit_recorded(db)
         db.close()
 
+def shard_for_schema(schema_name: str) -> str:
+    """Resolve the shard hosting a tenant schema"""
+    if schema_name == settings.DEFAULT_SCHEMA:
+        return DEFAULT_SHARD
+    tenant = tenant_catalog.get(schema_name)
+    return tenant.t_shard if tenant else DEFAULT_SHARD
+
+def open_tenant_session(schema_name: str, shard: Optional[str] = None) -> Session:
+    """Create a session routed to the tenant's shard with its search_path"""
+    return SessionLocal(info={
+        "tenant_schema": schema_name,
+        "shard": shard or shard_for_schema(schema_name),
+    })
+
 def set_schema_search_path(db: Session, schema_name: str):
     """Set schema search path for multi-tenant support"""
-    db.execute(text(f"SET search_path TO {schema_name}, public"))
-    db.commit()
+    db.info["tenant_schema"] = schema_name
+    db.execute(text(f'SET LOCAL search_path TO {schema_name}, public'))
 
 
 def create_tenant_schema(db: Session, schema_name: str):
     """Create tenant schema using the stored procedure"""
     db.execute(text("SELECT create_tenant_schema(:schema_name)"), {"schema_name": schema_name})
-    db.commit()
\ No newline at end of file
+    db.commit()
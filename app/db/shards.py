@@ -0,0 +1,135 @@
+import threading
+import time
+from typing import Dict, List, Mapping, cast
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import NullPool, QueuePool
+
+from app.core.config import settings
+from app.core.metrics import DB_POOL_WAIT, record_pool_state
+
+# Shard "default" selalu DATABASE_URL dan juga menyimpan tabel-tabel public (registry tenant)
+DEFAULT_SHARD = "default"
+
+# Ukuran pool per engine (juga dipakai untuk menghitung saturasi di readiness check)
+POOL_SIZE = 10
+MAX_OVERFLOW = 20
+
+def normalize_database_url(url: str) -> str:
+    """Normalize database URL (postgres:// -> postgresql+psycopg2://)"""
+    if url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql+psycopg2://", 1)
+        # url = url.replace("postgres://", "postgresql+asyncpg://", 1)
+
+    # if "?sslmode" in url:
+    #     url = url.split("?sslmode")[0]
+    return url
+
+def libpq_url(url: str) -> str:
+    """Render a SQLAlchemy URL as a libpq URI usable by pg_dump/psql"""
+    return make_url(normalize_database_url(url)).set(drivername="postgresql").render_as_string(
+        hide_password=False
+    )
+
+def pool_mode() -> str:
+    """Configured pool type: "queue" or "null" (serverless default)"""
+    return settings.DATABASE_POOL or ("null" if settings.SERVERLESS_MODE else "queue")
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+
+    shard = DEFAULT_SHARD
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.labels(self.shard).observe(time.perf_counter() - started)
+
+    def recreate(self):
+        # engine.dispose() membuat pool baru; label shard harus ikut
+        pool = cast(TimedQueuePool, super().recreate())
+        pool.shard = self.shard
+        return pool
+
+def build_engine(url: str, shard: str = DEFAULT_SHARD) -> Engine:
+    """Create an engine with the standard pool configuration"""
+    if pool_mode() == "null":
+        # Tanpa pool di proses: setiap checkout membuka koneksi baru ke pooler eksternal
+        return create_engine(normalize_database_url(url), poolclass=NullPool, echo=settings.DEBUG)
+
+    engine = create_engine(
+        normalize_database_url(url),
+        poolclass=TimedQueuePool,
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_pre_ping=True,
+        echo=settings.DEBUG
+        # connect_args={
+        #     # Gunakan 'true' jika Anda ingin koneksi SSL tanpa verifikasi sertifikat (tidak disarankan untuk produksi)
+        #     # Atau gunakan objek ssl.Context untuk konfigurasi SSL yang lebih aman
+        #     "ssl": "require" # atau 'true' tergantung kebutuhan
+        # }
+    )
+    engine.pool.shard = shard  # type: ignore[attr-defined]
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        record_pool_state(shard, engine.pool)
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        record_pool_state(shard, engine.pool)
+
+    return engine
+
+class ShardRouter:
+    """
+    Maps shard names to database URLs and lazily builds one engine per shard.
+
+    Tenant -> shard assignment lives in ``public.tenants.t_shard`` on the
+    default shard; this class only knows how to reach each shard.
+    """
+
+    def __init__(self, default_url: str, shard_urls: Mapping[str, str]):
+        self._urls: Dict[str, str] = {DEFAULT_SHARD: default_url}
+        self._urls.update({name: url for name, url in shard_urls.items() if name != DEFAULT_SHARD})
+        self._engines: Dict[str, Engine] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def shard_names(self) -> List[str]:
+        return list(self._urls.keys())
+
+    def get_url(self, shard: str) -> str:
+        if shard not in self._urls:
+            raise KeyError(f"Unknown shard: {shard}")
+        return self._urls[shard]
+
+    def get_engine(self, shard: str = DEFAULT_SHARD) -> Engine:
+        """Get (or lazily create) the engine for a shard"""
+        engine = self._engines.get(shard)
+        if engine is not None:
+            return engine
+
+        with self._lock:
+            engine = self._engines.get(shard)
+            if engine is None:
+                engine = build_engine(self.get_url(shard), shard)
+                self._engines[shard] = engine
+            return engine
+
+    def engines(self) -> Dict[str, Engine]:
+        """Engines created so far, by shard name"""
+        return dict(self._engines)
+
+    def least_loaded_shard(self, tenant_counts: Mapping[str, int]) -> str:
+        """
+        Pick the configured shard with the fewest tenants.
+        Ties are broken by configuration order so placement is deterministic.
+        """
+        return min(self.shard_names, key=lambda shard: tenant_counts.get(shard, 0))
+
+shard_router = ShardRouter(settings.DATABASE_URL, settings.DATABASE_SHARDS)
@@ -0,0 +1,72 @@
+-- create_tenant_schema(schema_name): schema tenant beserta tabel dasarnya.
+-- Index dan kolom tambahan diterapkan setelahnya oleh app/db/tenant_ddl.py.
+-- Harus terpasang di setiap shard (docker-compose.shards.yml memuatnya otomatis).
+CREATE OR REPLACE FUNCTION public.create_tenant_schema(schema_name text)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF schema_name !~ '^[a-zA-Z][a-zA-Z0-9_]{0,62}$' THEN
+        RAISE EXCEPTION 'Invalid schema name: %', schema_name;
+    END IF;
+
+    EXECUTE format('CREATE SCHEMA IF NOT EXISTS %I', schema_name);
+
+    EXECUTE format($ddl$
+        CREATE TABLE IF NOT EXISTS %I.users (
+            u_id BIGSERIAL PRIMARY KEY,
+            u_username VARCHAR(100) NOT NULL UNIQUE,
+            u_email VARCHAR(255) NOT NULL UNIQUE,
+            u_password_hash VARCHAR(255) NOT NULL,
+            u_full_name VARCHAR(255),
+            u_status VARCHAR(20) NOT NULL DEFAULT 'active',
+            u_email_verified BOOLEAN NOT NULL DEFAULT false,
+            created_at TIMESTAMP NOT NULL DEFAULT now(),
+            updated_at TIMESTAMP,
+            CONSTRAINT check_user_status CHECK (u_status IN ('active', 'inactive', 'pending_verification'))
+        )$ddl$, schema_name);
+
+    EXECUTE format($ddl$
+        CREATE TABLE IF NOT EXISTS %I.applications (
+            app_id BIGSERIAL PRIMARY KEY,
+            app_code VARCHAR(50) NOT NULL UNIQUE,
+            app_name VARCHAR(255) NOT NULL,
+            app_description TEXT,
+            created_at TIMESTAMP NOT NULL DEFAULT now(),
+            updated_at TIMESTAMP
+        )$ddl$, schema_name);
+
+    EXECUTE format($ddl$
+        CREATE TABLE IF NOT EXISTS %1$I.roles (
+            r_id BIGSERIAL PRIMARY KEY,
+            r_app_id INTEGER NOT NULL REFERENCES %1$I.applications (app_id) ON DELETE CASCADE,
+            r_code VARCHAR(100) NOT NULL,
+            r_name VARCHAR(255) NOT NULL,
+            r_level INTEGER NOT NULL DEFAULT 0,
+            r_permissions JSONB,
+            created_at TIMESTAMP NOT NULL DEFAULT now(),
+            updated_at TIMESTAMP,
+            CONSTRAINT uq_role_app_code UNIQUE (r_app_id, r_code)
+        )$ddl$, schema_name);
+
+    EXECUTE format($ddl$
+        CREATE TABLE IF NOT EXISTS %1$I.user_roles (
+            ur_id BIGSERIAL PRIMARY KEY,
+            ur_user_id INTEGER NOT NULL REFERENCES %1$I.users (u_id) ON DELETE CASCADE,
+            ur_role_id INTEGER NOT NULL REFERENCES %1$I.roles (r_id) ON DELETE CASCADE,
+            created_at TIMESTAMP NOT NULL DEFAULT now(),
+            CONSTRAINT uq_user_role UNIQUE (ur_user_id, ur_role_id)
+        )$ddl$, schema_name);
+
+    EXECUTE format($ddl$
+        CREATE TABLE IF NOT EXISTS %1$I.refresh_tokens (
+            rt_id BIGSERIAL PRIMARY KEY,
+            rt_user_id INTEGER NOT NULL REFERENCES %1$I.users (u_id) ON DELETE CASCADE,
+            rt_token_hash VARCHAR(255) NOT NULL,
+            rt_expires_at TIMESTAMP NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT now()
+        )$ddl$, schema_name);
+
+    EXECUTE format('CREATE INDEX IF NOT EXISTS ix_refresh_tokens_rt_token_hash ON %I.refresh_tokens (rt_token_hash)', schema_name);
+END;
+$$;
@@ -0,0 +1,148 @@
+import logging
+import select
+import threading
+import time
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.schemas.tenant import TenantRecord
+
+logger = logging.getLogger(__name__)
+
+# Channel yang dipakai trigger public.tenants untuk memberi tahu perubahan registry
+TENANT_CHANNEL = "atlas_tenants"
+
+class TenantCatalog:
+    """
+    In-process mirror of the ``public.tenants`` registry.
+
+    Lookups are plain dict reads so the ``X-Tenant-Schema`` header can be
+    validated without checking out a database connection. The mirror is
+    refreshed by a background thread that LISTENs on ``TENANT_CHANNEL`` and
+    falls back to polling every ``TENANT_CATALOG_REFRESH_SECONDS``.
+    """
+
+    def __init__(self, refresh_seconds: int):
+        self.refresh_seconds = refresh_seconds
+        self._tenants: Dict[str, TenantRecord] = {}
+        self._loaded = False
+        self._refreshed_at = 0.0
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def get(self, schema_name: str) -> Optional[TenantRecord]:
+        """Get tenant entry, loading the catalog on first use"""
+        self._ensure_fresh()
+        return self._tenants.get(schema_name)
+
+    def peek(self, schema_name: str) -> Optional[TenantRecord]:
+        """Tenant entry from the current snapshot, never refreshing (safe on the event loop)"""
+        return self._tenants.get(schema_name)
+
+    def all(self) -> List[TenantRecord]:
+        """Get all known tenants"""
+        self._ensure_fresh()
+        return list(self._tenants.values())
+
+    def _ensure_fresh(self) -> None:
+        # Tanpa thread listener (mis. serverless) catalog di-refresh inline saat kedaluwarsa
+        if not self._loaded:
+            self.refresh()
+        elif self._thread is None and time.monotonic() - self._refreshed_at > self.refresh_seconds:
+            self.refresh()
+
+    def refresh(self) -> None:
+        """Reload the catalog from the registry table"""
+        # Import lokal untuk menghindari circular import dengan app.db.session
+        from app.db.session import SessionLocal
+        from app.repositories.tenant import TenantRepository
+
+        with self._refresh_lock:
+            db = SessionLocal()
+            try:
+                records = [TenantRecord.model_validate(row) for row in TenantRepository().get_all(db)]
+                tenants = {record.t_schema_name: record for record in records}
+            finally:
+                db.close()
+
+            # Swap seluruh dict sekaligus agar pembaca tidak melihat state setengah jadi
+            self._tenants = tenants
+            self._loaded = True
+            self._refreshed_at = time.monotonic()
+
+    def start(self) -> None:
+        """Start the background refresher thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="tenant-catalog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background refresher thread"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection = self._listen()
+                driver_connection = self._driver_connection(connection)
+                self.refresh()
+                while not self._stop.is_set():
+                    readable, _, _ = select.select(
+                        [driver_connection], [], [], self.refresh_seconds
+                    )
+                    if readable:
+                        # Kumpulkan semua notifikasi yang tertunda, cukup satu refresh
+                        driver_connection.poll()
+                        driver_connection.notifies.clear()
+                    self.refresh()
+            except Exception as e:
+                logger.warning("Tenant catalog listener error, falling back to polling: %s", e)
+                if self._stop.wait(self.refresh_seconds):
+                    break
+                try:
+                    self.refresh()
+                except Exception as refresh_error:
+                    logger.warning("Tenant catalog refresh failed: %s", refresh_error)
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+    def _listen(self):
+        """Open a dedicated autocommit connection subscribed to TENANT_CHANNEL"""
+        from app.db.shards import shard_router
+
+        connection = shard_router.get_engine().raw_connection()
+        # Lepaskan dari pool supaya koneksi LISTEN tidak memakan slot pool
+        connection.detach()
+        driver_connection = self._driver_connection(connection)
+        driver_connection.autocommit = True
+        cursor = driver_connection.cursor()
+        cursor.execute(f"LISTEN {TENANT_CHANNEL}")
+        cursor.close()
+        return connection
+
+    @staticmethod
+    def _driver_connection(connection):
+        """The psycopg2 connection behind a pooled connection"""
+        driver_connection = connection.driver_connection
+        if driver_connection is None:
+            raise RuntimeError("Tenant catalog listener connection is closed")
+        return driver_connection
+
+tenant_catalog = TenantCatalog(settings.TENANT_CATALOG_REFRESH_SECONDS)
@@ -0,0 +1,106 @@
+"""
+Idempotent per-tenant DDL applied on top of the tables created by the
+``create_tenant_schema`` stored procedure.
+
+Statements are templates with a ``{schema}`` placeholder and run in order
+in autocommit mode, so indexes can be built ``CONCURRENTLY`` on live
+tenants without blocking writes.
+"""
+from typing import List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+TENANT_DDL: List[str] = [
+    # Login lookup case-insensitive: satu index probe per login (username: lihat apply_tenant_ddl)
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_lower_email ON {schema}.users (lower(u_email))",
+    # Pencarian substring user (ILIKE '%q%') via trigram GIN
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm SCHEMA public",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_username_trgm ON {schema}.users USING gin (u_username public.gin_trgm_ops)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_email_trgm ON {schema}.users USING gin (u_email public.gin_trgm_ops)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_full_name_trgm ON {schema}.users USING gin (u_full_name public.gin_trgm_ops)",
+    # Filter dan sort daftar user
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_status_id ON {schema}.users (u_status, u_id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_created_at_id ON {schema}.users (created_at, u_id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_unverified_id ON {schema}.users (u_id) WHERE u_email_verified = false",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_user_roles_role_user ON {schema}.user_roles (ur_role_id, ur_user_id)",
+    # Aktivitas user (app.core.activity) dan laporan user tidak aktif
+    "ALTER TABLE {schema}.users ADD COLUMN IF NOT EXISTS last_login_at TIMESTAMP",
+    "ALTER TABLE {schema}.users ADD COLUMN IF NOT EXISTS last_seen_at TIMESTAMP",
+    # NULLS FIRST sesuai ORDER BY laporan; index lama (NULLS LAST) diganti
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_last_seen_at_nulls_first_id ON {schema}.users (last_seen_at NULLS FIRST, u_id)",
+    "DROP INDEX CONCURRENTLY IF EXISTS {schema}.ix_users_last_seen_at_id",
+    # Log audit (ditulis batch oleh app.core.audit)
+    """CREATE TABLE IF NOT EXISTS {schema}.audit_events (
+        ae_id BIGSERIAL PRIMARY KEY,
+        ae_type VARCHAR(50) NOT NULL,
+        ae_user_id BIGINT,
+        ae_actor_id BIGINT,
+        ae_ip VARCHAR(64),
+        ae_details JSONB NOT NULL DEFAULT '{{}}',
+        created_at TIMESTAMP NOT NULL DEFAULT now()
+    )""",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_audit_events_created_at_id ON {schema}.audit_events (created_at, ae_id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_audit_events_user_created_at ON {schema}.audit_events (ae_user_id, created_at)",
+    # Change feed role/permission (app.core.change_feed)
+    """CREATE TABLE IF NOT EXISTS {schema}.change_events (
+        ce_seq BIGSERIAL PRIMARY KEY,
+        ce_type VARCHAR(50) NOT NULL,
+        ce_entity VARCHAR(50) NOT NULL,
+        ce_entity_id BIGINT NOT NULL,
+        ce_details JSONB NOT NULL DEFAULT '{{}}',
+        created_at TIMESTAMP NOT NULL DEFAULT now()
+    )""",
+]
+
+# Username yang hanya beda huruf besar/kecil (data lama): login tidak bisa memilih akun dengan pasti
+USERNAME_CONFLICTS_SQL = """
+    SELECT lower(u_username) AS username, array_agg(u_id ORDER BY u_id) AS user_ids
+    FROM {schema}.users
+    GROUP BY lower(u_username)
+    HAVING count(*) > 1
+    ORDER BY 1
+"""
+
+# Index lookup login non-unique, hanya dipakai selama tenant masih punya konflik
+FALLBACK_USERNAME_DDL = (
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_lower_username ON {schema}.users (lower(u_username))"
+)
+
+# Index unique menggantikan fallback begitu konflik sudah dibereskan
+UNIQUE_USERNAME_DDL: List[str] = [
+    "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ux_users_lower_username ON {schema}.users (lower(u_username))",
+    "DROP INDEX CONCURRENTLY IF EXISTS {schema}.ix_users_lower_username",
+]
+
+def apply_tenant_ddl(engine: Engine, schema_name: str) -> List[Tuple[str, List[int]]]:
+    """
+    Apply TENANT_DDL to one tenant schema, then make the case-insensitive
+    username index unique. Returns the conflicting (username, user ids)
+    groups; while there are any, a non-unique index serves logins instead.
+    """
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for statement in TENANT_DDL:
+            conn.execute(text(statement.format(schema=schema_name)))
+
+        # Build CONCURRENTLY yang gagal meninggalkan index INVALID; IF NOT EXISTS akan melewatinya
+        invalid = conn.execute(text("""
+            SELECT NOT i.indisvalid
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = :schema AND c.relname = 'ux_users_lower_username'
+        """), {"schema": schema_name}).scalar()
+        if invalid:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {schema_name}.ux_users_lower_username"))
+
+        conflicts = [
+            (row.username, list(row.user_ids))
+            for row in conn.execute(text(USERNAME_CONFLICTS_SQL.format(schema=schema_name)))
+        ]
+        if conflicts:
+            conn.execute(text(FALLBACK_USERNAME_DDL.format(schema=schema_name)))
+            return conflicts
+        for statement in UNIQUE_USERNAME_DDL:
+            conn.execute(text(statement.format(schema=schema_name)))
+    return []
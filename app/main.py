@@ -1,9 +1,80 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-import textwrap
+from app.core.startup import startup_timer
 
-from app.core.config import settings
-from app.api.v1.api import api_router
+with startup_timer.stage("import framework"):
+    from contextlib import asynccontextmanager
+    from fastapi import FastAPI, Response
+    from fastapi.middleware.cors import CORSMiddleware
+    import logging
+    import textwrap
+    from prometheus_client import CONTENT_TYPE_LATEST
+
+with startup_timer.stage("import core"):
+    from app.core.activity import activity_tracker
+    from app.core.audit import audit_log
+    from app.core.config import settings
+    from app.core.email_worker import email_worker
+    from app.core.mailer import email_templates
+    from app.core.health import health_checker
+    from app.core.metrics import PrometheusMiddleware, mark_process_dead, render_metrics
+    from app.core.redis_client import redis_manager
+    from app.core.tracing import TracingMiddleware, setup_tracing, shutdown_tracing
+    from app.core.warmup import warmup
+
+with startup_timer.stage("import api"):
+    from app.api.v1.api import api_router
+    from app.db.session import SessionLocal
+    from app.db.tenant_catalog import tenant_catalog
+    from app.utils.database_init import ensure_email_outbox, ensure_tenant_registry
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup/shutdown hooks"""
+    with startup_timer.stage("tracing"):
+        setup_tracing()
+
+    # Serverless: DDL dijalankan saat deploy (app.utils.database_init), tanpa thread
+    # background; template, Redis, catalog dan health check dibuat saat pertama dipakai
+    if not settings.SERVERLESS_MODE:
+        with startup_timer.stage("public tables"):
+            db = SessionLocal()
+            try:
+                ensure_tenant_registry(db)
+                ensure_email_outbox(db)
+            except Exception as e:
+                db.rollback()
+                logger.error("Public table initialization failed: %s", e)
+            finally:
+                db.close()
+
+        with startup_timer.stage("email templates"):
+            email_templates.load()
+        with startup_timer.stage("background workers"):
+            redis_manager.start()
+            tenant_catalog.start()
+            health_checker.start()
+            if settings.EMAIL_WORKER_ENABLED:
+                email_worker.start()
+            if settings.AUDIT_ENABLED:
+                audit_log.start()
+            if settings.ACTIVITY_TRACKING_ENABLED:
+                activity_tracker.start()
+
+    if settings.WARMUP_ENABLED and not settings.SERVERLESS_MODE:
+        warmup.start()
+    else:
+        warmup.skip()
+    startup_timer.finish()
+    yield
+    activity_tracker.stop()
+    audit_log.stop()
+    email_worker.stop()
+    health_checker.stop()
+    tenant_catalog.stop()
+    await redis_manager.aclose()
+    mark_process_dead()
+    shutdown_tracing()
 
 app = FastAPI(
     title=f"{settings.APP_NAME} - Atams Login & Authentication Service",
@@ -25,9 +96,15 @@ app = FastAPI(
         * **X-Tenant-Schema**: Specify tenant schema for multi-tenant operations
         * **Authorization**: Bearer token for authenticated requests
     """),
-    openapi_url=f"/openapi.json" if settings.DEBUG else None
+    openapi_url=f"/openapi.json" if settings.DEBUG else None,
+    lifespan=lifespan
 )
 
+# Metrics middleware (ditambahkan pertama = paling dalam, setelah CORS)
+app.add_middleware(PrometheusMiddleware)
+# Span server per request (no-op jika tracing nonaktif)
+app.add_middleware(TracingMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -56,5 +133,11 @@ async def read_root():
         ]
     }
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics (aggregated across workers in multi-process mode)"""
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
 # Include routers
-app.include_router(api_router, prefix="/api/v1")
\ No newline at end of file
+with startup_timer.stage("include routers"):
+    app.include_router(api_router, prefix="/api/v1")
\ No newline at end of file
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, BigInteger, String, DateTime, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class AuditEvent(Base):
+    __tablename__ = "audit_events"
+
+    ae_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    ae_type = Column(String(50), nullable=False)
+    ae_user_id = Column(BigInteger, nullable=True)
+    ae_actor_id = Column(BigInteger, nullable=True)
+    ae_ip = Column(String(64), nullable=True)
+    ae_details = Column(JSONB, nullable=False, server_default="{}")
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_audit_events_created_at_id", "created_at", "ae_id"),
+        Index("ix_audit_events_user_created_at", "ae_user_id", "created_at"),
+    )
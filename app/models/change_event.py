@@ -0,0 +1,15 @@
+from sqlalchemy import Column, BigInteger, String, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class ChangeEvent(Base):
+    __tablename__ = "change_events"
+
+    # Urutan commit per tenant (lihat app.core.change_feed)
+    ce_seq = Column(BigInteger, primary_key=True, autoincrement=True)
+    ce_type = Column(String(50), nullable=False)
+    ce_entity = Column(String(50), nullable=False)
+    ce_entity_id = Column(BigInteger, nullable=False)
+    ce_details = Column(JSONB, nullable=False, server_default="{}")
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
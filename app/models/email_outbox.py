@@ -0,0 +1,37 @@
+from sqlalchemy import (
+    Column, BigInteger, Integer, String, Text, DateTime, CheckConstraint, Index
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+
+    eo_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    eo_tenant = Column(String(63), nullable=False)
+    eo_recipient = Column(String(255), nullable=False)
+    eo_subject = Column(String(255), nullable=False)
+    eo_template = Column(String(100), nullable=False)
+    eo_template_body = Column(JSONB, nullable=False, server_default="{}")
+    eo_locale = Column(String(10), nullable=True)
+    eo_status = Column(String(20), default="pending", server_default="pending", nullable=False)
+    eo_attempts = Column(Integer, default=0, server_default="0", nullable=False)
+    eo_next_attempt_at = Column(DateTime, server_default=func.now(), nullable=False)
+    eo_locked_at = Column(DateTime, nullable=True)
+    eo_last_error = Column(Text, nullable=True)
+    eo_sent_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        CheckConstraint(
+            eo_status.in_(["pending", "sending", "sent", "failed"]),
+            name="check_email_outbox_status"
+        ),
+        # Antrian yang siap dikirim (dipakai worker untuk claim batch)
+        Index(
+            "ix_email_outbox_pending", "eo_next_attempt_at", "eo_id",
+            postgresql_where=eo_status.in_(["pending", "sending"])
+        ),
+        {"schema": "public"},
+    )
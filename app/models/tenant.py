@@ -0,0 +1,24 @@
+from sqlalchemy import (
+    Column, BigInteger, String, DateTime, CheckConstraint
+)
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class Tenant(Base):
+    __tablename__ = "tenants"
+
+    t_id = Column(BigInteger, primary_key=True, index=True, autoincrement=True)
+    t_schema_name = Column(String(63), unique=True, nullable=False, index=True)
+    t_status = Column(String(20), default="active", server_default="active", nullable=False)
+    t_shard = Column(String(50), default="default", server_default="default", nullable=False)
+    t_plan = Column(String(50), default="standard", server_default="standard", nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, onupdate=func.now())
+
+    __table_args__ = (
+        CheckConstraint(
+            t_status.in_(["active", "suspended", "migrating"]),
+            name="check_tenant_status"
+        ),
+        {"schema": "public"},
+    )
@@ -1,7 +1,7 @@
 from sqlalchemy import (
-    Column, BigInteger, String, Boolean, DateTime, CheckConstraint
+    Column, BigInteger, String, Boolean, DateTime, CheckConstraint, Index
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 from app.db.base import Base
 
@@ -21,6 +21,10 @@ class User(Base):
     u_email_verified = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     updated_at = Column(DateTime, onupdate=func.now())
+    # Ditulis batch oleh app.core.activity, bukan per request. Deferred: tenant lama baru
+    # punya kolom ini setelah database_init, jadi query User biasa tidak boleh memilihnya
+    last_login_at = deferred(Column(DateTime))
+    last_seen_at = deferred(Column(DateTime))
 
     user_roles = relationship("UserRole", back_populates="user", cascade="all, delete-orphan")
 
@@ -29,4 +33,22 @@ class User(Base):
             u_status.in_(["active", "inactive", "pending_verification"]),
             name="check_user_status"
         ),
-    )
\ No newline at end of file
+        # Lookup login case-insensitive (lihat app/db/tenant_ddl.py)
+        Index("ux_users_lower_username", func.lower(u_username), unique=True),
+        Index("ix_users_lower_email", func.lower(u_email)),
+        # Pencarian substring (ILIKE) dan filter/sort di GET /users
+        Index("ix_users_username_trgm", u_username, postgresql_using="gin", postgresql_ops={"u_username": "gin_trgm_ops"}),
+        Index("ix_users_email_trgm", u_email, postgresql_using="gin", postgresql_ops={"u_email": "gin_trgm_ops"}),
+        Index("ix_users_full_name_trgm", u_full_name, postgresql_using="gin", postgresql_ops={"u_full_name": "gin_trgm_ops"}),
+        Index("ix_users_status_id", u_status, u_id),
+        Index("ix_users_created_at_id", created_at, u_id),
+        Index("ix_users_unverified_id", u_id, postgresql_where=(u_email_verified == False)),  # noqa: E712
+    )
+
+# Urutan sama dengan laporan user tidak aktif (last_seen_at ASC NULLS FIRST, u_id); didefinisikan
+# di luar class karena atribut deferred bukan ekspresi kolom
+Index(
+    "ix_users_last_seen_at_nulls_first_id",
+    User.__table__.c.last_seen_at.asc().nulls_first(),
+    User.__table__.c.u_id,
+)
@@ -1,5 +1,5 @@
 from sqlalchemy import (
-    Column, BigInteger, Integer, DateTime, ForeignKey, UniqueConstraint
+    Column, BigInteger, Integer, DateTime, ForeignKey, UniqueConstraint, Index
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -18,4 +18,6 @@ class UserRole(Base):
 
     __table_args__ = (
         UniqueConstraint("ur_user_id", "ur_role_id", name="uq_user_role"),
+        # Filter/daftar anggota per role (uq_user_role hanya melayani lookup per user)
+        Index("ix_user_roles_role_user", "ur_role_id", "ur_user_id"),
     )
\ No newline at end of file
@@ -2,8 +2,6 @@ from typing import Optional
 from sqlalchemy.orm import Session, selectinload
 
 from app.models.application import Application
-from app.models.role import Role
-from app.models.user_role import UserRole
 from app.repositories.base import BaseRepository
 
 class ApplicationRepository(BaseRepository[Application]):
@@ -14,15 +12,11 @@ class ApplicationRepository(BaseRepository[Application]):
         """Get application by code"""
         return db.query(Application).filter(Application.app_code == app_code).first()
 
-    def get_application_with_roles_and_users(self, db: Session, app_id: int) -> Optional[Application]:
-        """Get application with roles and users"""
+    def get_application_with_roles(self, db: Session, app_id: int) -> Optional[Application]:
+        """Get application with its roles (without members)"""
         return (
             db.query(Application)
-            .options(
-                selectinload(Application.roles)
-                .selectinload(Role.user_roles)
-                .selectinload(UserRole.user)
-            )
+            .options(selectinload(Application.roles))
             .filter(Application.app_id == app_id)
             .first()
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,57 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import insert, or_, and_
+from sqlalchemy.orm import Session
+
+from app.models.audit_event import AuditEvent
+from app.repositories.base import BaseRepository
+
+class AuditEventRepository(BaseRepository[AuditEvent]):
+    # Log audit append-only; tidak ada ETag untuk koleksi ini
+    versioned = False
+
+    def __init__(self):
+        super().__init__(AuditEvent)
+
+    def insert_many(self, db: Session, events: Sequence[Dict[str, Any]]) -> None:
+        """Insert ``ae_*`` column dicts as one multi-row INSERT"""
+        if not events:
+            return
+        self.add_many(db, events)
+        db.commit()
+
+    def add_many(self, db: Session, events: Sequence[Dict[str, Any]]) -> None:
+        """Like ``insert_many``, without committing"""
+        if events:
+            db.execute(insert(AuditEvent), list(events))
+
+    def get_range(
+        self,
+        db: Session,
+        since: datetime,
+        until: datetime,
+        event_type: Optional[str] = None,
+        user_id: Optional[int] = None,
+        before: Optional[Tuple[datetime, int]] = None,
+        limit: int = 100
+    ) -> List[AuditEvent]:
+        """
+        Events in ``[since, until)``, newest first. ``before`` is the
+        (created_at, ae_id) of the last event of the previous page (keyset
+        pagination on ix_audit_events_created_at_id).
+        """
+        query = db.query(AuditEvent).filter(
+            AuditEvent.created_at >= since,
+            AuditEvent.created_at < until
+        )
+        if event_type:
+            query = query.filter(AuditEvent.ae_type == event_type)
+        if user_id is not None:
+            query = query.filter(AuditEvent.ae_user_id == user_id)
+        if before is not None:
+            created_at, ae_id = before
+            query = query.filter(or_(
+                AuditEvent.created_at < created_at,
+                and_(AuditEvent.created_at == created_at, AuditEvent.ae_id < ae_id)
+            ))
+        return query.order_by(AuditEvent.created_at.desc(), AuditEvent.ae_id.desc()).limit(limit).all()
@@ -1,37 +1,85 @@
-from typing import TypeVar, Generic, Type, Optional, List, Any, Dict
-from sqlalchemy.orm import Session
-from sqlalchemy import func, text
+from typing import TypeVar, Generic, Type, Optional, List, Any, Dict, Sequence
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy.engine import Row
+from sqlalchemy import func, text, select
 
+from app.core.versioning import collection_key, entity_key, session_tenant, version_store
+from app.core.tracing import traced
 from app.db.base import Base
 
 ModelType = TypeVar("ModelType", bound=Base)  # type: ignore
 
 class BaseRepository(Generic[ModelType]):
+    # Bump version counters (ETag/cache invalidation) setelah setiap write
+    versioned = True
+
     def __init__(self, model: Type[ModelType]):
         self.model = model
     
-    def get(self, db: Session, id: Any) -> Optional[ModelType]:
-        """Get single record by ID"""
+    @traced()
+    def get(
+        self, db: Session, id: Any, fields: Optional[Sequence[str]] = None
+    ) -> Optional[ModelType]:
+        """Get single record by ID (only ``fields`` are loaded, if given)"""
         pk_column = list(self.model.__table__.primary_key.columns)[0]
-        return db.query(self.model).filter(pk_column == id).first()
+        query = db.query(self.model)
+        if fields:
+            query = query.options(load_only(*self._columns(fields)))
+        return query.filter(pk_column == id).first()
     
+    @traced()
     def get_multi(
         self, 
         db: Session, 
         skip: int = 0, 
-        limit: int = 100
+        limit: int = 100,
+        fields: Optional[Sequence[str]] = None
     ) -> List[ModelType]:
-        """Get multiple records with pagination"""
-        return db.query(self.model).offset(skip).limit(limit).all()
+        """Get multiple records with pagination (only ``fields`` are loaded, if given)"""
+        query = db.query(self.model)
+        if fields:
+            query = query.options(load_only(*self._columns(fields)))
+        return query.offset(skip).limit(limit).all()
+    
+    @traced()
+    def get_multi_rows(
+        self,
+        db: Session,
+        fields: Sequence[str],
+        skip: int = 0,
+        limit: int = 100,
+        filter_by: Optional[Dict[str, Any]] = None
+    ) -> List[Row]:
+        """
+        Get multiple records as plain row tuples of the given columns.
+        Uses a Core select, so no ORM objects or identity map are built.
+        """
+        pk_column = list(self.model.__table__.primary_key.columns)[0]
+        stmt = select(*self._columns(fields))
+        if filter_by:
+            stmt = stmt.where(*[getattr(self.model, key) == value for key, value in filter_by.items()])
+        stmt = stmt.order_by(pk_column).offset(skip).limit(limit)
+        return list(db.execute(stmt).all())
+    
+    def _columns(self, fields: Sequence[str]) -> list:
+        """Map field names to model columns, rejecting unknown names"""
+        table_columns = self.model.__table__.columns
+        unknown = [field for field in fields if field not in table_columns]
+        if unknown:
+            raise ValueError(f"Unknown fields for {self.model.__name__}: {', '.join(unknown)}")
+        return [getattr(self.model, field) for field in fields]
     
+    @traced()
     def create(self, db: Session, obj_in: Dict[str, Any]) -> ModelType:
         """Create new record"""
         db_obj = self.model(**obj_in)
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        self.touch(db, [db_obj])
         return db_obj
     
+    @traced()
     def create_multi(self, db: Session, objs_in: List[Dict[str, Any]]) -> List[ModelType]:
         """Create multiple new records in a single transaction."""
         # Create model instances from the input dictionaries
@@ -40,8 +88,10 @@ class BaseRepository(Generic[ModelType]):
         # Use bulk_save_objects for efficient insertion
         db.bulk_save_objects(db_objs, return_defaults=True)
         db.commit()
+        self.touch(db, db_objs)
         return db_objs
     
+    @traced()
     def update(
         self, 
         db: Session, 
@@ -53,20 +103,45 @@ class BaseRepository(Generic[ModelType]):
             if hasattr(db_obj, field):
                 setattr(db_obj, field, value)
         
+        keys = self.version_keys(db_obj)
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        self.touch_keys(db, keys)
         return db_obj
     
+    @traced()
     def delete(self, db: Session, id: Any) -> Optional[ModelType]:
         """Delete record"""
         pk_column = list(self.model.__table__.primary_key.columns)[0]
         obj = db.query(self.model).filter(pk_column == id).first()
         if obj:
+            # Kunci dihitung sebelum commit, selagi atribut objek masih termuat
+            keys = self.version_keys(obj)
             db.delete(obj)
             db.commit()
+            self.touch_keys(db, keys)
         return obj
     
+    def version_keys(self, obj: ModelType) -> List[str]:
+        """Version counters affected by a write to ``obj``"""
+        table = self.model.__tablename__
+        pk_column = list(self.model.__table__.primary_key.columns)[0]
+        return [collection_key(table), entity_key(table, getattr(obj, pk_column.key))]
+    
+    def touch(self, db: Session, objs: List[ModelType]) -> None:
+        """Bump version counters for written objects"""
+        keys: List[str] = []
+        for obj in objs:
+            keys.extend(self.version_keys(obj))
+        self.touch_keys(db, keys)
+    
+    def touch_keys(self, db: Session, keys: List[str]) -> None:
+        """Bump the given version counters in the session's tenant"""
+        if self.versioned:
+            version_store.bump(session_tenant(db), dict.fromkeys(keys))
+    
+    @traced()
     def count(self, db: Session) -> int:
         """Count total records"""
         pk_column = list(self.model.__table__.primary_key.columns)[0]
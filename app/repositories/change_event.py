@@ -0,0 +1,46 @@
+from typing import Any, Dict, List, Sequence
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from app.models.change_event import ChangeEvent
+from app.repositories.base import BaseRepository
+
+# Namespace advisory lock (argumen pertama pg_advisory_xact_lock)
+CHANGE_FEED_LOCK = 0x6174_6c61
+
+class ChangeEventRepository(BaseRepository[ChangeEvent]):
+    # Feed append-only; konsumen memakai ce_seq, bukan ETag
+    versioned = False
+
+    def __init__(self):
+        super().__init__(ChangeEvent)
+
+    def append(self, db: Session, events: Sequence[Dict[str, Any]]) -> None:
+        """
+        Insert ``ce_*`` column dicts in the current transaction (no commit).
+
+        A transaction-scoped advisory lock per tenant is taken first, so
+        sequence numbers are assigned in commit order: a reader never sees
+        seq N+1 before N has committed.
+        """
+        if not events:
+            return
+        db.execute(
+            text("SELECT pg_advisory_xact_lock(:namespace, hashtext(current_schema()))"),
+            {"namespace": CHANGE_FEED_LOCK}
+        )
+        db.execute(insert(ChangeEvent), list(events))
+
+    def get_since(self, db: Session, since: int, limit: int = 500) -> List[ChangeEvent]:
+        """Events with ce_seq greater than ``since``, oldest first"""
+        return (
+            db.query(ChangeEvent)
+            .filter(ChangeEvent.ce_seq > since)
+            .order_by(ChangeEvent.ce_seq.asc())
+            .limit(limit)
+            .all()
+        )
+
+    def get_last_seq(self, db: Session) -> int:
+        """Highest committed ce_seq (0 for an empty feed)"""
+        return db.query(ChangeEvent.ce_seq).order_by(ChangeEvent.ce_seq.desc()).limit(1).scalar() or 0
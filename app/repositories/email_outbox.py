@@ -0,0 +1,97 @@
+from typing import Any, Dict, List, Sequence, cast
+from sqlalchemy import func, insert, text
+from sqlalchemy.engine import CursorResult, Row
+from sqlalchemy.orm import Session
+
+from app.models.email_outbox import EmailOutbox
+from app.repositories.base import BaseRepository
+
+class EmailOutboxRepository(BaseRepository[EmailOutbox]):
+    # Outbox tidak muncul di response GET mana pun
+    versioned = False
+
+    def __init__(self):
+        super().__init__(EmailOutbox)
+
+    def enqueue(self, db: Session, messages: Sequence[Dict[str, Any]]) -> None:
+        """Insert queued messages (``eo_*`` column dicts) in one statement"""
+        if not messages:
+            return
+        # ORM insert agar TenantSession merutekan ke shard default (tabel public)
+        db.execute(insert(EmailOutbox), list(messages))
+        db.commit()
+
+    def claim_batch(self, db: Session, limit: int, stale_seconds: int) -> List[Row]:
+        """
+        Atomically claim up to ``limit`` due messages for this worker.
+        ``SKIP LOCKED`` lets several workers claim disjoint batches; messages
+        stuck in ``sending`` longer than ``stale_seconds`` (crashed worker)
+        are claimed again. ``db`` must be a session on the default shard.
+        """
+        rows = db.execute(text("""
+            UPDATE public.email_outbox
+            SET eo_status = 'sending', eo_attempts = eo_attempts + 1, eo_locked_at = now()
+            WHERE eo_id IN (
+                SELECT eo_id FROM public.email_outbox
+                WHERE (eo_status = 'pending' AND eo_next_attempt_at <= now())
+                OR (eo_status = 'sending' AND eo_locked_at < now() - make_interval(secs => :stale_seconds))
+                ORDER BY eo_next_attempt_at, eo_id
+                LIMIT :limit
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING eo_id, eo_tenant, eo_recipient, eo_subject, eo_template, eo_template_body, eo_locale, eo_attempts
+        """), {"limit": limit, "stale_seconds": stale_seconds}).all()
+        db.commit()
+        return list(rows)
+
+    def mark_sent(self, db: Session, ids: Sequence[int]) -> None:
+        """Mark messages as delivered"""
+        if not ids:
+            return
+        db.execute(text("""
+            UPDATE public.email_outbox
+            SET eo_status = 'sent', eo_sent_at = now(), eo_locked_at = NULL, eo_last_error = NULL,
+                eo_template_body = '{}'
+            WHERE eo_id = ANY(:ids)
+        """), {"ids": list(ids)})
+        db.commit()
+
+    def mark_failed(self, db: Session, failures: Sequence[Dict[str, Any]]) -> None:
+        """
+        Record failed attempts. Each entry has ``id``, ``error``, ``retry_in``
+        (seconds) and ``final`` (no more retries). Final failures lose their
+        template body, like sent messages (it holds reset/verification links).
+        """
+        if not failures:
+            return
+        db.execute(text("""
+            UPDATE public.email_outbox
+            SET eo_status = CASE WHEN :final THEN 'failed' ELSE 'pending' END,
+                eo_next_attempt_at = now() + make_interval(secs => :retry_in),
+                eo_locked_at = NULL,
+                eo_last_error = :error,
+                eo_template_body = CASE WHEN :final THEN '{}'::jsonb ELSE eo_template_body END
+            WHERE eo_id = :id
+        """), list(failures))
+        db.commit()
+
+    def purge(self, db: Session, retention_days: int, limit: int) -> int:
+        """Delete up to ``limit`` sent/failed messages older than ``retention_days``"""
+        result = cast(CursorResult, db.execute(text("""
+            DELETE FROM public.email_outbox
+            WHERE eo_id IN (
+                SELECT eo_id FROM public.email_outbox
+                WHERE eo_status IN ('sent', 'failed')
+                AND created_at < now() - make_interval(days => :retention_days)
+                LIMIT :limit
+                FOR UPDATE SKIP LOCKED
+            )
+        """), {"retention_days": retention_days, "limit": limit}))
+        db.commit()
+        return result.rowcount or 0
+
+    def count_pending(self, db: Session) -> int:
+        """Number of messages waiting to be sent (including retries)"""
+        return db.query(func.count(EmailOutbox.eo_id)).filter(
+            EmailOutbox.eo_status.in_(["pending", "sending"])
+        ).scalar() or 0
@@ -2,13 +2,18 @@ from typing import Optional, List
 from sqlalchemy.orm import Session
 from datetime import datetime
 
+from app.core.tracing import traced
 from app.models.refresh_token import RefreshToken
 from app.repositories.base import BaseRepository
 
 class RefreshTokenRepository(BaseRepository[RefreshToken]):
+    # Refresh token tidak muncul di response GET mana pun
+    versioned = False
+
     def __init__(self):
         super().__init__(RefreshToken)
     
+    @traced()
     def get_by_user_id(self, db: Session, user_id: int) -> List[RefreshToken]:
         """Get all active refresh tokens for a user"""
         return db.query(RefreshToken).filter(
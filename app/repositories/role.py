@@ -1,7 +1,10 @@
-from typing import Optional, List
+from collections import defaultdict
+from typing import Optional, List, Dict
+from sqlalchemy import func, select, true
 from sqlalchemy.orm import Session, selectinload
 
 from app.models.role import Role
+from app.models.user import User
 from app.models.user_role import UserRole
 from app.repositories.base import BaseRepository
 
@@ -26,14 +29,73 @@ class RoleRepository(BaseRepository[Role]):
         """Count roles by application ID"""
         return db.query(Role).filter(Role.r_app_id == app_id).count()
     
-    def get_with_application_and_users(self, db: Session, role_id: int) -> Optional[Role]:
-        """Get role with application info and assigned users"""
+    def get_with_application(self, db: Session, role_id: int) -> Optional[Role]:
+        """Get role with application info (without members)"""
         return (
             db.query(Role)
-            .options(
-                selectinload(Role.application),
-                selectinload(Role.user_roles).selectinload(UserRole.user)
-            )
+            .options(selectinload(Role.application))
             .filter(Role.r_id == role_id)
             .first()
-        )
\ No newline at end of file
+        )
+
+    def get_role_users(
+        self,
+        db: Session,
+        role_id: int,
+        limit: int = 100,
+        after_user_id: Optional[int] = None
+    ) -> List[User]:
+        """
+        Get one page of a role's members ordered by user ID.
+        Keyset pagination on ix_user_roles_role_user, so the cost does not
+        grow with the page position or the size of the role.
+        """
+        query = (
+            db.query(User)
+            .join(UserRole, UserRole.ur_user_id == User.u_id)
+            .filter(UserRole.ur_role_id == role_id)
+        )
+        if after_user_id is not None:
+            query = query.filter(UserRole.ur_user_id > after_user_id)
+        return query.order_by(UserRole.ur_user_id).limit(limit).all()
+
+    def get_users_by_roles(self, db: Session, role_ids: List[int], limit_per_role: int) -> Dict[int, List[User]]:
+        """
+        First ``limit_per_role`` members of each role (by user ID) in one query:
+        a LATERAL subquery per role, each an index range scan on
+        ix_user_roles_role_user.
+        """
+        if not role_ids:
+            return {}
+        members = (
+            select(UserRole.ur_user_id)
+            .where(UserRole.ur_role_id == Role.r_id)
+            .order_by(UserRole.ur_user_id)
+            .limit(limit_per_role)
+            .lateral("members")
+        )
+        rows = (
+            db.query(Role.r_id, User)
+            .select_from(Role)
+            .filter(Role.r_id.in_(role_ids))
+            .join(members, true())
+            .join(User, User.u_id == members.c.ur_user_id)
+            .order_by(Role.r_id, members.c.ur_user_id)
+            .all()
+        )
+        users: Dict[int, List[User]] = defaultdict(list)
+        for role_id, user in rows:
+            users[role_id].append(user)
+        return users
+
+    def count_users_by_role(self, db: Session, role_ids: List[int]) -> Dict[int, int]:
+        """Count members per role with a single grouped COUNT"""
+        if not role_ids:
+            return {}
+        rows = (
+            db.query(UserRole.ur_role_id, func.count(UserRole.ur_id))
+            .filter(UserRole.ur_role_id.in_(role_ids))
+            .group_by(UserRole.ur_role_id)
+            .all()
+        )
+        return {role_id: count for role_id, count in rows}
@@ -0,0 +1,26 @@
+from typing import Optional, List, Dict
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+
+from app.models.tenant import Tenant
+from app.repositories.base import BaseRepository
+
+class TenantRepository(BaseRepository[Tenant]):
+    # Registry disinkronkan lewat TenantCatalog (LISTEN/NOTIFY), bukan version counter
+    versioned = False
+
+    def __init__(self):
+        super().__init__(Tenant)
+
+    def get_by_schema(self, db: Session, schema_name: str) -> Optional[Tenant]:
+        """Get tenant registry entry by schema name"""
+        return db.query(Tenant).filter(Tenant.t_schema_name == schema_name).first()
+
+    def get_all(self, db: Session) -> List[Tenant]:
+        """Get all registered tenants ordered by schema name"""
+        return db.query(Tenant).order_by(Tenant.t_schema_name).all()
+
+    def count_by_shard(self, db: Session) -> Dict[str, int]:
+        """Count registered tenants per shard"""
+        rows = db.query(Tenant.t_shard, func.count(Tenant.t_id)).group_by(Tenant.t_shard).all()
+        return {shard: count for shard, count in rows}
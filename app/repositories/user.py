@@ -1,23 +1,213 @@
-from typing import Optional
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Optional, List, Sequence, Tuple
+from sqlalchemy import and_, func, or_, exists, text
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, Query
 
+from app.core.tracing import traced
+from app.core.versioning import user_roles_key
+from app.models.role import Role
 from app.models.user import User
+from app.models.user_role import UserRole
 from app.repositories.base import BaseRepository
+from app.schemas.user import UserFilter
+
+# Field sort yang diizinkan; prefix "-" untuk descending
+USER_SORT_FIELDS = {
+    "id": User.u_id,
+    "username": User.u_username,
+    "email": User.u_email,
+    "full_name": User.u_full_name,
+    "status": User.u_status,
+    "created_at": User.created_at,
+}
+
+def normalize_email(email: str) -> str:
+    """Canonical form of an email address (trimmed, lowercase)"""
+    return email.strip().lower()
+
+def normalize_username(username: str) -> str:
+    """Canonical form of a username (trimmed, case preserved)"""
+    return username.strip()
 
 class UserRepository(BaseRepository[User]):
     def __init__(self):
         super().__init__(User)
-    
+
+    def version_keys(self, obj: User) -> List[str]:
+        """
+        User writes also invalidate the user's role/permission snapshot: a
+        deletion cascades the assignments away and a status change must cut
+        off access, while ``users`` keys are not part of ``user_access_keys``
+        """
+        return super().version_keys(obj) + [user_roles_key(obj.u_id)]
+
     def get_by_username(self, db: Session, username: str) -> Optional[User]:
-        """Get user by username"""
-        return db.query(User).filter(User.u_username == username).first()
-    
+        """
+        Get user by username (case-insensitive, uses ux_users_lower_username).
+        Legacy tenants may still hold usernames differing only in case (see
+        upgrade_tenant_schemas); the lowest u_id then wins, deterministically.
+        """
+        return db.query(User).filter(
+            func.lower(User.u_username) == normalize_username(username).lower()
+        ).order_by(User.u_id).first()
+
     def get_by_email(self, db: Session, email: str) -> Optional[User]:
-        """Get user by email"""
-        return db.query(User).filter(User.u_email == email).first()
-    
-    def get_by_username_or_email(self, db: Session, identifier: str) -> Optional[User]:
-        """Get user by username or email"""
+        """Get user by email (case-insensitive, uses ix_users_lower_email)"""
         return db.query(User).filter(
-            (User.u_username == identifier) | (User.u_email == identifier)
-        ).first()
\ No newline at end of file
+            func.lower(User.u_email) == normalize_email(email)
+        ).order_by(User.u_id).first()
+
+    @traced()
+    def get_by_username_or_email(self, db: Session, identifier: str) -> Optional[User]:
+        """
+        Get user by login identifier.
+        Identifiers containing '@' are looked up as email, others as username,
+        so each login is a single probe on one functional index.
+        """
+        if "@" in identifier:
+            return self.get_by_email(db, identifier)
+        return self.get_by_username(db, identifier)
+
+    @traced()
+    def search(
+        self,
+        db: Session,
+        filters: UserFilter,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[User]:
+        """Search users with filters and sort order (backed by trigram/btree indexes)"""
+        return (
+            self._search_query(db, filters)
+            .order_by(*self._order_by(filters.sort))
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    @traced()
+    def search_rows(
+        self,
+        db: Session,
+        filters: UserFilter,
+        fields: Sequence[str],
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[Row]:
+        """Search users returning only the given columns as row tuples"""
+        return list(
+            self._search_query(db, filters)
+            .with_entities(*self._columns(fields))
+            .order_by(*self._order_by(filters.sort))
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    @traced()
+    def count_search(self, db: Session, filters: UserFilter, cap: Optional[int] = None) -> int:
+        """
+        Count users matching the filters. With ``cap``, counting stops after
+        ``cap + 1`` matches, so a result above ``cap`` means "more than cap".
+        """
+        query = self._search_query(db, filters).order_by(None)
+        if cap is None:
+            return query.count()
+        matches = query.with_entities(User.u_id).limit(cap + 1).subquery()
+        return db.query(func.count()).select_from(matches).scalar() or 0
+
+    def update_activity(
+        self,
+        db: Session,
+        rows: Sequence[Tuple[int, Optional[datetime], Optional[datetime]]]
+    ) -> None:
+        """
+        Apply (u_id, last_login_at, last_seen_at) tuples as one
+        ``UPDATE ... FROM (VALUES ...)``. Timestamps only move forward.
+        Does not commit and does not bump versions (activity is not part of ETags).
+        """
+        if not rows:
+            return
+        values = []
+        params = {}
+        for i, (user_id, last_login, last_seen) in enumerate(rows):
+            values.append(f"(CAST(:u{i} AS BIGINT), CAST(:l{i} AS TIMESTAMP), CAST(:s{i} AS TIMESTAMP))")
+            params.update({f"u{i}": user_id, f"l{i}": last_login, f"s{i}": last_seen})
+        db.execute(text(f"""
+            UPDATE users AS u
+            SET last_login_at = GREATEST(u.last_login_at, v.last_login_at),
+                last_seen_at = GREATEST(u.last_seen_at, v.last_seen_at)
+            FROM (VALUES {", ".join(values)}) AS v (u_id, last_login_at, last_seen_at)
+            WHERE u.u_id = v.u_id
+        """), params)
+
+    @traced()
+    def get_inactive_rows(
+        self,
+        db: Session,
+        since: datetime,
+        fields: Sequence[str],
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[Row]:
+        """Users not seen since ``since`` (never-seen users created before it), least recent first"""
+        return list(
+            self._inactive_query(db, since)
+            .with_entities(*self._columns(fields))
+            .order_by(User.last_seen_at.asc().nulls_first(), User.u_id.asc())
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    def count_inactive(self, db: Session, since: datetime) -> int:
+        return self._inactive_query(db, since).count()
+
+    def _inactive_query(self, db: Session, since: datetime) -> Query:
+        # ix_users_last_seen_at_nulls_first_id, plus ix_users_created_at_id untuk yang belum pernah terlihat
+        return db.query(User).filter(or_(
+            User.last_seen_at < since,
+            and_(User.last_seen_at.is_(None), User.created_at < since)
+        ))
+
+    def _search_query(self, db: Session, filters: UserFilter) -> Query:
+        query = db.query(User)
+
+        if filters.search:
+            # Escape wildcard LIKE agar input diperlakukan sebagai substring literal
+            escaped = filters.search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            pattern = f"%{escaped}%"
+            query = query.filter(or_(
+                User.u_username.ilike(pattern, escape="\\"),
+                User.u_email.ilike(pattern, escape="\\"),
+                User.u_full_name.ilike(pattern, escape="\\"),
+            ))
+
+        if filters.status is not None:
+            query = query.filter(User.u_status == filters.status)
+
+        if filters.email_verified is not None:
+            query = query.filter(User.u_email_verified == filters.email_verified)
+
+        if filters.role_id is not None:
+            query = query.filter(exists().where(
+                UserRole.ur_user_id == User.u_id,
+                UserRole.ur_role_id == filters.role_id
+            ))
+
+        if filters.app_id is not None:
+            query = query.filter(exists().where(
+                UserRole.ur_user_id == User.u_id,
+                UserRole.ur_role_id == Role.r_id,
+                Role.r_app_id == filters.app_id
+            ))
+
+        return query
+
+    def _order_by(self, sort: str) -> list:
+        descending = sort.startswith("-")
+        column = USER_SORT_FIELDS.get(sort.lstrip("-"), User.u_id)
+        if descending:
+            return [column.desc(), User.u_id.desc()]
+        return [column.asc(), User.u_id.asc()]
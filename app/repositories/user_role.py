@@ -4,6 +4,8 @@ from sqlalchemy import text
 
 from app.models.user_role import UserRole
 from app.models.role import Role
+from app.core.tracing import traced
+from app.core.versioning import user_roles_key
 from app.repositories.base import BaseRepository
 
 class UserRoleRepository(BaseRepository[UserRole]):
@@ -25,11 +27,18 @@ class UserRoleRepository(BaseRepository[UserRole]):
         """Delete specific user-role assignment"""
         user_role = self.get_by_user_and_role(db, user_id, role_id)
         if user_role:
+            keys = self.version_keys(user_role)
             db.delete(user_role)
             db.commit()
+            self.touch_keys(db, keys)
             return True
         return False
     
+    def version_keys(self, obj: UserRole) -> List[str]:
+        """Assignment changes also invalidate the user's role/permission snapshot"""
+        return super().version_keys(obj) + [user_roles_key(obj.ur_user_id)]
+    
+    @traced()
     def get_user_roles_with_details(self, db: Session, user_id: int) -> List[dict]:
         """Get user roles with application and role details"""
         query = text("""
@@ -53,6 +62,7 @@ class UserRoleRepository(BaseRepository[UserRole]):
         result = db.execute(query, {"user_id": user_id})
         return [dict(row._mapping) for row in result.fetchall()]
     
+    @traced()
     def get_user_roles_with_permissions(self, db: Session, user_id: int) -> List[Role]:
         """Get all role objects for a user to access their permissions"""
         return db.query(Role).join(UserRole, Role.r_id == UserRole.ur_role_id).filter(UserRole.ur_user_id == user_id).all()
\ No newline at end of file
@@ -29,7 +29,9 @@ class RoleWithUsers(BaseModel):
     r_id: int
     r_code: str
     r_name: str
-    users: List[User]
+    user_count: int = 0
+    users: List[User] = []
+    next_cursor: Optional[int] = None
 
 class ApplicationWithRoles(ApplicationInDB):
     roles: List[RoleWithUsers]
@@ -0,0 +1,14 @@
+from typing import Any, Dict, Optional
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict
+
+class AuditEvent(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    ae_id: int
+    ae_type: str
+    ae_user_id: Optional[int]
+    ae_actor_id: Optional[int]
+    ae_ip: Optional[str]
+    ae_details: Dict[str, Any]
+    created_at: datetime
@@ -32,6 +32,12 @@ class UserInfo(BaseModel):
     u_email_verified: bool
     roles: List[UserRoleWithDetails] = []
 
+class PermissionSnapshot(BaseModel):
+    """Everything a service needs to authorize the caller locally (see atlas_client)"""
+    u_id: int
+    permissions: List[str]
+    roles: List[UserRoleWithDetails] = []
+
 class ForgotPasswordRequest(BaseModel):
     email: EmailStr
 
@@ -0,0 +1,20 @@
+from typing import Any, Dict, List
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict
+
+from app.schemas.common import ResponseBase
+
+class ChangeEvent(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    ce_seq: int
+    ce_type: str
+    ce_entity: str
+    ce_entity_id: int
+    ce_details: Dict[str, Any]
+    created_at: datetime
+
+class ChangeFeedResponse(ResponseBase):
+    """Events after ``since``; poll again with ``since=last_seq``"""
+    data: List[ChangeEvent]
+    last_seq: int
@@ -15,4 +15,11 @@ class PaginationResponse(ResponseBase, Generic[T]):
     total: int
     page: int
     size: int
-    pages: int
\ No newline at end of file
+    pages: int
+    # True jika total berhenti di batas hitung (total dan pages adalah batas bawah)
+    total_capped: bool = False
+
+class CursorResponse(ResponseBase, Generic[T]):
+    """Keyset-paginated list; pass ``next_cursor`` back as ``cursor`` for the next page"""
+    data: List[T]
+    next_cursor: Optional[str]
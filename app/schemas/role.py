@@ -40,6 +40,8 @@ class Role(RoleInDB):
     pass
 
 class RoleWithDetails(RoleInDB):
-    """Role with application info and assigned users"""
+    """Role with application info, member count and (optionally) a page of users"""
     application: ApplicationInfo
-    users: List[User] = []
\ No newline at end of file
+    user_count: int = 0
+    users: List[User] = []
+    next_cursor: Optional[int] = None
\ No newline at end of file
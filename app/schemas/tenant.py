@@ -1,14 +1,45 @@
-from typing import List
-from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, field_validator
 
 class TenantCreate(BaseModel):
     schema_name: str
+    plan: str = "standard"
+
+class TenantUpdate(BaseModel):
+    status: Optional[str] = None
+    plan: Optional[str] = None
+
+    @field_validator("status", "plan")
+    @classmethod
+    def not_null(cls, value: Optional[str]) -> str:
+        # Boleh tidak dikirim, tapi kolomnya NOT NULL: null eksplisit ditolak (422)
+        if value is None:
+            raise ValueError("must not be null")
+        return value
+
+class TenantRecord(BaseModel):
+    """Tenant registry entry (public.tenants)"""
+    model_config = ConfigDict(from_attributes=True)
+
+    t_id: int
+    t_schema_name: str
+    t_status: str
+    t_shard: str
+    t_plan: str
+    created_at: datetime
+    updated_at: Optional[datetime] = None
 
 class TenantInfo(BaseModel):
     schema_name: str
     table_count: int
     created: bool
+    status: Optional[str] = None
+    shard: Optional[str] = None
+    plan: Optional[str] = None
+    created_at: Optional[datetime] = None
 
 class TenantList(BaseModel):
     schemas: List[str]
     count: int
+    tenants: List[TenantRecord] = []
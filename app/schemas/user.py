@@ -29,4 +29,18 @@ class UserInDB(UserBase):
     updated_at: Optional[datetime]
 
 class User(UserInDB):
-    pass
\ No newline at end of file
+    pass
+
+class UserActivity(User):
+    """User with activity timestamps (flushed periodically, may lag by ACTIVITY_FLUSH_SECONDS)"""
+    last_login_at: Optional[datetime]
+    last_seen_at: Optional[datetime]
+
+class UserFilter(BaseModel):
+    """Server-side search/filter criteria for user listing"""
+    search: Optional[str] = None
+    status: Optional[str] = None
+    email_verified: Optional[bool] = None
+    role_id: Optional[int] = None
+    app_id: Optional[int] = None
+    sort: str = "id"
@@ -1,6 +1,7 @@
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Sequence, cast
 from sqlalchemy.orm import Session
 
+from app.core.change_feed import change_feed
 from app.repositories.application import ApplicationRepository
 from app.repositories.role import RoleRepository
 from app.schemas.application import (
@@ -12,33 +13,56 @@ from app.schemas.application import (
 )
 from app.schemas.user import User
 
+APPLICATION_FIELDS = list(Application.model_fields)
+
 class ApplicationService:
     def __init__(self):
         self.repository = ApplicationRepository()
         self.role_repository = RoleRepository()
 
-    def get_application_details(self, db: Session, app_id: int) -> Optional[ApplicationWithRoles]:
-        """Get application details with roles and users"""
-        db_app = self.repository.get_application_with_roles_and_users(db, app_id)
+    def get_application_details(
+        self,
+        db: Session,
+        app_id: int,
+        include_users: bool = True,
+        users_limit: int = 100
+    ) -> Optional[ApplicationWithRoles]:
+        """
+        Get application details with roles and member count per role.
+        With include_users, the first ``users_limit`` members of each role are
+        added (one query for all roles); further pages come from
+        GET /roles/{id}?include=users&cursor=<next_cursor>
+        """
+        db_app = self.repository.get_application_with_roles(db, app_id)
         if not db_app:
             return None
 
+        role_ids = [cast(int, role.r_id) for role in db_app.roles]
+        user_counts = self.role_repository.count_users_by_role(db, role_ids)
+        # Satu baris ekstra per role untuk mengetahui apakah masih ada halaman berikutnya
+        members = self.role_repository.get_users_by_roles(db, role_ids, users_limit + 1) if include_users else {}
+
         roles_with_users = []
         for role in db_app.roles:
-            users_in_role = [User.model_validate(user_role.user) for user_role in role.user_roles]
+            db_users = members.get(cast(int, role.r_id), [])
+            users_in_role = [User.model_validate(user) for user in db_users[:users_limit]]
+            next_cursor = users_in_role[-1].u_id if len(db_users) > users_limit and users_in_role else None
             roles_with_users.append(
                 RoleWithUsers(
                     r_id=role.r_id,
                     r_code=role.r_code,
                     r_name=role.r_name,
+                    user_count=user_counts.get(cast(int, role.r_id), 0),
                     users=users_in_role,
+                    next_cursor=next_cursor,
                 )
             )
 
-        app_data = Application.model_validate(db_app).model_dump()
+        # Bagian-bagiannya sudah tervalidasi, jadi cukup construct tanpa validasi ulang
+        app_data = dict(Application.model_validate(db_app))
         app_data["roles"] = roles_with_users
 
-        return ApplicationWithRoles.model_validate(app_data)
+        return ApplicationWithRoles.model_construct(**app_data)
     
     def get_application(self, db: Session, app_id: int) -> Optional[Application]:
         """Get single application"""
@@ -52,8 +76,19 @@ class ApplicationService:
         limit: int = 100
     ) -> List[Application]:
         """Get list of applications"""
-        db_apps = self.repository.get_multi(db, skip=skip, limit=limit)
-        return [Application.model_validate(app) for app in db_apps]
+        rows = self.repository.get_multi_rows(db, APPLICATION_FIELDS, skip=skip, limit=limit)
+        return [Application.model_validate(row) for row in rows]
+
+    def get_applications_fields(
+        self,
+        db: Session,
+        fields: Sequence[str],
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Get list of applications projected to the requested fields (sparse fieldset)"""
+        rows = self.repository.get_multi_rows(db, fields, skip=skip, limit=limit)
+        return [dict(row._mapping) for row in rows]
 
     def create_application(self, db: Session, app: ApplicationCreate) -> Application:
         """Create new application"""
@@ -72,12 +107,28 @@ class ApplicationService:
             return None
 
         update_data = app.model_dump(exclude_unset=True)
+        # app_code lama: konsumen mencocokkan role snapshot lewat kode aplikasi
+        change_feed.emit(
+            db, "application_updated", "application", app_id,
+            app_code=db_app.app_code, fields=sorted(update_data)
+        )
         db_app = self.repository.update(db, db_app, update_data)
         return Application.model_validate(db_app)
 
     def delete_application(self, db: Session, app_id: int) -> bool:
-        """Delete application"""
+        """Delete application (its roles and their assignments cascade)"""
+        db_app = self.repository.get(db, app_id)
+        if not db_app:
+            return False
+
+        # Role ikut terhapus via cascade tanpa event sendiri, jadi id-nya dicatat di sini
+        change_feed.emit(
+            db, "application_deleted", "application", app_id,
+            app_code=db_app.app_code, role_ids=[role.r_id for role in db_app.roles]
+        )
         deleted = self.repository.delete(db, app_id)
+        if deleted is None:
+            change_feed.discard(db)
         return deleted is not None
 
     def get_total_applications(self, db: Session) -> int:
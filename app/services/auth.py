@@ -8,21 +8,32 @@ from fastapi import HTTPException, status
 from app.core.config import settings
 from app.core.security import (
     verify_password, create_access_token, get_password_hash,
-    create_short_lived_token, verify_short_lived_token, pwd_context, create_refresh_token
+    create_short_lived_token, verify_short_lived_token, create_refresh_token
 )
-from app.repositories.user import UserRepository
+from app.models.user import User as UserModel
+from app.repositories.user import UserRepository, normalize_email
 from app.repositories.refresh_token import RefreshTokenRepository
-from app.schemas.auth import LoginResponse, RefreshTokenResponse, UserInfo
+from app.schemas.auth import LoginResponse, PermissionSnapshot, RefreshTokenResponse, UserInfo
 from app.schemas.user import User
-from app.core.mailer import send_email
+from app.core.metrics import EMAIL_THROTTLE
+from app.core.throttle import email_limiter, missing_email_cache, missing_email_key
+from app.core.tracing import traced
+from app.core.versioning import session_tenant
+from app.services.email import EmailService
 from app.services.user_role import UserRoleService 
 
+# Kolom yang cukup untuk membuat access token / UserInfo (tanpa password hash)
+TOKEN_USER_FIELDS = ["u_id", "u_username", "u_email", "u_status"]
+USER_INFO_FIELDS = TOKEN_USER_FIELDS + ["u_full_name", "u_email_verified"]
+
 class AuthService:
     def __init__(self):
         self.user_repo = UserRepository()
         self.refresh_token_repo = RefreshTokenRepository()
         self.user_role_service = UserRoleService()
+        self.email_service = EmailService()
     
+    @traced()
     def authenticate_user(self, db: Session, username: str, password: str) -> Optional[User]:
         """Authenticate user with username/email and password"""
         db_user = self.user_repo.get_by_username_or_email(db, username)
@@ -38,6 +49,7 @@ class AuthService:
         
         return User.model_validate(db_user)
     
+    @traced()
     def create_tokens(self, db: Session, user: User, user_agent: str = "", ip_address: str = "") -> LoginResponse:
         """Create tokens with enhanced security"""
         # --- PERUBAHAN DI SINI ---
@@ -48,7 +60,7 @@ class AuthService:
         refresh_token = create_refresh_token(data=refresh_token_payload)
         
         # 3. Hash JWT tersebut untuk disimpan di database (konsisten dengan verifikasi)
-        refresh_token_hash = pwd_context.hash(refresh_token)
+        refresh_token_hash = get_password_hash(refresh_token)
         # --- AKHIR PERUBAHAN ---
 
         # Simpan dengan expiration
@@ -75,6 +87,7 @@ class AuthService:
             expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
         )
     
+    @traced()
     def refresh_access_token(self, db: Session, refresh_token: str, user_id: int) -> Optional[RefreshTokenResponse]:
         """Create new access token from refresh token"""
         db_refresh_tokens = self.refresh_token_repo.get_by_user_id(db, user_id)
@@ -82,14 +95,14 @@ class AuthService:
         db_refresh_token = None
         for token in db_refresh_tokens:
             # PEMBERSIHAN KECIL: Gunakan akses atribut langsung, lebih mudah dibaca
-            if pwd_context.verify(refresh_token, getattr(token, "rt_token_hash")):
+            if verify_password(refresh_token, getattr(token, "rt_token_hash")):
                 db_refresh_token = token
                 break
 
         if not db_refresh_token:
             return None
         
-        user = self.user_repo.get(db, db_refresh_token.rt_user_id)
+        user = self.user_repo.get(db, db_refresh_token.rt_user_id, fields=TOKEN_USER_FIELDS)
         
         if not user or cast(str, user.u_status) != "active":
             return None
@@ -107,6 +120,7 @@ class AuthService:
             expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
         )
     
+    @traced()
     def logout_user(self, db: Session, refresh_token: str, user_id: int) -> bool:
         """Logout user by removing refresh token"""
         db_refresh_tokens = self.refresh_token_repo.get_by_user_id(db, user_id)
@@ -114,7 +128,7 @@ class AuthService:
         token_to_delete = None
         for token in db_refresh_tokens:
             # PEMBERSIHAN KECIL: Gunakan akses atribut langsung
-            if pwd_context.verify(refresh_token, getattr(token, "rt_token_hash")):
+            if verify_password(refresh_token, getattr(token, "rt_token_hash")):
                 token_to_delete = token
                 break
         
@@ -125,15 +139,16 @@ class AuthService:
             
         return False
 
+    @traced()
     def get_user_info(self, db: Session, user_id: int) -> Optional[UserInfo]:
         """Get user info by ID"""
-        user = self.user_repo.get(db, user_id)
+        user = self.user_repo.get(db, user_id, fields=USER_INFO_FIELDS)
         
         if not user:
             return None
         
         # Get user roles
-        user_roles = self.user_role_service.get_user_roles(db, user_id)
+        user_roles = self.user_role_service.get_cached_user_roles(db, user_id)
         
         return UserInfo(
             u_id=cast(int, user.u_id),
@@ -145,11 +160,69 @@ class AuthService:
             roles=user_roles # Menambahkan roles ke dalam response
         )
     
-    async def request_email_verification(self, db: Session, email: str):
+    @traced()
+    def get_permission_snapshot(self, db: Session, user_id: int) -> PermissionSnapshot:
+        """Permissions and roles of a user, from the access cache when current"""
+        return PermissionSnapshot(
+            u_id=user_id,
+            permissions=sorted(self.user_role_service.get_cached_user_permissions(db, user_id)),
+            roles=self.user_role_service.get_cached_user_roles(db, user_id)
+        )
+    
+    def _resolve_email_recipient(
+        self, db: Session, purpose: str, email: str, client_ip: str
+    ) -> Optional[UserModel]:
         """
-        Memproses permintaan untuk mengirim email verifikasi.
+        Throttle an unauthenticated email request and resolve its recipient.
+
+        Too many requests from one IP are rejected with 429. Repeats for the
+        same recipient inside the window, and addresses recently found not to
+        exist, are absorbed without a query or an email. Returns the user to
+        email, or None when nothing should be sent.
         """
+        allowed, retry_after = email_limiter.hit(
+            f"ip:{client_ip}",
+            settings.EMAIL_THROTTLE_IP_LIMIT,
+            settings.EMAIL_THROTTLE_IP_WINDOW_SECONDS
+        )
+        if not allowed:
+            EMAIL_THROTTLE.labels("ip_blocked").inc()
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Terlalu banyak permintaan. Silakan coba lagi nanti.",
+                headers={"Retry-After": str(retry_after)}
+            )
+
+        tenant = session_tenant(db)
+        email = normalize_email(email)
+        allowed, _ = email_limiter.hit(
+            f"{purpose}:{tenant}:{email}",
+            settings.EMAIL_THROTTLE_RECIPIENT_LIMIT,
+            settings.EMAIL_THROTTLE_RECIPIENT_WINDOW_SECONDS
+        )
+        if not allowed:
+            EMAIL_THROTTLE.labels("recipient_absorbed").inc()
+            return None
+
+        if missing_email_cache.contains(missing_email_key(tenant, email)):
+            EMAIL_THROTTLE.labels("negative_cache_hit").inc()
+            return None
+
         user = self.user_repo.get_by_email(db, email)
+        if not user:
+            missing_email_cache.add(missing_email_key(tenant, email))
+            EMAIL_THROTTLE.labels("unknown_recipient").inc()
+            return None
+
+        EMAIL_THROTTLE.labels("sent").inc()
+        return user
+
+    def request_email_verification(self, db: Session, email: str, client_ip: str = ""):
+        """
+        Memproses permintaan untuk mengirim email verifikasi.
+        Email dimasukkan ke outbox dan dikirim oleh worker background.
+        """
+        user = self._resolve_email_recipient(db, "verify", email, client_ip)
         if not user:
             # Tidak melempar error untuk mencegah user enumeration
             return
@@ -161,9 +234,10 @@ class AuthService:
         token_data = {"sub": cast(str, user.u_email), "scope": "email_verification"}
         verification_token = create_short_lived_token(token_data, timedelta(hours=1))
         
-        # Kirim email
+        # Antrekan email
         verification_link = f"{settings.FRONTEND_URL}/verify-email?token={verification_token}"
-        await send_email(
+        self.email_service.enqueue(
+            db,
             subject="Verifikasi Email Anda",
             recipient=cast(str, user.u_email),
             template_name="verify_email.html",
@@ -191,14 +265,16 @@ class AuthService:
         user.u_email_verified = True  # type: ignore
         db.add(user)
         db.commit()
+        self.user_repo.touch(db, [user])
         
         return True
 
-    async def forgot_password(self, db: Session, email: str):
+    def forgot_password(self, db: Session, email: str, client_ip: str = ""):
         """
         Memproses permintaan lupa password dan mengirim email reset.
+        Email dimasukkan ke outbox dan dikirim oleh worker background.
         """
-        user = self.user_repo.get_by_email(db, email)
+        user = self._resolve_email_recipient(db, "reset", email, client_ip)
         if not user:
             # Tidak melempar error untuk mencegah user enumeration
             return
@@ -207,9 +283,10 @@ class AuthService:
         token_data = {"sub": cast(str, user.u_email), "scope": "password_reset"}
         reset_token = create_short_lived_token(token_data, timedelta(minutes=15))
         
-        # Kirim email
+        # Antrekan email
         reset_link = f"{settings.FRONTEND_URL}/reset-password?token={reset_token}"
-        await send_email(
+        self.email_service.enqueue(
+            db,
             subject="Permintaan Reset Password",
             recipient=cast(str, user.u_email),
             template_name="reset_password.html",
@@ -0,0 +1,63 @@
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session
+
+from app.core.versioning import session_tenant
+from app.db.shards import DEFAULT_SHARD
+from app.repositories.email_outbox import EmailOutboxRepository
+
+class EmailService:
+    def __init__(self):
+        self.outbox_repo = EmailOutboxRepository()
+
+    def enqueue(
+        self,
+        db: Session,
+        subject: str,
+        recipient: str,
+        template_name: str,
+        template_body: Dict[str, Any],
+        locale: Optional[str] = None
+    ) -> None:
+        """Queue one email in the outbox; the background sender delivers it"""
+        self.enqueue_many(db, [{
+            "subject": subject,
+            "recipient": recipient,
+            "template_name": template_name,
+            "template_body": template_body,
+            "locale": locale,
+        }])
+
+    def enqueue_many(self, db: Session, messages: List[Dict[str, Any]]) -> None:
+        """
+        Queue several emails in one insert. The outbox lives on the default
+        shard: for tenants on another shard the insert runs in its own
+        session, so it is not atomic with the caller's tenant writes (commit
+        those first).
+        """
+        # Import lokal: worker bergantung pada session/repository
+        from app.core.email_worker import email_worker
+        from app.db.session import SessionLocal
+
+        tenant = session_tenant(db)
+        # Satu session di dua shard = dua commit terpisah tanpa jaminan atomik; pakai session sendiri
+        outbox_db = db if db.info.get("shard", DEFAULT_SHARD) == DEFAULT_SHARD else SessionLocal()
+        try:
+            self._insert(outbox_db, tenant, messages)
+        finally:
+            if outbox_db is not db:
+                outbox_db.close()
+        # Bangunkan sender di proses ini agar email tidak menunggu interval polling
+        email_worker.wake()
+
+    def _insert(self, db: Session, tenant: str, messages: List[Dict[str, Any]]) -> None:
+        self.outbox_repo.enqueue(db, [
+            {
+                "eo_tenant": tenant,
+                "eo_recipient": message["recipient"],
+                "eo_subject": message["subject"],
+                "eo_template": message["template_name"],
+                "eo_template_body": message["template_body"],
+                "eo_locale": message.get("locale"),
+            }
+            for message in messages
+        ])
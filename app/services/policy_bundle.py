@@ -0,0 +1,150 @@
+"""
+Policy bundles: a tenant's complete authorization state as NDJSON, for
+authorizers that decide offline.
+
+Every line is one JSON object with a ``type``:
+
+- ``header``: ``version`` (change feed sequence the bundle reflects),
+  ``mode`` (``full`` or ``delta``) and, for deltas, ``since``
+- ``application`` and ``role`` (with ``permissions`` = ``r_permissions``):
+  always complete; they replace the consumer's applications and roles
+- ``user_roles``: the role ids of one active user, replacing what the
+  consumer holds for that user. A full bundle lists every active user with
+  roles; a delta lists users with change feed events after ``since``, with
+  an empty list when the user lost all roles, was deactivated or deleted.
+  Role ids missing from the roles are ignored (deleted roles).
+- ``signature`` (last line, when ``POLICY_BUNDLE_SIGNING_KEY`` is set):
+  HMAC-SHA256 over the bytes of all preceding lines
+
+The bundle is read in one REPEATABLE READ transaction, so ``version`` and
+the content match, with server-side cursors of ``POLICY_BUNDLE_FETCH_SIZE``
+rows; assignments are never loaded as a whole.
+"""
+import hashlib
+import hmac
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import orjson
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.application import Application
+from app.models.role import Role
+from app.models.user import User
+from app.models.user_role import UserRole
+from app.repositories.change_event import ChangeEventRepository
+
+class PolicyBundleService:
+    def __init__(self):
+        self.change_event_repo = ChangeEventRepository()
+
+    def stream(self, db: Session, tenant: str, since: Optional[int] = None) -> Iterator[bytes]:
+        """NDJSON lines of a full bundle, or a delta after version ``since``"""
+        # Isolation harus diset sebelum transaksi dimulai
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        version = self.change_event_repo.get_last_seq(db)
+        signer = hmac.new(settings.POLICY_BUNDLE_SIGNING_KEY.encode(), digestmod=hashlib.sha256) \
+            if settings.POLICY_BUNDLE_SIGNING_KEY else None
+
+        header: Dict[str, Any] = {
+            "type": "header",
+            "tenant": tenant,
+            "version": version,
+            "mode": "full" if since is None else "delta",
+            "generated_at": datetime.now().isoformat(),
+        }
+        if since is not None:
+            header["since"] = since
+
+        records = [iter([header]), self._applications(db), self._roles(db)]
+        if since is None:
+            records.append(self._all_user_roles(db))
+        else:
+            records.append(self._changed_user_roles(db, since, version))
+
+        for source in records:
+            for record in source:
+                line = orjson.dumps(record) + b"\n"
+                if signer is not None:
+                    signer.update(line)
+                yield line
+
+        if signer is not None:
+            yield orjson.dumps({
+                "type": "signature",
+                "alg": "HMAC-SHA256",
+                "value": signer.hexdigest(),
+            }) + b"\n"
+
+    def _rows(self, db: Session, statement) -> Iterator[Any]:
+        # yield_per: psycopg2 memakai server-side cursor, baris diambil per batch
+        result = db.execute(statement.execution_options(yield_per=settings.POLICY_BUNDLE_FETCH_SIZE))
+        try:
+            yield from result
+        finally:
+            result.close()
+
+    def _applications(self, db: Session) -> Iterator[Dict[str, Any]]:
+        statement = select(Application.app_id, Application.app_code).order_by(Application.app_id)
+        for row in self._rows(db, statement):
+            yield {"type": "application", "id": row.app_id, "code": row.app_code}
+
+    def _roles(self, db: Session) -> Iterator[Dict[str, Any]]:
+        statement = select(
+            Role.r_id, Role.r_app_id, Role.r_code, Role.r_level, Role.r_permissions
+        ).order_by(Role.r_id)
+        for row in self._rows(db, statement):
+            yield {
+                "type": "role",
+                "id": row.r_id,
+                "app_id": row.r_app_id,
+                "code": row.r_code,
+                "level": row.r_level,
+                "permissions": row.r_permissions or {},
+            }
+
+    def _assignments(self, user_ids: Optional[List[int]] = None):
+        statement = (
+            select(UserRole.ur_user_id, UserRole.ur_role_id)
+            .join(User, User.u_id == UserRole.ur_user_id)
+            .where(User.u_status == "active")
+            .order_by(UserRole.ur_user_id, UserRole.ur_role_id)
+        )
+        if user_ids is not None:
+            statement = statement.where(UserRole.ur_user_id.in_(user_ids))
+        return statement
+
+    def _group(self, rows: Iterable[Any]) -> Iterator[Tuple[int, List[int]]]:
+        """Group (user_id, role_id) rows ordered by user into one entry per user"""
+        current: Optional[int] = None
+        role_ids: List[int] = []
+        for row in rows:
+            if row.ur_user_id != current:
+                if current is not None:
+                    yield current, role_ids
+                current, role_ids = row.ur_user_id, []
+            role_ids.append(row.ur_role_id)
+        if current is not None:
+            yield current, role_ids
+
+    def _all_user_roles(self, db: Session) -> Iterator[Dict[str, Any]]:
+        for user_id, role_ids in self._group(self._rows(db, self._assignments())):
+            yield {"type": "user_roles", "user_id": user_id, "role_ids": role_ids}
+
+    def _changed_user_roles(self, db: Session, since: int, version: int) -> Iterator[Dict[str, Any]]:
+        changed = self._rows(db, text("""
+            SELECT DISTINCT ce_entity_id
+            FROM change_events
+            WHERE ce_seq > :since AND ce_seq <= :version AND ce_entity = 'user'
+            ORDER BY ce_entity_id
+        """).bindparams(since=since, version=version))
+        user_ids = [row.ce_entity_id for row in changed]
+
+        batch_size = settings.POLICY_BUNDLE_FETCH_SIZE
+        for start in range(0, len(user_ids), batch_size):
+            batch = user_ids[start:start + batch_size]
+            assigned = dict(self._group(db.execute(self._assignments(batch))))
+            for user_id in batch:
+                yield {"type": "user_roles", "user_id": user_id, "role_ids": assigned.get(user_id, [])}
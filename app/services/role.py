@@ -1,11 +1,15 @@
-from typing import Optional, List, Dict, Any, cast
+from typing import Optional, List, Dict, Any, Sequence, Tuple, cast
 from sqlalchemy.orm import Session
 
+from app.core.audit import AuditActor, audit_log
+from app.core.change_feed import change_feed
 from app.repositories.role import RoleRepository
 from app.repositories.application import ApplicationRepository
 from app.schemas.role import Role, RoleCreate, RoleUpdate, RoleWithDetails, ApplicationInfo
 from app.schemas.user import User
 
+ROLE_FIELDS = list(Role.model_fields)
+
 class RoleService:
     def __init__(self):
         self.repository = RoleRepository()
@@ -16,24 +20,54 @@ class RoleService:
         db_role = self.repository.get(db, role_id)
         return Role.model_validate(db_role) if db_role else None
     
-    def get_role_with_details(self, db: Session, role_id: int) -> Optional[RoleWithDetails]:
-        """Get role with application info and assigned users"""
-        db_role = self.repository.get_with_application_and_users(db, role_id)
+    def get_role_with_details(
+        self,
+        db: Session,
+        role_id: int,
+        include_users: bool = True,
+        users_limit: int = 100,
+        cursor: Optional[int] = None
+    ) -> Optional[RoleWithDetails]:
+        """
+        Get role with application info and member count.
+        With include_users, one page of members (after ``cursor``) is added.
+        """
+        db_role = self.repository.get_with_application(db, role_id)
         if not db_role:
             return None
         
         # Extract application info
         application_info = ApplicationInfo.model_validate(db_role.application)
+        user_count = self.repository.count_users_by_role(db, [role_id]).get(role_id, 0)
         
-        # Extract users from user_roles relationship
-        users = [User.model_validate(ur.user) for ur in db_role.user_roles]
-        
-        # Create role with details
-        role_data = Role.model_validate(db_role).model_dump()
+        # Create role with details; bagian-bagiannya sudah tervalidasi, jadi cukup construct
+        role_data = dict(Role.model_validate(db_role))
         role_data['application'] = application_info
-        role_data['users'] = users
+        role_data['user_count'] = user_count
+        role_data['users'] = []
+        role_data['next_cursor'] = None
+        
+        if include_users:
+            users, next_cursor = self.get_role_users_page(db, role_id, users_limit, cursor)
+            role_data['users'] = users
+            role_data['next_cursor'] = next_cursor
         
-        return RoleWithDetails.model_validate(role_data)
+        return RoleWithDetails.model_construct(**role_data)
+    
+    def get_role_users_page(
+        self,
+        db: Session,
+        role_id: int,
+        limit: int = 100,
+        cursor: Optional[int] = None
+    ) -> Tuple[List[User], Optional[int]]:
+        """Get one page of role members and the cursor for the next page"""
+        # Ambil satu baris ekstra untuk mengetahui apakah masih ada halaman berikutnya
+        db_users = self.repository.get_role_users(db, role_id, limit=limit + 1, after_user_id=cursor)
+        has_more = len(db_users) > limit
+        users = [User.model_validate(user) for user in db_users[:limit]]
+        next_cursor = users[-1].u_id if has_more and users else None
+        return users, next_cursor
     
     def get_roles(
         self, 
@@ -43,12 +77,31 @@ class RoleService:
         limit: int = 100
     ) -> List[Role]:
         """Get list of roles, optionally filtered by application"""
-        if app_id:
-            db_roles = self.repository.get_by_app_id(db, app_id, skip=skip, limit=limit)
-        else:
-            db_roles = self.repository.get_multi(db, skip=skip, limit=limit)
-        
-        return [Role.model_validate(role) for role in db_roles]
+        rows = self._get_role_rows(db, ROLE_FIELDS, app_id, skip, limit)
+        return [Role.model_validate(row) for row in rows]
+    
+    def get_roles_fields(
+        self,
+        db: Session,
+        fields: Sequence[str],
+        app_id: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Get list of roles projected to the requested fields (sparse fieldset)"""
+        rows = self._get_role_rows(db, fields, app_id, skip, limit)
+        return [dict(row._mapping) for row in rows]
+    
+    def _get_role_rows(
+        self,
+        db: Session,
+        fields: Sequence[str],
+        app_id: Optional[int],
+        skip: int,
+        limit: int
+    ) -> list:
+        filter_by = {"r_app_id": app_id} if app_id else None
+        return self.repository.get_multi_rows(db, fields, skip=skip, limit=limit, filter_by=filter_by)
     
     def create_role(self, db: Session, role: RoleCreate) -> Optional[Role]:
         """Create new role"""
@@ -69,7 +122,8 @@ class RoleService:
         self, 
         db: Session, 
         role_id: int, 
-        role: RoleUpdate
+        role: RoleUpdate,
+        actor: Optional[AuditActor] = None
     ) -> Optional[Role]:
         """Update existing role"""
         db_role = self.repository.get(db, role_id)
@@ -87,12 +141,24 @@ class RoleService:
             if existing_role is not None and cast(int, existing_role.r_id) != role_id:  # Cast to int
                 return None
         
+        change_feed.emit(
+            db, "role_permissions_updated" if "r_permissions" in update_data else "role_updated",
+            "role", role_id, fields=sorted(update_data)
+        )
         updated_role = self.repository.update(db, db_role, update_data)
+        if updated_role and "r_permissions" in update_data:
+            audit_log.record(
+                db, "role_permissions_updated", actor=actor,
+                role_id=role_id, permissions=update_data["r_permissions"]
+            )
         return Role.model_validate(updated_role) if updated_role else None
     
     def delete_role(self, db: Session, role_id: int) -> bool:
         """Delete role"""
+        change_feed.emit(db, "role_deleted", "role", role_id)
         deleted = self.repository.delete(db, role_id)
+        if deleted is None:
+            change_feed.discard(db)
         return deleted is not None
     
     def get_total_roles(self, db: Session, app_id: Optional[int] = None) -> int:
@@ -105,7 +171,8 @@ class RoleService:
         self, 
         db: Session, 
         role_id: int, 
-        permissions: Dict[str, Any]
+        permissions: Dict[str, Any],
+        actor: Optional[AuditActor] = None
     ) -> Optional[Role]:
         """Update permissions for a specific role"""
         db_role = self.repository.get(db, role_id)
@@ -113,5 +180,8 @@ class RoleService:
             return None
         
         update_data = {"r_permissions": permissions}
+        change_feed.emit(db, "role_permissions_updated", "role", role_id, fields=["r_permissions"])
         updated_role = self.repository.update(db, db_role, update_data)
+        if updated_role:
+            audit_log.record(db, "role_permissions_updated", actor=actor, role_id=role_id, permissions=permissions)
         return Role.model_validate(updated_role) if updated_role else None
\ No newline at end of file
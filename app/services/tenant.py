@@ -1,60 +1,125 @@
-from typing import List
+import logging
+from typing import List, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
-from app.db.session import create_tenant_schema
+from app.db.session import create_tenant_schema, open_tenant_session
+from app.db.shards import shard_router
+from app.db.tenant_ddl import apply_tenant_ddl
+from app.db.tenant_catalog import tenant_catalog
+from app.repositories.tenant import TenantRepository
+from app.schemas.tenant import TenantRecord, TenantUpdate
+
+logger = logging.getLogger(__name__)
 
 class TenantService:
     def __init__(self):
-        pass
-    
-    def create_tenant(self, db: Session, schema_name: str) -> bool:
-        """Create a new tenant schema with all required tables"""
+        self.repository = TenantRepository()
+
+    def create_tenant(self, db: Session, schema_name: str, plan: str = "standard") -> bool:
+        """
+        Create a new tenant schema with all required tables and register it.
+        New tenants are placed on the least-loaded shard.
+        """
         try:
             # Validate schema name (basic validation)
             if not schema_name.isalnum() and '_' not in schema_name:
                 return False
-            
-            # Create schema using stored procedure
-            create_tenant_schema(db, schema_name)
+
+            shard = self.pick_shard(db)
+
+            # Create schema using stored procedure, di shard tujuan
+            tenant_db = open_tenant_session(schema_name, shard=shard)
+            try:
+                create_tenant_schema(tenant_db, schema_name)
+            finally:
+                tenant_db.close()
+
+            apply_tenant_ddl(shard_router.get_engine(shard), schema_name)
+
+            if self.repository.get_by_schema(db, schema_name) is None:
+                self.repository.create(
+                    db, {"t_schema_name": schema_name, "t_plan": plan, "t_shard": shard}
+                )
+
+            # Registry trigger memberi tahu proses lain; proses ini langsung refresh
+            self._refresh_catalog()
             return True
-            
+
         except Exception as e:
-            print(f"Error creating tenant schema: {e}")
+            db.rollback()
+            logger.error("Error creating tenant schema: %s", e)
             return False
-    
+
+    def pick_shard(self, db: Session) -> str:
+        """Choose the shard for a new tenant (fewest registered tenants)"""
+        return shard_router.least_loaded_shard(self.repository.count_by_shard(db))
+
+    def list_tenants(self, db: Session) -> List[TenantRecord]:
+        """List all registered tenants"""
+        return [TenantRecord.model_validate(t) for t in self.repository.get_all(db)]
+
     def list_tenant_schemas(self, db: Session) -> List[str]:
-        """List all tenant schemas (excluding system schemas)"""
-        query = text("""
-            SELECT schema_name 
-            FROM information_schema.schemata 
-            WHERE schema_name NOT IN ('information_schema', 'pg_catalog', 'pg_toast', 'public')
-            ORDER BY schema_name
-        """)
-        
-        result = db.execute(query)
-        return [row[0] for row in result.fetchall()]
-    
+        """List all tenant schema names from the registry"""
+        return [t.t_schema_name for t in self.list_tenants(db)]
+
+    def get_tenant(self, db: Session, schema_name: str) -> Optional[TenantRecord]:
+        """Get tenant registry entry"""
+        db_tenant = self.repository.get_by_schema(db, schema_name)
+        return TenantRecord.model_validate(db_tenant) if db_tenant else None
+
     def schema_exists(self, db: Session, schema_name: str) -> bool:
-        """Check if a schema exists"""
-        query = text("""
-            SELECT 1 FROM information_schema.schemata 
-            WHERE schema_name = :schema_name
-        """)
-        
-        result = db.execute(query, {"schema_name": schema_name})
-        return result.fetchone() is not None
-    
+        """Check if a tenant is registered"""
+        return self.repository.get_by_schema(db, schema_name) is not None
+
+    def update_tenant(
+        self,
+        db: Session,
+        schema_name: str,
+        tenant: TenantUpdate
+    ) -> Optional[TenantRecord]:
+        """Update tenant metadata (status, plan)"""
+        db_tenant = self.repository.get_by_schema(db, schema_name)
+        if db_tenant is None:
+            return None
+
+        update_data = {
+            f"t_{field}": value
+            for field, value in tenant.model_dump(exclude_unset=True).items()
+        }
+        db_tenant = self.repository.update(db, db_tenant, update_data)
+        self._refresh_catalog()
+        return TenantRecord.model_validate(db_tenant)
+
     def delete_tenant(self, db: Session, schema_name: str) -> bool:
         """Delete a tenant schema (use with caution!)"""
         try:
             if schema_name in ['public', 'information_schema', 'pg_catalog']:
                 return False
-            
-            db.execute(text(f"DROP SCHEMA IF EXISTS {schema_name} CASCADE"))
-            db.commit()
+
+            db_tenant = self.repository.get_by_schema(db, schema_name)
+            tenant_db = open_tenant_session(
+                schema_name, shard=str(db_tenant.t_shard) if db_tenant else None
+            )
+            try:
+                tenant_db.execute(text(f"DROP SCHEMA IF EXISTS {schema_name} CASCADE"))
+                tenant_db.commit()
+            finally:
+                tenant_db.close()
+
+            if db_tenant is not None:
+                db.delete(db_tenant)
+                db.commit()
+            self._refresh_catalog()
             return True
-            
+
+        except Exception as e:
+            db.rollback()
+            logger.error("Error deleting tenant schema: %s", e)
+            return False
+
+    def _refresh_catalog(self) -> None:
+        try:
+            tenant_catalog.refresh()
         except Exception as e:
-            print(f"Error deleting tenant schema: {e}")
-            return False
\ No newline at end of file
+            logger.warning("Tenant catalog refresh failed: %s", e)
@@ -1,11 +1,19 @@
-from typing import Optional, List, cast
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Sequence, Tuple, cast
 from sqlalchemy.orm import Session
 
-from app.repositories.user import UserRepository
-from app.schemas.user import UserCreate, UserUpdate, User
+from app.repositories.user import UserRepository, normalize_email, normalize_username
+from app.schemas.user import UserCreate, UserUpdate, User, UserActivity, UserFilter
 from app.core.security import get_password_hash
 from app.services.user_role import UserRoleService
+from app.core.change_feed import change_feed
 from app.core.config import settings
+from app.core.throttle import missing_email_cache, missing_email_key
+from app.core.versioning import session_tenant
+
+# Kolom yang dikembalikan schema User; u_password_hash tidak pernah dibaca untuk response
+USER_FIELDS = list(User.model_fields)
+USER_ACTIVITY_FIELDS = list(UserActivity.model_fields)
 
 class UserService:
     def __init__(self):
@@ -14,36 +22,68 @@ class UserService:
     
     def get_user(self, db: Session, user_id: int) -> Optional[User]:
         """Get single user"""
-        db_user = self.repository.get(db, user_id)
+        db_user = self.repository.get(db, user_id, fields=USER_FIELDS)
         return User.model_validate(db_user) if db_user else None
     
     def get_users(
         self, 
         db: Session, 
         skip: int = 0, 
-        limit: int = 100
+        limit: int = 100,
+        filters: Optional[UserFilter] = None
     ) -> List[User]:
-        """Get list of users"""
-        db_users = self.repository.get_multi(db, skip=skip, limit=limit)
-        return [User.model_validate(user) for user in db_users]
+        """Get list of users, optionally searched/filtered/sorted server-side"""
+        rows = self._get_user_rows(db, USER_FIELDS, skip, limit, filters)
+        return [User.model_validate(row) for row in rows]
+    
+    def get_users_fields(
+        self,
+        db: Session,
+        fields: Sequence[str],
+        skip: int = 0,
+        limit: int = 100,
+        filters: Optional[UserFilter] = None
+    ) -> List[Dict[str, Any]]:
+        """Get list of users projected to the requested fields (sparse fieldset)"""
+        rows = self._get_user_rows(db, fields, skip, limit, filters)
+        return [dict(row._mapping) for row in rows]
+    
+    def _get_user_rows(
+        self,
+        db: Session,
+        fields: Sequence[str],
+        skip: int,
+        limit: int,
+        filters: Optional[UserFilter]
+    ) -> list:
+        # Core select kolom saja: tanpa objek ORM, identity map, maupun password hash
+        if filters is None:
+            return self.repository.get_multi_rows(db, fields, skip=skip, limit=limit)
+        return self.repository.search_rows(db, filters, fields, skip=skip, limit=limit)
     
     def create_user(self, db: Session, user: UserCreate) -> Optional[User]:
         """Create new user"""
-        # Check if username already exists
-        existing_user = self.repository.get_by_username(db, user.u_username)
+        # Normalisasi agar lookup login via lower() selalu konsisten
+        user_data = user.model_dump()
+        user_data["u_username"] = normalize_username(user_data["u_username"])
+        user_data["u_email"] = normalize_email(user_data["u_email"])
+
+        # Check if username already exists (case-insensitive)
+        existing_user = self.repository.get_by_username(db, user_data["u_username"])
         if existing_user is not None:  # Explicit None check
             return None
         
-        # Check if email already exists
-        existing_email = self.repository.get_by_email(db, user.u_email)
+        # Check if email already exists (case-insensitive)
+        existing_email = self.repository.get_by_email(db, user_data["u_email"])
         if existing_email is not None:  # Explicit None check
             return None
         
         # Hash password
-        user_data = user.model_dump()
         user_data["u_password_hash"] = get_password_hash(user_data.pop("u_password"))
         
         db_user = self.repository.create(db, user_data)
+        # Email ini mungkin tercatat "tidak terdaftar" oleh throttle forgot-password
+        missing_email_cache.discard(missing_email_key(session_tenant(db), user_data["u_email"]))
         return User.model_validate(db_user) if db_user else None
     
     def update_user(
@@ -58,14 +98,18 @@ class UserService:
             return None
         
         update_data = user.model_dump(exclude_unset=True)
+        if update_data.get("u_username") is not None:
+            update_data["u_username"] = normalize_username(update_data["u_username"])
+        if update_data.get("u_email") is not None:
+            update_data["u_email"] = normalize_email(update_data["u_email"])
         
-        # Check for username conflicts
+        # Check for username conflicts (case-insensitive)
         if "u_username" in update_data:
             existing_user = self.repository.get_by_username(db, update_data["u_username"])
             if existing_user is not None and cast(int, existing_user.u_id) != user_id:
                 return None
         
-        # Check for email conflicts
+        # Check for email conflicts (case-insensitive)
         if "u_email" in update_data:
             existing_email = self.repository.get_by_email(db, update_data["u_email"])
             if existing_email is not None and cast(int, existing_email.u_id) != user_id:
@@ -75,7 +119,11 @@ class UserService:
         if "u_password" in update_data:
             update_data["u_password_hash"] = get_password_hash(update_data.pop("u_password"))
         
+        if "u_status" in update_data and update_data["u_status"] != db_user.u_status:
+            change_feed.emit(db, "user_status_changed", "user", user_id, status=update_data["u_status"])
         updated_user = self.repository.update(db, db_user, update_data)
+        if "u_email" in update_data:
+            missing_email_cache.discard(missing_email_key(session_tenant(db), update_data["u_email"]))
         return User.model_validate(updated_user) if updated_user else None
     
     def delete_user(self, db: Session, user_id: int, current_user: dict) -> bool:
@@ -93,12 +141,27 @@ class UserService:
             return False
 
         # Lanjutkan proses penghapusan
+        change_feed.emit(db, "user_deleted", "user", user_id)
         deleted = self.repository.delete(db, user_id)
+        if deleted is None:
+            change_feed.discard(db)
         return deleted is not None
     
-    def get_total_users(self, db: Session) -> int:
-        """Get total count of users"""
-        return self.repository.count(db)
+    def get_total_users(self, db: Session, filters: Optional[UserFilter] = None) -> Tuple[int, bool]:
+        """
+        Get total count of users (matching the filters, if any) and whether it
+        was capped. Filtered counts stop at USER_SEARCH_COUNT_CAP, so a search
+        matching most of a large tenant does not scan all of it just for the total.
+        """
+        if filters is None:
+            return self.repository.count(db), False
+        if not filters.model_dump(exclude={"sort"}, exclude_none=True):
+            return self.repository.count_search(db, filters), False
+        cap = settings.USER_SEARCH_COUNT_CAP
+        total = self.repository.count_search(db, filters, cap=cap)
+        if total > cap:
+            return cap, True
+        return total, False
     
     def get_by_username(self, db: Session, username: str) -> Optional[User]:
         """Get user by username"""
@@ -108,4 +171,19 @@ class UserService:
     def get_by_email(self, db: Session, email: str) -> Optional[User]:
         """Get user by email"""
         db_user = self.repository.get_by_email(db, email)
-        return User.model_validate(db_user) if db_user else None
\ No newline at end of file
+        return User.model_validate(db_user) if db_user else None
+    
+    def get_inactive_users(
+        self,
+        db: Session,
+        since: datetime,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[UserActivity]:
+        """Users with no login/refresh since ``since``, least recently seen first"""
+        rows = self.repository.get_inactive_rows(db, since, USER_ACTIVITY_FIELDS, skip=skip, limit=limit)
+        return [UserActivity.model_validate(row) for row in rows]
+    
+    def count_inactive_users(self, db: Session, since: datetime) -> int:
+        """Count users with no login/refresh since ``since``"""
+        return self.repository.count_inactive(db, since)
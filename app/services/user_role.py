@@ -1,20 +1,51 @@
-from typing import List, Optional, Set
+from typing import Any, Dict, Iterable, List, Optional, Set
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
+from app.core.audit import AuditActor, audit_log
+from app.core.change_feed import change_feed
+from app.core.metrics import PERMISSION_CACHE
+from app.core.tracing import traced
+from app.core.versioning import access_cache, session_tenant, user_access_keys, version_store
 from app.repositories.user_role import UserRoleRepository
 from app.repositories.user import UserRepository
 from app.repositories.role import RoleRepository
 from app.schemas.user_role import UserRole, UserRoleWithDetails
 from app.models.user_role import UserRole as UserRoleModel
 
+def flatten_permissions(role_permissions: Iterable[Optional[Dict[str, Any]]]) -> Set[str]:
+    """
+    Flatten the ``r_permissions`` documents of a user's roles into
+    'resource:action' strings. A role with ``"all": true`` yields ``{"*"}``.
+    """
+    permissions: Set[str] = set()
+    
+    for permissions_data in role_permissions:
+        if permissions_data is None:
+            continue
+        
+        # Cek untuk izin super admin ("all": true)
+        if permissions_data.get("all") is True:
+            # Jika sudah super admin, tidak perlu proses lebih lanjut
+            return {"*"}
+        
+        # Proses izin granular
+        for resource, actions in permissions_data.items():
+            if isinstance(actions, list):
+                for action in actions:
+                    permissions.add(f"{resource}:{action}")
+    
+    return permissions
+
 class UserRoleService:
     def __init__(self):
         self.repository = UserRoleRepository()
         self.user_repository = UserRepository()
         self.role_repository = RoleRepository()
     
-    def assign_role_to_user(self, db: Session, user_id: int, role_id: int) -> Optional[UserRole]:
+    def assign_role_to_user(
+        self, db: Session, user_id: int, role_id: int, actor: Optional[AuditActor] = None
+    ) -> Optional[UserRole]:
         """Assign role to user"""
         # Verify user exists
         user = self.user_repository.get(db, user_id)
@@ -37,10 +68,14 @@ class UserRoleService:
             "ur_role_id": role_id
         }
         
+        change_feed.emit(db, "role_assigned", "user", user_id, role_id=role_id)
         db_assignment = self.repository.create(db, assignment_data)
+        audit_log.record(db, "role_assigned", user_id=user_id, actor=actor, role_id=role_id)
         return UserRole.model_validate(db_assignment)
     
-    def assign_roles_to_user(self, db: Session, user_id: int, role_ids: List[int]) -> List[UserRole]:
+    def assign_roles_to_user(
+        self, db: Session, user_id: int, role_ids: List[int], actor: Optional[AuditActor] = None
+    ) -> List[UserRole]:
         """Assign multiple roles to a user efficiently using bulk insert."""
         # 1. Verify user exists
         user = self.user_repository.get(db, user_id)
@@ -64,14 +99,27 @@ class UserRoleService:
         ]
 
         # 5. Lakukan bulk insert
+        for role_id in sorted(new_role_ids):
+            change_feed.emit(db, "role_assigned", "user", user_id, role_id=role_id)
         new_assignments = self.repository.create_multi(db, assignments_to_create)
+        for role_id in sorted(new_role_ids):
+            audit_log.record(db, "role_assigned", user_id=user_id, actor=actor, role_id=role_id)
 
         return [UserRole.model_validate(assignment) for assignment in new_assignments]
     
-    def remove_role_from_user(self, db: Session, user_id: int, role_id: int) -> bool:
+    def remove_role_from_user(
+        self, db: Session, user_id: int, role_id: int, actor: Optional[AuditActor] = None
+    ) -> bool:
         """Remove role from user"""
-        return self.repository.delete_by_user_and_role(db, user_id, role_id)
+        change_feed.emit(db, "role_revoked", "user", user_id, role_id=role_id)
+        removed = self.repository.delete_by_user_and_role(db, user_id, role_id)
+        if not removed:
+            change_feed.discard(db)
+        if removed:
+            audit_log.record(db, "role_revoked", user_id=user_id, actor=actor, role_id=role_id)
+        return removed
     
+    @traced()
     def get_user_roles(self, db: Session, user_id: int) -> List[UserRoleWithDetails]:
         """Get all roles assigned to a user with details"""
         roles_data = self.repository.get_user_roles_with_details(db, user_id)
@@ -90,31 +138,37 @@ class UserRoleService:
             ) for role_data in roles_data
         ]
     
+    @traced()
     def get_user_permissions(self, db: Session, user_id: int) -> Set[str]:
         """
         Get a consolidated set of permissions for a user from all their roles.
         Permissions are in the format 'resource:action', e.g., 'users:read'.
         """
         user_roles = self.repository.get_user_roles_with_permissions(db, user_id)
+        return flatten_permissions(getattr(role, "r_permissions", None) for role in user_roles)
+    
+    def get_cached_user_roles(self, db: Session, user_id: int) -> List[UserRoleWithDetails]:
+        """get_user_roles, served from the version-keyed access cache when current"""
+        return self._cached(db, "roles", user_id, self.get_user_roles)
+    
+    def get_cached_user_permissions(self, db: Session, user_id: int) -> Set[str]:
+        """get_user_permissions, served from the version-keyed access cache when current"""
+        return self._cached(db, "permissions", user_id, self.get_user_permissions)
+    
+    def _cached(self, db: Session, kind: str, user_id: int, loader):
+        tenant = session_tenant(db)
+        versions = version_store.get_many(tenant, user_access_keys(user_id))
+        if versions is None:
+            PERMISSION_CACHE.labels("bypass").inc()
+            return loader(db, user_id)
         
-        permissions: Set[str] = set()
-        
-        for role in user_roles:
-            permissions_data = getattr(role, "r_permissions", None)
-            
-            if permissions_data is None:
-                continue
-            
-            # Cek untuk izin super admin ("all": true)
-            if role.r_permissions.get("all") is True:
-                permissions.add("*")
-                # Jika sudah super admin, tidak perlu proses lebih lanjut
-                return permissions
-
-            # Proses izin granular
-            for resource, actions in role.r_permissions.items():
-                if isinstance(actions, list):
-                    for action in actions:
-                        permissions.add(f"{resource}:{action}")
+        cache_key = (tenant, kind, user_id)
+        hit, value = access_cache.get(cache_key, versions)
+        if hit:
+            PERMISSION_CACHE.labels("hit").inc()
+            return value
         
-        return permissions
+        PERMISSION_CACHE.labels("miss").inc()
+        value = loader(db, user_id)
+        access_cache.set(cache_key, versions, value)
+        return value
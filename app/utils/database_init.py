@@ -1,9 +1,153 @@
+import re
+
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from app.db.session import SessionLocal
+from app.db.shards import shard_router
+from app.db.tenant_catalog import TENANT_CHANNEL
+from app.db.tenant_ddl import apply_tenant_ddl
+from app.repositories.tenant import TenantRepository
 from app.services.tenant import TenantService
 
+TENANT_STATUSES = ("active", "suspended", "migrating")
+# pg_trigger.tgtype: ROW (1) | INSERT (4) | DELETE (8) | UPDATE (16), AFTER = tanpa bit BEFORE
+NOTIFY_TRIGGER_TYPE = 1 | 4 | 8 | 16
+
+def ensure_tenant_registry(db: Session):
+    """
+    Create the public.tenants registry (idempotent) and backfill it with
+    existing tenant schemas. Safe to run concurrently from several workers.
+    """
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext('atlas_tenant_registry'))"))
+
+    db.execute(text("""
+        CREATE TABLE IF NOT EXISTS public.tenants (
+            t_id BIGSERIAL PRIMARY KEY,
+            t_schema_name VARCHAR(63) NOT NULL UNIQUE,
+            t_status VARCHAR(20) NOT NULL DEFAULT 'active',
+            t_shard VARCHAR(50) NOT NULL DEFAULT 'default',
+            t_plan VARCHAR(50) NOT NULL DEFAULT 'standard',
+            created_at TIMESTAMP NOT NULL DEFAULT now(),
+            updated_at TIMESTAMP,
+            CONSTRAINT check_tenant_status CHECK (t_status IN ('active', 'suspended', 'migrating'))
+        )
+    """))
+    # Registry lama belum mengenal status 'migrating' (perpindahan shard). ALTER TABLE mengambil
+    # ACCESS EXCLUSIVE lock, jadi hanya dijalankan jika constraint hilang atau berbeda
+    definition = db.execute(text("""
+        SELECT pg_get_constraintdef(oid) FROM pg_constraint
+        WHERE conrelid = 'public.tenants'::regclass AND conname = 'check_tenant_status'
+    """)).scalar()
+    if definition is None or set(re.findall(r"'([^']*)'", definition)) != set(TENANT_STATUSES):
+        db.execute(text("ALTER TABLE public.tenants DROP CONSTRAINT IF EXISTS check_tenant_status"))
+        db.execute(text(f"""
+            ALTER TABLE public.tenants ADD CONSTRAINT check_tenant_status
+            CHECK (t_status IN ({", ".join(f"'{status}'" for status in TENANT_STATUSES)}))
+        """))
+
+    # Setiap perubahan registry mengirim NOTIFY agar TenantCatalog di semua proses refresh
+    db.execute(text(f"""
+        CREATE OR REPLACE FUNCTION public.atlas_notify_tenants_changed() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('{TENANT_CHANNEL}', COALESCE(NEW.t_schema_name, OLD.t_schema_name));
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """))
+    # Trigger dibuat ulang hanya jika hilang atau berbeda (fungsi, AFTER ROW INSERT/UPDATE/DELETE)
+    trigger_ok = db.execute(text("""
+        SELECT EXISTS (
+            SELECT 1 FROM pg_trigger
+            WHERE tgrelid = 'public.tenants'::regclass AND tgname = 'trg_tenants_notify'
+            AND tgfoid = 'public.atlas_notify_tenants_changed'::regproc
+            AND tgtype = :tgtype
+        )
+    """), {"tgtype": NOTIFY_TRIGGER_TYPE}).scalar()
+    if not trigger_ok:
+        db.execute(text("DROP TRIGGER IF EXISTS trg_tenants_notify ON public.tenants"))
+        db.execute(text("""
+            CREATE TRIGGER trg_tenants_notify
+            AFTER INSERT OR UPDATE OR DELETE ON public.tenants
+            FOR EACH ROW EXECUTE FUNCTION public.atlas_notify_tenants_changed()
+        """))
+
+    # Backfill: setiap schema non-sistem yang punya tabel users dianggap tenant
+    db.execute(text("""
+        INSERT INTO public.tenants (t_schema_name)
+        SELECT DISTINCT table_schema
+        FROM information_schema.tables
+        WHERE table_name = 'users'
+        AND table_schema NOT IN ('information_schema', 'pg_catalog', 'pg_toast', 'public')
+        ON CONFLICT (t_schema_name) DO NOTHING
+    """))
+
+    db.commit()
+
+def ensure_email_outbox(db: Session):
+    """Create the public.email_outbox table used by the background email sender (idempotent)"""
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext('atlas_email_outbox'))"))
+
+    db.execute(text("""
+        CREATE TABLE IF NOT EXISTS public.email_outbox (
+            eo_id BIGSERIAL PRIMARY KEY,
+            eo_tenant VARCHAR(63) NOT NULL,
+            eo_recipient VARCHAR(255) NOT NULL,
+            eo_subject VARCHAR(255) NOT NULL,
+            eo_template VARCHAR(100) NOT NULL,
+            eo_template_body JSONB NOT NULL DEFAULT '{}',
+            eo_status VARCHAR(20) NOT NULL DEFAULT 'pending',
+            eo_attempts INTEGER NOT NULL DEFAULT 0,
+            eo_next_attempt_at TIMESTAMP NOT NULL DEFAULT now(),
+            eo_locked_at TIMESTAMP,
+            eo_last_error TEXT,
+            eo_sent_at TIMESTAMP,
+            created_at TIMESTAMP NOT NULL DEFAULT now(),
+            CONSTRAINT check_email_outbox_status CHECK (eo_status IN ('pending', 'sending', 'sent', 'failed'))
+        )
+    """))
+    db.execute(text("ALTER TABLE public.email_outbox ADD COLUMN IF NOT EXISTS eo_locale VARCHAR(10)"))
+    db.execute(text("""
+        CREATE INDEX IF NOT EXISTS ix_email_outbox_pending
+        ON public.email_outbox (eo_next_attempt_at, eo_id)
+        WHERE eo_status IN ('pending', 'sending')
+    """))
+
+    db.commit()
+
+def init_tenant_registry():
+    """Initialize the tenant registry table"""
+    db = SessionLocal()
+
+    try:
+        ensure_tenant_registry(db)
+        ensure_email_outbox(db)
+        print("✅ Tenant registry ready")
+    except Exception as e:
+        print(f"❌ Error initializing tenant registry: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+def upgrade_tenant_schemas():
+    """Apply per-tenant DDL (indexes, new columns) to every registered tenant"""
+    db = SessionLocal()
+
+    try:
+        for tenant in TenantRepository().get_all(db):
+            try:
+                conflicts = apply_tenant_ddl(shard_router.get_engine(str(tenant.t_shard)), str(tenant.t_schema_name))
+                print(f"✅ Tenant DDL applied: {tenant.t_schema_name}")
+                for username, user_ids in conflicts:
+                    print(f"⚠️  {tenant.t_schema_name}: username '{username}' is shared (ignoring case) by users {user_ids}")
+                if conflicts:
+                    print(f"⚠️  {tenant.t_schema_name}: rename these users and rerun; "
+                          f"until then login picks the lowest u_id and ux_users_lower_username is not created")
+            except Exception as e:
+                print(f"❌ Error applying tenant DDL to {tenant.t_schema_name}: {e}")
+    finally:
+        db.close()
+
 def init_default_tenant():
     """Initialize default tenant schema"""
     db = SessionLocal()
@@ -172,6 +316,8 @@ def seed_new_tenant_data(db: Session, schema_name: str):
 
 if __name__ == "__main__":
     print("🚀 Initializing ATLAS database...")
+    init_tenant_registry()
     init_default_tenant()
+    upgrade_tenant_schemas()
     create_sample_data()
     print("✅ Database initialization completed!")
\ No newline at end of file
@@ -0,0 +1,124 @@
+"""
+Move a tenant schema from its current shard to another shard.
+
+    python -m app.utils.move_tenant <schema_name> <target_shard> [--drop-source]
+
+The tenant is marked ``migrating`` (requests get 503 + Retry-After), copied
+with ``pg_dump | psql`` in a single transaction, verified by per-table row
+counts, and then re-pointed to the target shard in ``public.tenants``.
+"""
+import argparse
+import subprocess
+import sys
+import time
+from typing import Dict
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.db.session import SessionLocal
+from app.db.shards import libpq_url, shard_router
+from app.repositories.tenant import TenantRepository
+
+def table_row_counts(engine: Engine, schema_name: str) -> Dict[str, int]:
+    """Row count of every base table in a schema"""
+    with engine.connect() as conn:
+        tables = conn.execute(text("""
+            SELECT table_name FROM information_schema.tables
+            WHERE table_schema = :schema_name AND table_type = 'BASE TABLE'
+            ORDER BY table_name
+        """), {"schema_name": schema_name}).scalars().all()
+        return {
+            table: conn.execute(text(f'SELECT count(*) FROM {schema_name}."{table}"')).scalar() or 0
+            for table in tables
+        }
+
+def schema_exists_on(engine: Engine, schema_name: str) -> bool:
+    with engine.connect() as conn:
+        return conn.execute(
+            text("SELECT 1 FROM information_schema.schemata WHERE schema_name = :schema_name"),
+            {"schema_name": schema_name}
+        ).first() is not None
+
+def copy_schema(source_url: str, target_url: str, schema_name: str) -> None:
+    """Stream the schema from source to target with pg_dump | psql"""
+    dump = subprocess.Popen(
+        ["pg_dump", "--schema", schema_name, "--no-owner", "--no-privileges", libpq_url(source_url)],
+        stdout=subprocess.PIPE
+    )
+    restore = subprocess.run(
+        ["psql", "--quiet", "--single-transaction", "-v", "ON_ERROR_STOP=1", libpq_url(target_url)],
+        stdin=dump.stdout,
+        stdout=subprocess.DEVNULL
+    )
+    if dump.stdout:
+        dump.stdout.close()
+    if dump.wait() != 0 or restore.returncode != 0:
+        raise RuntimeError("pg_dump/psql failed, target left unchanged")
+
+def move_tenant(schema_name: str, target_shard: str, drop_source: bool = False, grace_seconds: float = 5) -> bool:
+    repository = TenantRepository()
+    db = SessionLocal()
+
+    try:
+        tenant = repository.get_by_schema(db, schema_name)
+        if tenant is None:
+            print(f"❌ Tenant {schema_name} is not registered")
+            return False
+
+        source_shard = str(tenant.t_shard)
+        if source_shard == target_shard:
+            print(f"✅ Tenant {schema_name} already on shard {target_shard}")
+            return True
+        if target_shard not in shard_router.shard_names:
+            print(f"❌ Unknown shard {target_shard}. Configured: {', '.join(shard_router.shard_names)}")
+            return False
+
+        source_engine = shard_router.get_engine(source_shard)
+        target_engine = shard_router.get_engine(target_shard)
+        if schema_exists_on(target_engine, schema_name):
+            print(f"❌ Schema {schema_name} already exists on shard {target_shard}")
+            return False
+
+        previous_status = str(tenant.t_status)
+        repository.update(db, tenant, {"t_status": "migrating"})
+        # Beri waktu catalog di semua worker menerima NOTIFY dan request yang berjalan selesai
+        time.sleep(grace_seconds)
+
+        try:
+            print(f"🚚 Copying {schema_name}: {source_shard} -> {target_shard}")
+            copy_schema(shard_router.get_url(source_shard), shard_router.get_url(target_shard), schema_name)
+
+            source_counts = table_row_counts(source_engine, schema_name)
+            target_counts = table_row_counts(target_engine, schema_name)
+            if source_counts != target_counts:
+                raise RuntimeError(f"Row counts differ: source={source_counts} target={target_counts}")
+        except Exception:
+            repository.update(db, tenant, {"t_status": previous_status})
+            raise
+
+        repository.update(db, tenant, {"t_shard": target_shard, "t_status": previous_status})
+        print(f"✅ Tenant {schema_name} now served from shard {target_shard}")
+
+        if drop_source:
+            with source_engine.begin() as conn:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {schema_name} CASCADE"))
+            print(f"🧹 Dropped {schema_name} from shard {source_shard}")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error moving tenant: {e}")
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move a tenant schema to another shard")
+    parser.add_argument("schema_name")
+    parser.add_argument("target_shard")
+    parser.add_argument("--drop-source", action="store_true", help="Drop the schema from the source shard afterwards")
+    parser.add_argument("--grace-seconds", type=float, default=5, help="Wait after marking the tenant as migrating")
+    args = parser.parse_args()
+
+    ok = move_tenant(args.schema_name, args.target_shard, args.drop_source, args.grace_seconds)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,340 @@
+"""
+Generate large synthetic datasets for performance testing.
+
+    python -m app.utils.scale_data --tenants 5 --users 100000 --tenant-skew 1.0 \
+        --apps 3-10 --roles-per-app 5-30 --permissions 5-60 \
+        --roles-per-user 1-4 --tokens-per-user 0-3 --seed 42
+
+Each tenant is created like ``POST /tenants`` (schema, tenant DDL, registry,
+admin user) and then filled with ``COPY`` over the shard's raw psycopg2
+connection. All users share one password hash computed once (or passed in
+with ``--password-hash``), so bcrypt is not on the load path. The same
+seed and arguments always produce the same rows.
+
+Distribution arguments accept a fixed number (``3``) or an inclusive
+uniform range (``1-4``). ``--tenant-skew`` spreads ``--users`` over the
+tenants Zipf-style: tenant ``i`` gets ``users / (i + 1) ** skew``.
+"""
+import argparse
+import hashlib
+import io
+import json
+import random
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Sequence
+
+from app.core.security import get_password_hash
+from app.core.versioning import collection_key, version_store
+from app.db.session import SessionLocal, open_tenant_session
+from app.db.shards import shard_router
+from app.services.tenant import TenantService
+from app.utils.database_init import seed_new_tenant_data
+
+# Jumlah baris per perintah COPY
+COPY_CHUNK_ROWS = 50_000
+
+ACTIONS = ["read", "create", "update", "delete", "export", "import", "approve", "assign"]
+USER_STATUSES = ["active"] * 90 + ["inactive"] * 6 + ["pending_verification"] * 4
+ID_COLUMNS = [
+    ("applications", "app_id"), ("roles", "r_id"), ("users", "u_id"),
+    ("user_roles", "ur_id"), ("refresh_tokens", "rt_id"),
+]
+# Tanggal dasar tetap agar hasil deterministik
+BASE_TIME = datetime(2024, 1, 1)
+
+@dataclass
+class Distribution:
+    """A fixed count or an inclusive uniform integer range"""
+    low: int
+    high: int
+
+    @classmethod
+    def parse(cls, value: str) -> "Distribution":
+        low, _, high = value.partition("-")
+        try:
+            distribution = cls(int(low), int(high or low))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Expected N or A-B, got {value!r}")
+        if distribution.low < 0 or distribution.high < distribution.low:
+            raise argparse.ArgumentTypeError(f"Invalid range {value!r}")
+        return distribution
+
+    def sample(self, rng: random.Random) -> int:
+        return self.low if self.low == self.high else rng.randint(self.low, self.high)
+
+@dataclass
+class ScaleConfig:
+    tenants: int
+    users: int
+    tenant_skew: float
+    apps: Distribution
+    roles_per_app: Distribution
+    permissions: Distribution
+    roles_per_user: Distribution
+    tokens_per_user: Distribution
+    prefix: str = "scale_t"
+    seed: int = 42
+    password_hash: str = ""
+    replace: bool = False
+
+def users_per_tenant(total: int, tenants: int, skew: float) -> List[int]:
+    """Split ``total`` users over tenants with weights ``1 / (i + 1) ** skew``"""
+    weights = [1 / (i + 1) ** skew for i in range(tenants)]
+    scale = total / sum(weights)
+    return [max(1, round(weight * scale)) for weight in weights]
+
+def copy_value(value: Any) -> str:
+    """Encode one value in COPY text format"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+class CopyWriter:
+    """Buffers rows and streams them into one table with COPY"""
+
+    def __init__(self, cursor, table: str, columns: Sequence[str], depends_on: Sequence["CopyWriter"] = ()):
+        self.cursor = cursor
+        # Tabel induk (foreign key) di-flush lebih dulu
+        self.depends_on = list(depends_on)
+        self.statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+        self.buffer = io.StringIO()
+        self.pending = 0
+        self.rows = 0
+
+    def add(self, row: Iterable[Any]) -> None:
+        self.buffer.write("\t".join(copy_value(value) for value in row))
+        self.buffer.write("\n")
+        self.pending += 1
+        if self.pending >= COPY_CHUNK_ROWS:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        for parent in self.depends_on:
+            parent.flush()
+        self.buffer.seek(0)
+        self.cursor.copy_expert(self.statement, self.buffer)
+        self.rows += self.pending
+        self.buffer = io.StringIO()
+        self.pending = 0
+
+def permission_document(rng: random.Random, size: int) -> str:
+    """``r_permissions`` JSON with ``size`` resource:action pairs"""
+    document: Dict[str, List[str]] = {}
+    resources = max(1, size // 3)
+    for _ in range(size):
+        actions = document.setdefault(f"resource_{rng.randrange(resources)}", [])
+        action = rng.choice(ACTIONS)
+        if action not in actions:
+            actions.append(action)
+    return json.dumps(document, separators=(",", ":"))
+
+def ensure_tenant(db, service: TenantService, schema_name: str, replace: bool) -> str:
+    """Create (or recreate) a tenant with the usual admin seed; returns its shard"""
+    if replace and service.schema_exists(db, schema_name):
+        service.delete_tenant(db, schema_name)
+
+    if not service.schema_exists(db, schema_name):
+        if not service.create_tenant(db, schema_name):
+            raise RuntimeError(f"Creating tenant {schema_name} failed")
+        tenant_db = open_tenant_session(schema_name)
+        try:
+            seed_new_tenant_data(tenant_db, schema_name)
+        finally:
+            tenant_db.close()
+
+    record = service.get_tenant(db, schema_name)
+    return record.t_shard if record else "default"
+
+def next_ids(cursor, schema_name: str) -> Dict[str, int]:
+    """First free id per table (data is appended after existing rows)"""
+    ids = {}
+    for table, column in ID_COLUMNS:
+        cursor.execute(f"SELECT COALESCE(max({column}), 0) + 1 FROM {schema_name}.{table}")
+        ids[table] = cursor.fetchone()[0]
+    return ids
+
+def reset_sequences(cursor, schema_name: str) -> None:
+    """Move the serial sequences past the explicitly inserted ids"""
+    for table, column in ID_COLUMNS:
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence('{schema_name}.{table}', '{column}'), "
+            f"(SELECT COALESCE(max({column}), 0) + 1 FROM {schema_name}.{table}), false)"
+        )
+
+def generate_tenant(cursor, config: ScaleConfig, schema_name: str, user_count: int) -> Dict[str, int]:
+    """COPY one tenant's applications, roles, users, memberships and refresh tokens"""
+    # Seed string deterministik per tenant, tidak bergantung urutan tenant lain
+    rng = random.Random(f"{config.seed}:{schema_name}")
+    ids = next_ids(cursor, schema_name)
+    now = datetime.now()
+
+    applications = CopyWriter(
+        cursor, f"{schema_name}.applications", ["app_id", "app_code", "app_name", "app_description", "created_at"]
+    )
+    roles = CopyWriter(
+        cursor, f"{schema_name}.roles",
+        ["r_id", "r_app_id", "r_code", "r_name", "r_level", "r_permissions", "created_at"],
+        depends_on=[applications]
+    )
+    role_ids: List[int] = []
+    for app_id in range(ids["applications"], ids["applications"] + config.apps.sample(rng)):
+        applications.add((
+            app_id, f"APP_{app_id}", f"Application {app_id}", "Generated by scale_data",
+            BASE_TIME + timedelta(days=rng.randrange(365)),
+        ))
+        for _ in range(config.roles_per_app.sample(rng)):
+            r_id = ids["roles"] + len(role_ids)
+            roles.add((
+                r_id, app_id, f"ROLE_{r_id}", f"Role {r_id}", rng.randrange(0, 100),
+                permission_document(rng, config.permissions.sample(rng)),
+                BASE_TIME + timedelta(days=rng.randrange(365)),
+            ))
+            role_ids.append(r_id)
+    applications.flush()
+    roles.flush()
+
+    users = CopyWriter(
+        cursor, f"{schema_name}.users",
+        ["u_id", "u_username", "u_email", "u_password_hash", "u_full_name", "u_status",
+         "u_email_verified", "created_at"]
+    )
+    user_roles = CopyWriter(
+        cursor, f"{schema_name}.user_roles", ["ur_id", "ur_user_id", "ur_role_id", "created_at"], depends_on=[users]
+    )
+    refresh_tokens = CopyWriter(
+        cursor, f"{schema_name}.refresh_tokens", ["rt_id", "rt_user_id", "rt_token_hash", "rt_expires_at", "created_at"],
+        depends_on=[users]
+    )
+    next_ur_id = ids["user_roles"]
+    next_rt_id = ids["refresh_tokens"]
+
+    for u_id in range(ids["users"], ids["users"] + user_count):
+        status = rng.choice(USER_STATUSES)
+        created_at = BASE_TIME + timedelta(seconds=rng.randrange(365 * 86400))
+        users.add((
+            u_id, f"scale_{u_id}", f"scale_{u_id}@{schema_name}.example.com", config.password_hash,
+            f"Scale User {u_id}", status, status != "pending_verification", created_at,
+        ))
+
+        for r_id in rng.sample(role_ids, min(config.roles_per_user.sample(rng), len(role_ids))):
+            user_roles.add((next_ur_id, u_id, r_id, created_at))
+            next_ur_id += 1
+
+        for _ in range(config.tokens_per_user.sample(rng)):
+            token_hash = hashlib.sha256(rng.getrandbits(256).to_bytes(32, "big")).hexdigest()
+            issued = now - timedelta(seconds=rng.randrange(30 * 86400))
+            refresh_tokens.add((next_rt_id, u_id, token_hash, issued + timedelta(days=30), issued))
+            next_rt_id += 1
+
+    user_roles.flush()
+    refresh_tokens.flush()
+    reset_sequences(cursor, schema_name)
+
+    return {
+        "applications": applications.rows,
+        "roles": roles.rows,
+        "users": users.rows,
+        "user_roles": user_roles.rows,
+        "refresh_tokens": refresh_tokens.rows,
+    }
+
+def generate(config: ScaleConfig) -> Dict[str, Dict[str, int]]:
+    service = TenantService()
+    db = SessionLocal()
+    report: Dict[str, Dict[str, int]] = {}
+
+    try:
+        counts = users_per_tenant(config.users, config.tenants, config.tenant_skew)
+        for index, user_count in enumerate(counts):
+            schema_name = f"{config.prefix}{index}"
+            shard = ensure_tenant(db, service, schema_name, config.replace)
+
+            started = time.perf_counter()
+            connection = shard_router.get_engine(shard).raw_connection()
+            try:
+                cursor = connection.cursor()
+                # Data uji dapat dibuat ulang; tidak perlu menunggu flush WAL
+                cursor.execute("SET LOCAL synchronous_commit TO off")
+                rows = generate_tenant(cursor, config, schema_name, user_count)
+                connection.commit()
+                cursor.execute(f"ANALYZE {schema_name}.users, {schema_name}.roles, {schema_name}.user_roles")
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+            finally:
+                connection.close()
+
+            # Data dimuat di luar repository: batalkan ETag/cache tenant ini
+            version_store.bump(schema_name, [
+                collection_key(name) for name in ("applications", "roles", "users", "user_roles")
+            ])
+
+            elapsed = time.perf_counter() - started
+            total = sum(rows.values())
+            print(
+                f"✅ {schema_name} ({shard}): {total:,} rows in {elapsed:.1f}s "
+                f"({total / elapsed * 60:,.0f} rows/min) {rows}"
+            )
+            report[schema_name] = rows
+        return report
+    finally:
+        db.close()
+
+def parse_args(argv: Sequence[str]) -> ScaleConfig:
+    parser = argparse.ArgumentParser(description="Generate synthetic tenants for performance testing")
+    parser.add_argument("--tenants", type=int, default=1)
+    parser.add_argument("--users", type=int, default=10_000, help="Total users over all tenants")
+    parser.add_argument("--tenant-skew", type=float, default=0.0, help="Zipf exponent for users per tenant (0 = even)")
+    parser.add_argument("--apps", type=Distribution.parse, default=Distribution(3, 3), help="Applications per tenant")
+    parser.add_argument("--roles-per-app", type=Distribution.parse, default=Distribution(5, 10))
+    parser.add_argument("--permissions", type=Distribution.parse, default=Distribution(5, 20),
+                        help="resource:action pairs per role")
+    parser.add_argument("--roles-per-user", type=Distribution.parse, default=Distribution(1, 3))
+    parser.add_argument("--tokens-per-user", type=Distribution.parse, default=Distribution(0, 2))
+    parser.add_argument("--prefix", default="scale_t", help="Tenant schema prefix")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--password", default="ScaleTest123!", help="Password of every generated user")
+    parser.add_argument("--password-hash", help="Precomputed bcrypt hash (skips hashing --password)")
+    parser.add_argument("--replace", action="store_true", help="Drop and recreate existing tenants")
+    args = parser.parse_args(argv)
+
+    return ScaleConfig(
+        tenants=args.tenants,
+        users=args.users,
+        tenant_skew=args.tenant_skew,
+        apps=args.apps,
+        roles_per_app=args.roles_per_app,
+        permissions=args.permissions,
+        roles_per_user=args.roles_per_user,
+        tokens_per_user=args.tokens_per_user,
+        prefix=args.prefix,
+        seed=args.seed,
+        password_hash=args.password_hash or get_password_hash(args.password),
+        replace=args.replace,
+    )
+
+if __name__ == "__main__":
+    scale_config = parse_args(sys.argv[1:])
+    print(f"🚀 Generating {scale_config.users:,} users over {scale_config.tenants} tenant(s)...")
+    try:
+        generate(scale_config)
+    except Exception as e:
+        print(f"❌ Error generating data: {e}")
+        sys.exit(1)
+    print("✅ Scale data generated")
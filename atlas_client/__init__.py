@@ -0,0 +1,27 @@
+"""
+Client-side verification for services that trust ATLAS tokens.
+
+Access tokens are verified locally with the ATLAS signing key(s), with the
+same checks as ``Security.verify_token``. Permissions come from
+``GET /api/v1/auth/me/permissions`` and are cached per tenant and user for
+``snapshot_ttl`` seconds, then revalidated with their ETag.
+
+- ``AtlasClient``: plain API (``verify``, ``get_snapshot``, ``has_permission``)
+- ``atlas_client.middleware``: Starlette/FastAPI middleware and endpoint decorators
+- ``atlas_client.dependencies``: FastAPI dependencies mirroring ``app.api.deps``
+
+Requires ``python-jose`` and ``httpx``; the middleware needs Starlette and
+the dependencies FastAPI. See README, "Client SDK".
+"""
+from atlas_client.client import AtlasClient, AtlasError
+from atlas_client.snapshots import PermissionSnapshot, RoleGrant, SnapshotCache
+from atlas_client.tokens import TokenVerifier
+
+__all__ = [
+    "AtlasClient",
+    "AtlasError",
+    "PermissionSnapshot",
+    "RoleGrant",
+    "SnapshotCache",
+    "TokenVerifier",
+]
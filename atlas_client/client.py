@@ -0,0 +1,116 @@
+from typing import Any, Dict, Optional, Sequence, Union
+
+import httpx
+
+from atlas_client.snapshots import PermissionSnapshot, SnapshotCache
+from atlas_client.tokens import TokenVerifier
+
+# Sama dengan DEFAULT_SCHEMA server: request tanpa X-Tenant-Schema
+DEFAULT_TENANT = "public"
+
+class AtlasError(Exception):
+    """ATLAS could not be reached or returned an unexpected response"""
+
+class AtlasClient:
+    """
+    Plain API: verify tokens locally and authorize users from cached
+    permission snapshots. Only a snapshot miss (or expiry) calls ATLAS, with
+    the user's own token and the cached ETag, so an unchanged snapshot is
+    revalidated with a ``304``.
+
+    ``app_code`` is the calling service's application code in ATLAS, used
+    as the default for app access and role level checks. ``atlas_app`` is
+    ATLAS's own ``APP_NAME``, whose ``SUPER_ADMIN`` role passes every check.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        secret_keys: Union[str, Sequence[str]],
+        algorithm: str = "HS256",
+        app_code: Optional[str] = None,
+        atlas_app: str = "ATLAS",
+        snapshot_ttl: float = 60,
+        max_snapshots: int = 10000,
+        timeout: float = 5.0,
+        default_tenant: str = DEFAULT_TENANT
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.verifier = TokenVerifier(secret_keys, algorithm)
+        self.snapshots = SnapshotCache(snapshot_ttl, max_snapshots)
+        self.app_code = app_code
+        self.atlas_app = atlas_app
+        self.timeout = timeout
+        self.default_tenant = default_tenant
+        self._http: Optional[httpx.Client] = None
+        self._async_http: Optional[httpx.AsyncClient] = None
+
+    def verify(self, token: str) -> Optional[Dict[str, Any]]:
+        """Claims of a valid access token, or None"""
+        return self.verifier.verify(token, "access")
+
+    def _request_args(self, token: str, tenant: str, cached: Optional[PermissionSnapshot]) -> Dict[str, Any]:
+        headers = {"Authorization": f"Bearer {token}", "X-Tenant-Schema": tenant}
+        if cached is not None and cached.etag:
+            headers["If-None-Match"] = cached.etag
+        return {"url": f"{self.base_url}/api/v1/auth/me/permissions", "headers": headers}
+
+    def _store(self, tenant: str, response: httpx.Response, cached: Optional[PermissionSnapshot]) -> PermissionSnapshot:
+        if response.status_code == 304 and cached is not None:
+            snapshot = cached
+        elif response.status_code == 200:
+            snapshot = PermissionSnapshot.from_response(response.json()["data"], response.headers.get("etag"))
+        else:
+            raise AtlasError(f"Permission snapshot request failed with HTTP {response.status_code}")
+        self.snapshots.put(tenant, snapshot)
+        return snapshot
+
+    def get_snapshot(self, token: str, user_id: int, tenant: Optional[str] = None) -> PermissionSnapshot:
+        """Snapshot of a verified user, from the cache or ATLAS"""
+        tenant = tenant or self.default_tenant
+        snapshot = self.snapshots.get(tenant, user_id)
+        if snapshot is not None:
+            return snapshot
+
+        cached = self.snapshots.get_stale(tenant, user_id)
+        if self._http is None:
+            self._http = httpx.Client(timeout=self.timeout)
+        try:
+            response = self._http.get(**self._request_args(token, tenant, cached))
+        except httpx.HTTPError as e:
+            raise AtlasError(str(e)) from e
+        return self._store(tenant, response, cached)
+
+    async def aget_snapshot(self, token: str, user_id: int, tenant: Optional[str] = None) -> PermissionSnapshot:
+        """Async variant of ``get_snapshot``"""
+        tenant = tenant or self.default_tenant
+        snapshot = self.snapshots.get(tenant, user_id)
+        if snapshot is not None:
+            return snapshot
+
+        cached = self.snapshots.get_stale(tenant, user_id)
+        if self._async_http is None:
+            self._async_http = httpx.AsyncClient(timeout=self.timeout)
+        try:
+            response = await self._async_http.get(**self._request_args(token, tenant, cached))
+        except httpx.HTTPError as e:
+            raise AtlasError(str(e)) from e
+        return self._store(tenant, response, cached)
+
+    def has_permission(self, token: str, permission: str, tenant: Optional[str] = None) -> bool:
+        """Verify ``token`` and check one ``resource:action`` permission"""
+        claims = self.verify(token)
+        if not claims or not claims.get("sub"):
+            return False
+        return self.get_snapshot(token, int(claims["sub"]), tenant).allows(permission)
+
+    def close(self) -> None:
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+
+    async def aclose(self) -> None:
+        self.close()
+        if self._async_http is not None:
+            await self._async_http.aclose()
+            self._async_http = None
@@ -0,0 +1,52 @@
+"""
+FastAPI dependencies with the same names and checks as ``app.api.deps``.
+Requires ``AtlasAuthMiddleware`` on the application.
+
+    app.add_middleware(AtlasAuthMiddleware, client=atlas)
+
+    @app.get("/reports")
+    async def reports(user: AtlasUser = Depends(PermissionChecker("reports:read"))):
+        ...
+"""
+from typing import Iterable, Optional
+
+from fastapi import Request
+
+from atlas_client.middleware import (
+    AtlasUser, app_access_check, authorize, current_user, permission_check, role_level_check
+)
+
+def get_current_user(request: Request) -> Optional[AtlasUser]:
+    """The verified caller, or None"""
+    return getattr(request.state, "atlas_user", None)
+
+def require_auth(request: Request) -> AtlasUser:
+    """The verified caller, or ``401``"""
+    return current_user(request)
+
+class PermissionChecker:
+    def __init__(self, required_permission: str):
+        self.required_permission = required_permission
+        self.check = permission_check(required_permission)
+
+    async def __call__(self, request: Request) -> AtlasUser:
+        return await authorize(request, self.check, self.required_permission)
+
+def require_app_access(app_code: Optional[str] = None):
+    """Any role in ``app_code`` (default: the client's ``app_code``)"""
+    check = app_access_check(app_code)
+    requirement = f"access to application {app_code or 'this application'}"
+
+    async def _require_app_access(request: Request) -> AtlasUser:
+        return await authorize(request, check, requirement)
+    return _require_app_access
+
+def require_role_level(allowed_levels: Iterable[int], app_code: Optional[str] = None):
+    """A role in ``app_code`` (default: the client's ``app_code``) with one of the levels"""
+    levels = list(allowed_levels)
+    check = role_level_check(levels, app_code)
+    requirement = f"role level {', '.join(map(str, levels))}"
+
+    async def _require_role_level(request: Request) -> AtlasUser:
+        return await authorize(request, check, requirement)
+    return _require_role_level
@@ -0,0 +1,144 @@
+import functools
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence
+
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from atlas_client.client import AtlasClient, AtlasError
+from atlas_client.snapshots import PermissionSnapshot
+
+@dataclass(frozen=True)
+class AtlasUser:
+    """The caller of a request, from a locally verified access token"""
+    user_id: int
+    username: Optional[str]
+    email: Optional[str]
+    status: Optional[str]
+    tenant: str
+    token: str
+    claims: Dict[str, Any]
+
+class AtlasAuthMiddleware:
+    """
+    ASGI middleware that verifies the bearer token of every request and
+    stores the caller as ``request.state.atlas_user`` (None when the token
+    is missing or invalid). With ``required=True`` such requests get ``401``,
+    except for ``exclude_paths`` prefixes. No I/O happens here; permission
+    snapshots are only loaded by the checks that need them.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        client: AtlasClient,
+        required: bool = False,
+        exclude_paths: Sequence[str] = ()
+    ):
+        self.app = app
+        self.client = client
+        self.required = required
+        self.exclude_paths = tuple(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        user = self.authenticate(Headers(scope=scope))
+        state = scope.setdefault("state", {})
+        state["atlas_client"] = self.client
+        state["atlas_user"] = user
+
+        if user is None and self.required and not scope["path"].startswith(self.exclude_paths):
+            response = JSONResponse(
+                {"detail": "Not authenticated"},
+                status_code=401,
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+    def authenticate(self, headers: Headers) -> Optional[AtlasUser]:
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+
+        claims = self.client.verify(token)
+        if not claims or not str(claims.get("sub", "")).isdigit():
+            return None
+
+        return AtlasUser(
+            user_id=int(claims["sub"]),
+            username=claims.get("username"),
+            email=claims.get("email"),
+            status=claims.get("status"),
+            tenant=headers.get("x-tenant-schema") or self.client.default_tenant,
+            token=token,
+            claims=claims,
+        )
+
+def current_user(request: Request) -> AtlasUser:
+    """The verified caller, or ``401``"""
+    user = getattr(request.state, "atlas_user", None)
+    if user is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    return user
+
+async def authorize(
+    request: Request,
+    check: Callable[[PermissionSnapshot, AtlasClient], bool],
+    requirement: str
+) -> AtlasUser:
+    """Load the caller's snapshot (usually from cache) and apply ``check``"""
+    user = current_user(request)
+    client: AtlasClient = request.state.atlas_client
+    try:
+        snapshot = await client.aget_snapshot(user.token, user.user_id, user.tenant)
+    except AtlasError:
+        raise HTTPException(status_code=503, detail="Authorization service unavailable")
+
+    if not check(snapshot, client):
+        raise HTTPException(status_code=403, detail=f"Not enough permissions. Requires: {requirement}")
+    return user
+
+def permission_check(permission: str) -> Callable[[PermissionSnapshot, AtlasClient], bool]:
+    return lambda snapshot, client: snapshot.allows(permission)
+
+def app_access_check(app_code: Optional[str]) -> Callable[[PermissionSnapshot, AtlasClient], bool]:
+    return lambda snapshot, client: snapshot.has_app_access(app_code or client.app_code or "", client.atlas_app)
+
+def role_level_check(
+    allowed_levels: Iterable[int], app_code: Optional[str]
+) -> Callable[[PermissionSnapshot, AtlasClient], bool]:
+    levels = list(allowed_levels)
+    return lambda snapshot, client: snapshot.has_role_level(
+        levels, app_code or client.app_code or "", client.atlas_app
+    )
+
+def _requires(check: Callable[[PermissionSnapshot, AtlasClient], bool], requirement: str):
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(request: Request, *args, **kwargs):
+            await authorize(request, check, requirement)
+            return await endpoint(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+def permission_required(permission: str):
+    """Decorator for async Starlette endpoints, like ``PermissionChecker``"""
+    return _requires(permission_check(permission), permission)
+
+def app_access_required(app_code: Optional[str] = None):
+    """Decorator for async Starlette endpoints, like ``require_app_access``"""
+    return _requires(app_access_check(app_code), f"access to application {app_code or 'this application'}")
+
+def role_level_required(allowed_levels: Iterable[int], app_code: Optional[str] = None):
+    """Decorator for async Starlette endpoints, like ``require_role_level``"""
+    levels = list(allowed_levels)
+    return _requires(role_level_check(levels, app_code), f"role level {', '.join(map(str, levels))}")
@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+
+@dataclass(frozen=True)
+class RoleGrant:
+    app_code: str
+    role_id: int
+    role_code: str
+    role_level: int
+
+@dataclass(frozen=True)
+class PermissionSnapshot:
+    """
+    A user's permissions and roles as returned by ``GET /auth/me/permissions``.
+    The checks mirror ``PermissionChecker``, ``require_app_access`` and
+    ``require_role_level`` in ``app.api.deps``.
+    """
+    user_id: int
+    permissions: FrozenSet[str]
+    roles: Tuple[RoleGrant, ...]
+    etag: Optional[str] = None
+
+    @classmethod
+    def from_response(cls, data: Dict[str, Any], etag: Optional[str] = None) -> "PermissionSnapshot":
+        return cls(
+            user_id=int(data["u_id"]),
+            permissions=frozenset(data.get("permissions") or ()),
+            roles=tuple(
+                RoleGrant(
+                    app_code=role["app_code"],
+                    role_id=int(role["role_id"]),
+                    role_code=role["role_code"],
+                    role_level=int(role["role_level"]),
+                )
+                for role in data.get("roles") or ()
+            ),
+            etag=etag,
+        )
+
+    def is_super_admin(self, atlas_app: str) -> bool:
+        return any(r.app_code == atlas_app and r.role_code == "SUPER_ADMIN" for r in self.roles)
+
+    def allows(self, permission: str) -> bool:
+        """``resource:action`` check; a role with ``"all": true`` allows everything"""
+        return "*" in self.permissions or permission in self.permissions
+
+    def has_app_access(self, app_code: str, atlas_app: str = "ATLAS") -> bool:
+        if self.is_super_admin(atlas_app):
+            return True
+        return any(r.app_code == app_code for r in self.roles)
+
+    def has_role_level(self, allowed_levels: Iterable[int], app_code: str, atlas_app: str = "ATLAS") -> bool:
+        if self.is_super_admin(atlas_app):
+            return True
+        levels = set(allowed_levels)
+        return any(r.app_code == app_code and r.role_level in levels for r in self.roles)
+
+class SnapshotCache:
+    """Thread-safe LRU of snapshots per (tenant, user) with a TTL"""
+
+    def __init__(self, ttl_seconds: float = 60, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[float, PermissionSnapshot]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, tenant: str, user_id: int) -> Optional[PermissionSnapshot]:
+        """Fresh snapshot, or None when missing or expired"""
+        entry = self._get_entry(tenant, user_id)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def get_stale(self, tenant: str, user_id: int) -> Optional[PermissionSnapshot]:
+        """Snapshot regardless of age (for ETag revalidation)"""
+        entry = self._get_entry(tenant, user_id)
+        return entry[1] if entry else None
+
+    def _get_entry(self, tenant: str, user_id: int) -> Optional[Tuple[float, PermissionSnapshot]]:
+        key = (tenant, user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, tenant: str, snapshot: PermissionSnapshot) -> None:
+        key = (tenant, snapshot.user_id)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, tenant: str, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop((tenant, user_id), None)
+
+    def invalidate_role(self, tenant: str, role_id: int) -> None:
+        """Drop every snapshot of the tenant that holds the role"""
+        with self._lock:
+            stale = [
+                key for key, (_, snapshot) in self._entries.items()
+                if key[0] == tenant and any(r.role_id == role_id for r in snapshot.roles)
+            ]
+            for key in stale:
+                del self._entries[key]
+
+    def invalidate_application(self, tenant: str, app_code: str) -> None:
+        """Drop every snapshot of the tenant with a role in the application"""
+        with self._lock:
+            stale = [
+                key for key, (_, snapshot) in self._entries.items()
+                if key[0] == tenant and any(r.app_code == app_code for r in snapshot.roles)
+            ]
+            for key in stale:
+                del self._entries[key]
+
+    def apply_change(self, tenant: str, event: Dict[str, Any]) -> None:
+        """Invalidate according to one ATLAS change feed event (``GET /changes``)"""
+        if event.get("ce_entity") == "user":
+            self.invalidate_user(tenant, int(event["ce_entity_id"]))
+        elif event.get("ce_entity") == "role":
+            self.invalidate_role(tenant, int(event["ce_entity_id"]))
+        elif event.get("ce_entity") == "application":
+            details = event.get("ce_details") or {}
+            if details.get("app_code"):
+                self.invalidate_application(tenant, details["app_code"])
+            for role_id in details.get("role_ids") or ():
+                self.invalidate_role(tenant, int(role_id))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
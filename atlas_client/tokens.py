@@ -0,0 +1,40 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Sequence, Union
+
+from jose import JWTError, jwt
+
+class TokenVerifier:
+    """
+    Local verification of ATLAS tokens, with the semantics of
+    ``app.core.security.Security.verify_token``: signature and algorithm,
+    expiry, then token type.
+
+    ``secret_keys`` may hold several keys during a rotation; the first one
+    that validates the signature wins.
+    """
+
+    def __init__(self, secret_keys: Union[str, Sequence[str]], algorithm: str = "HS256"):
+        self.secret_keys = [secret_keys] if isinstance(secret_keys, str) else list(secret_keys)
+        if not self.secret_keys:
+            raise ValueError("At least one secret key is required")
+        self.algorithm = algorithm
+
+    def verify(self, token: str, expected_type: str = "access") -> Optional[Dict[str, Any]]:
+        """Claims of a valid token, or None"""
+        payload = None
+        for key in self.secret_keys:
+            try:
+                payload = jwt.decode(token, key, algorithms=[self.algorithm])
+                break
+            except JWTError:
+                continue
+        if payload is None:
+            return None
+
+        if datetime.now(timezone.utc) > datetime.fromtimestamp(payload.get("exp", 0), tz=timezone.utc):
+            return None
+
+        if expected_type and payload.get("type") != expected_type:
+            return None
+
+        return payload
@@ -0,0 +1,91 @@
+"""
+Per-request overhead of atlas_client. ``test_request`` runs the same
+one-route FastAPI app bare and behind AtlasAuthMiddleware + PermissionChecker
+with a cached snapshot; the difference in median is the per-request cost.
+Run with ``--benchmark-time-unit=us`` to read it in microseconds.
+"""
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.core.security import Security
+from atlas_client import AtlasClient, PermissionSnapshot
+
+TOKEN_CLAIMS = {"sub": "42", "username": "benchmark_user", "status": "active"}
+TENANT = "public"
+
+@pytest.fixture(scope="module")
+def client():
+    atlas = AtlasClient("http://atlas.invalid", settings.SECRET_KEY, settings.ALGORITHM, app_code="BENCH")
+    atlas.snapshots.put(TENANT, PermissionSnapshot.from_response({
+        "u_id": 42,
+        "permissions": [f"resource_{i}:read" for i in range(50)],
+        "roles": [{"app_code": "BENCH", "role_id": 1, "role_code": "VIEWER", "role_level": 1000}],
+    }))
+    return atlas
+
+@pytest.fixture(scope="module")
+def token():
+    return Security.create_access_token(TOKEN_CLAIMS)
+
+def test_verify(benchmark, client, token):
+    claims = benchmark(client.verify, token)
+    assert claims is not None and claims["sub"] == "42"
+
+def test_cached_permission_check(benchmark, client, token):
+    assert benchmark(client.has_permission, token, "resource_7:read", TENANT) is True
+
+def build_app(client, protected: bool):
+    from fastapi import Depends, FastAPI
+
+    from atlas_client.dependencies import PermissionChecker
+    from atlas_client.middleware import AtlasAuthMiddleware
+
+    app = FastAPI()
+    dependencies = [Depends(PermissionChecker("resource_7:read"))] if protected else []
+
+    @app.get("/ping", dependencies=dependencies)
+    async def ping():
+        return {"ok": True}
+
+    if protected:
+        app.add_middleware(AtlasAuthMiddleware, client=client)
+    return app
+
+@pytest.mark.parametrize("protected", [False, True], ids=["bare", "atlas"])
+def test_request(benchmark, client, token, protected):
+    app = build_app(client, protected)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    loop = asyncio.new_event_loop()
+
+    async def call():
+        statuses = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+
+        await app(dict(scope), receive, send)
+        return statuses[0]
+
+    try:
+        assert benchmark(lambda: loop.run_until_complete(call())) == 200
+    finally:
+        loop.close()
@@ -0,0 +1,12 @@
+from app.services.user_role import flatten_permissions
+from tests.benchmarks.conftest import synthetic_role_permissions
+
+def test_flatten_permissions(benchmark, role_count, permissions_per_role):
+    documents = synthetic_role_permissions(role_count, permissions_per_role)
+    permissions = benchmark(flatten_permissions, documents)
+    assert permissions and "*" not in permissions
+
+def test_flatten_permissions_super_admin(benchmark, role_count):
+    # Role super admin di akhir: seluruh role lain tetap diproses lebih dulu
+    documents = synthetic_role_permissions(role_count, 50) + [{"all": True}]
+    assert benchmark(flatten_permissions, documents) == {"*"}
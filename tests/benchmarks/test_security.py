@@ -0,0 +1,34 @@
+import pytest
+
+from app.core.security import Security, pwd_context
+
+TOKEN_CLAIMS = {
+    "sub": "42",
+    "username": "benchmark_user",
+    "email": "benchmark_user@example.com",
+    "status": "active",
+}
+
+def test_create_access_token(benchmark):
+    token = benchmark(Security.create_access_token, TOKEN_CLAIMS, "Mozilla/5.0", "127.0.0.1")
+    assert token.count(".") == 2
+
+def test_verify_access_token(benchmark):
+    token = Security.create_access_token(TOKEN_CLAIMS)
+    payload = benchmark(Security.verify_token, token, "access")
+    assert payload is not None and payload["sub"] == "42"
+
+def test_verify_invalid_token(benchmark):
+    token = Security.create_access_token(TOKEN_CLAIMS)[:-4] + "AAAA"
+    assert benchmark(Security.verify_token, token, "access") is None
+
+# bcrypt sengaja lambat (~puluhan-ratusan ms); batasi jumlah ronde
+@pytest.mark.parametrize("operation", ["hash", "verify"])
+def test_bcrypt(benchmark, operation):
+    if operation == "hash":
+        result = benchmark.pedantic(pwd_context.hash, args=("CorrectHorse123!",), rounds=5, iterations=1)
+        assert result.startswith("$2")
+    else:
+        hashed = pwd_context.hash("CorrectHorse123!")
+        result = benchmark.pedantic(pwd_context.verify, args=("CorrectHorse123!", hashed), rounds=5, iterations=1)
+        assert result is True
@@ -0,0 +1,17 @@
+import pytest
+
+from app.core.responses import page_response
+from app.schemas.user import User
+from tests.benchmarks.conftest import USER_LIST_SIZES, synthetic_users
+
+@pytest.mark.parametrize("size", USER_LIST_SIZES, ids=lambda n: f"{n}users")
+def test_user_model_validate(benchmark, size):
+    users = synthetic_users(size)
+    result = benchmark(lambda: [User.model_validate(user) for user in users])
+    assert len(result) == size
+
+@pytest.mark.parametrize("size", USER_LIST_SIZES, ids=lambda n: f"{n}users")
+def test_user_page_response(benchmark, size):
+    models = [User.model_validate(user) for user in synthetic_users(size)]
+    response = benchmark(page_response, User, "Users retrieved successfully", models, size, 0, size)
+    assert response.status_code == 200
@@ -0,0 +1,7 @@
+"""
+End-to-end load tests for ATLAS.
+
+Run against a live instance (see README, "Load Testing"):
+
+    python -m tests.load --base-url http://localhost:8000 --tenants 2 --users 200
+"""
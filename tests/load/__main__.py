@@ -0,0 +1,80 @@
+import argparse
+import asyncio
+import json
+import sys
+from typing import Dict
+
+from tests.load.runner import DEFAULT_MIX, LoadConfig, LoadTest
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """``login=10,me=40`` -> {"login": 10, "me": 40}"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown operation '{name}' (choose from {', '.join(DEFAULT_MIX)})")
+        try:
+            mix[name] = int(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid weight for '{name}': {weight!r}")
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("At least one operation needs a positive weight")
+    return mix
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m tests.load",
+        description="Load test the auth and admin hot paths of a running ATLAS instance",
+    )
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--tenants", type=int, default=2, help="Number of loadtest_t<N> tenants")
+    parser.add_argument("--users", type=int, default=100, help="Users seeded per tenant")
+    parser.add_argument("--concurrency", type=int, default=50, help="Virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="Unmeasured seconds before measuring")
+    parser.add_argument(
+        "--mix", type=parse_mix, default=dict(DEFAULT_MIX),
+        help="Operation weights, e.g. login=10,refresh=10,me=40,users=30,write=10"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse users seeded by an earlier run")
+    parser.add_argument("--timeout", type=float, default=10, help="Per-request timeout (seconds)")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument(
+        "--max-error-rate", type=float, default=None,
+        help="Exit non-zero when the overall error rate exceeds this fraction"
+    )
+    args = parser.parse_args()
+
+    config = LoadConfig(
+        base_url=args.base_url,
+        tenants=args.tenants,
+        users=args.users,
+        concurrency=args.concurrency,
+        duration=args.duration,
+        warmup=args.warmup,
+        mix=args.mix,
+        seed=args.seed,
+        skip_seed=args.skip_seed,
+        timeout=args.timeout,
+    )
+    report = asyncio.run(LoadTest(config).run())
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.max_error_rate is not None and report["total"]["error_rate"] > args.max_error_rate:
+        print(
+            f"Error rate {report['total']['error_rate']} exceeds {args.max_error_rate}",
+            file=sys.stderr
+        )
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+"""
+Seeding, scenarios and statistics for the load-test harness.
+
+Each virtual user is bound to one tenant and one seeded account. It logs
+in once, then loops over operations drawn from the configured mix until
+the duration elapses. Admin-only operations (user listing and writes) use
+the tenant's ``admin`` account created by tenant provisioning.
+"""
+import asyncio
+import math
+import random
+import statistics
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+API = "/api/v1"
+TENANT_PREFIX = "loadtest_t"
+USER_PASSWORD = "LoadTest123!"
+ADMIN_USERNAME = "admin"
+ADMIN_PASSWORD = "admin123"
+
+# Bobot default: dominan baca, sesuai pola trafik produksi
+DEFAULT_MIX = {"login": 10, "refresh": 10, "me": 40, "users": 30, "write": 10}
+
+@dataclass
+class LoadConfig:
+    base_url: str
+    tenants: int = 2
+    users: int = 100
+    concurrency: int = 50
+    duration: float = 60
+    warmup: float = 5
+    mix: Dict[str, int] = field(default_factory=lambda: dict(DEFAULT_MIX))
+    seed: int = 42
+    skip_seed: bool = False
+    timeout: float = 10
+
+def tenant_name(index: int) -> str:
+    return f"{TENANT_PREFIX}{index}"
+
+def username(index: int) -> str:
+    return f"load_user_{index}"
+
+class Recorder:
+    """Collects per-operation latencies and outcomes"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.statuses: Dict[str, Dict[str, int]] = {}
+        self.recording = False
+
+    def record(self, operation: str, elapsed: float, status: Optional[int], ok: bool) -> None:
+        if not self.recording:
+            return
+        self.latencies.setdefault(operation, []).append(elapsed)
+        if not ok:
+            self.errors[operation] = self.errors.get(operation, 0) + 1
+        codes = self.statuses.setdefault(operation, {})
+        key = str(status) if status is not None else "transport_error"
+        codes[key] = codes.get(key, 0) + 1
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def summarize(latencies: List[float], errors: int, duration: float) -> Dict[str, Any]:
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        "requests": count,
+        "errors": errors,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "rps": round(count / duration, 2) if duration else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.fmean(values) * 1000, 2) if values else 0.0,
+            "p50": round(percentile(values, 50) * 1000, 2),
+            "p95": round(percentile(values, 95) * 1000, 2),
+            "p99": round(percentile(values, 99) * 1000, 2),
+            "max": round(values[-1] * 1000, 2) if values else 0.0,
+        },
+    }
+
+class LoadTest:
+    def __init__(self, config: LoadConfig):
+        self.config = config
+        self.recorder = Recorder()
+        self.admin_tokens: Dict[str, str] = {}
+        self.user_ids: Dict[str, List[int]] = {}
+
+    # --- seeding ---
+
+    async def seed(self, client: httpx.AsyncClient) -> None:
+        """Create tenants and users through the public API (idempotent)"""
+        for t in range(self.config.tenants):
+            tenant = tenant_name(t)
+            response = await client.post(f"{API}/tenants/", json={"schema_name": tenant})
+            if response.status_code not in (200, 409):
+                raise RuntimeError(f"Creating tenant {tenant} failed: {response.status_code} {response.text}")
+
+        await self._login_admins(client)
+        if self.config.skip_seed:
+            return
+
+        semaphore = asyncio.Semaphore(self.config.concurrency)
+
+        async def create(tenant: str, index: int) -> None:
+            async with semaphore:
+                response = await client.post(
+                    f"{API}/users/",
+                    headers=self._headers(tenant, self.admin_tokens[tenant]),
+                    json={
+                        "u_username": username(index),
+                        "u_email": f"{username(index)}@{tenant}.load.test",
+                        "u_full_name": f"Load User {index}",
+                        "u_password": USER_PASSWORD,
+                        "u_email_verified": True,
+                    },
+                )
+                # 400 = sudah ada dari run sebelumnya
+                if response.status_code not in (200, 400):
+                    raise RuntimeError(f"Creating user failed: {response.status_code} {response.text}")
+
+        await asyncio.gather(*[
+            create(tenant_name(t), i)
+            for t in range(self.config.tenants)
+            for i in range(self.config.users)
+        ])
+
+    async def _login_admins(self, client: httpx.AsyncClient) -> None:
+        for t in range(self.config.tenants):
+            tenant = tenant_name(t)
+            response = await client.post(
+                f"{API}/auth/login",
+                headers=self._headers(tenant),
+                json={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD},
+            )
+            response.raise_for_status()
+            self.admin_tokens[tenant] = response.json()["data"]["access_token"]
+
+            listing = await client.get(
+                f"{API}/users/",
+                headers=self._headers(tenant, self.admin_tokens[tenant]),
+                params={"search": "load_user_", "limit": 1000, "fields": "u_id"},
+            )
+            listing.raise_for_status()
+            self.user_ids[tenant] = [row["u_id"] for row in listing.json()["data"]]
+
+    # --- scenario ---
+
+    @staticmethod
+    def _headers(tenant: str, token: Optional[str] = None) -> Dict[str, str]:
+        headers = {"X-Tenant-Schema": tenant}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        return headers
+
+    async def _call(
+        self, client: httpx.AsyncClient, operation: str, method: str, url: str, **kwargs
+    ) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.record(operation, time.perf_counter() - started, None, False)
+            return None
+        self.recorder.record(
+            operation, time.perf_counter() - started, response.status_code, response.status_code < 400
+        )
+        return response
+
+    async def _login(self, client: httpx.AsyncClient, tenant: str, user: str) -> Tuple[Optional[str], Optional[str]]:
+        response = await self._call(
+            client, "login", "POST", f"{API}/auth/login",
+            headers=self._headers(tenant), json={"username": user, "password": USER_PASSWORD},
+        )
+        if response is None or response.status_code != 200:
+            return None, None
+        data = response.json()["data"]
+        return data["access_token"], data["refresh_token"]
+
+    async def virtual_user(self, client: httpx.AsyncClient, vu: int, deadline: float) -> None:
+        rng = random.Random(self.config.seed + vu)
+        tenant = tenant_name(vu % self.config.tenants)
+        user = username(rng.randrange(self.config.users))
+        admin_token = self.admin_tokens[tenant]
+        operations = list(self.config.mix)
+        weights = [self.config.mix[op] for op in operations]
+
+        access_token, refresh_token = await self._login(client, tenant, user)
+
+        while time.monotonic() < deadline:
+            operation = rng.choices(operations, weights)[0]
+            if operation == "login" or access_token is None:
+                access_token, refresh_token = await self._login(client, tenant, user)
+            elif operation == "refresh":
+                response = await self._call(
+                    client, "refresh", "POST", f"{API}/auth/refresh",
+                    headers=self._headers(tenant), json={"refresh_token": refresh_token},
+                )
+                if response is not None and response.status_code == 200:
+                    access_token = response.json()["data"]["access_token"]
+            elif operation == "me":
+                await self._call(
+                    client, "me", "GET", f"{API}/auth/me", headers=self._headers(tenant, access_token)
+                )
+            elif operation == "users":
+                await self._call(
+                    client, "users", "GET", f"{API}/users/",
+                    headers=self._headers(tenant, admin_token),
+                    params={"skip": rng.randrange(0, max(self.config.users - 50, 1)), "limit": 50},
+                )
+            elif operation == "write":
+                ids = self.user_ids.get(tenant) or [0]
+                await self._call(
+                    client, "write", "PUT", f"{API}/users/{rng.choice(ids)}",
+                    headers=self._headers(tenant, admin_token),
+                    json={
+                        "u_username": None, "u_email": None, "u_status": None,
+                        "u_email_verified": None, "u_password": None,
+                        "u_full_name": f"Load User {rng.randrange(1_000_000)}",
+                    },
+                )
+
+    async def run(self) -> Dict[str, Any]:
+        config = self.config
+        limits = httpx.Limits(max_connections=config.concurrency, max_keepalive_connections=config.concurrency)
+        async with httpx.AsyncClient(base_url=config.base_url, timeout=config.timeout, limits=limits) as client:
+            await self.seed(client)
+
+            started_at = datetime.now(timezone.utc)
+            start = time.monotonic()
+            deadline = start + config.warmup + config.duration
+            tasks = [
+                asyncio.create_task(self.virtual_user(client, vu, deadline))
+                for vu in range(config.concurrency)
+            ]
+
+            # Warm-up tidak dihitung (koneksi pool, cache, JIT bcrypt dsb.)
+            await asyncio.sleep(config.warmup)
+            self.recorder.recording = True
+            measured_start = time.monotonic()
+            await asyncio.gather(*tasks)
+            measured = time.monotonic() - measured_start
+
+        all_latencies = [value for values in self.recorder.latencies.values() for value in values]
+        return {
+            "started_at": started_at.isoformat(),
+            "config": {
+                "base_url": config.base_url,
+                "tenants": config.tenants,
+                "users_per_tenant": config.users,
+                "concurrency": config.concurrency,
+                "duration_seconds": config.duration,
+                "warmup_seconds": config.warmup,
+                "mix": config.mix,
+                "seed": config.seed,
+            },
+            "total": summarize(all_latencies, sum(self.recorder.errors.values()), measured),
+            "operations": {
+                operation: {
+                    **summarize(values, self.recorder.errors.get(operation, 0), measured),
+                    "status_codes": self.recorder.statuses.get(operation, {}),
+                }
+                for operation, values in sorted(self.recorder.latencies.items())
+            },
+        }
@@ -0,0 +1,98 @@
+"""
+The version-keyed role/permission cache must not outlive writes that
+change a user's access.
+"""
+from types import SimpleNamespace
+from typing import Any, Dict, List
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.versioning import VersionStore, VersionedCache
+from app.models.user import User
+# Relationship User -> UserRole -> Role -> Application di-resolve saat mapper dikonfigurasi
+import app.models.application  # noqa: F401
+import app.models.role  # noqa: F401
+import app.models.user_role  # noqa: F401
+from app.repositories import base as base_repository
+from app.repositories.user import UserRepository
+from app.services import user_role as user_role_service_module
+from app.services.user_role import UserRoleService
+
+TENANT = "tenant_a"
+
+class FakeRedis:
+    """The hash commands VersionStore uses, in memory"""
+
+    def __init__(self):
+        self.hashes: Dict[str, Dict[str, Any]] = {}
+
+    def pipeline(self, transaction: bool = True) -> "FakeRedis":
+        return self
+
+    def execute(self) -> List[Any]:
+        return []
+
+    def hincrby(self, key: str, field: str, amount: int) -> int:
+        values = self.hashes.setdefault(key, {})
+        values[field] = int(values.get(field, 0)) + amount
+        return values[field]
+
+    def hmget(self, key: str, fields: List[str]) -> List[Any]:
+        values = self.hashes.get(key, {})
+        return [values.get(field) for field in fields]
+
+    def hset(self, key: str, field: str, value: Any) -> None:
+        self.hashes.setdefault(key, {})[field] = value
+
+    def hsetnx(self, key: str, field: str, value: Any) -> None:
+        self.hashes.setdefault(key, {}).setdefault(field, value)
+
+@pytest.fixture
+def versions(monkeypatch) -> VersionStore:
+    client = FakeRedis()
+    manager = SimpleNamespace(
+        configured=True,
+        execute=lambda operation, default=None: operation(client),
+    )
+    store = VersionStore(manager)  # type: ignore[arg-type]
+    monkeypatch.setattr(base_repository, "version_store", store)
+    monkeypatch.setattr(user_role_service_module, "version_store", store)
+    monkeypatch.setattr(user_role_service_module, "access_cache", VersionedCache())
+    return store
+
+def tenant_session(user: User) -> MagicMock:
+    db = MagicMock()
+    db.info = {"tenant_schema": TENANT}
+    db.query.return_value.filter.return_value.first.return_value = user
+    return db
+
+def test_deleted_user_loses_cached_permissions(versions):
+    user = User(u_id=7, u_username="alice", u_status="active")
+    db = tenant_session(user)
+    service = UserRoleService()
+    grants = {7: {"reports:read"}}
+    service.get_user_permissions = lambda db, user_id: set(grants.get(user_id, ()))  # type: ignore[method-assign]
+
+    assert service.get_cached_user_permissions(db, 7) == {"reports:read"}
+
+    # Assignment ikut terhapus via ON DELETE CASCADE, tanpa write lewat UserRoleRepository
+    assert UserRepository().delete(db, 7) is user
+    grants.pop(7)
+
+    assert service.get_cached_user_permissions(db, 7) == set()
+
+def test_status_change_invalidates_cached_permissions(versions):
+    user = User(u_id=8, u_username="bob", u_status="active")
+    db = tenant_session(user)
+    service = UserRoleService()
+    loads = []
+    service.get_user_permissions = lambda db, user_id: loads.append(user_id) or {"reports:read"}  # type: ignore[method-assign]
+
+    service.get_cached_user_permissions(db, 8)
+    service.get_cached_user_permissions(db, 8)
+    assert loads == [8]
+
+    UserRepository().update(db, user, {"u_status": "suspended"})
+    service.get_cached_user_permissions(db, 8)
+    assert loads == [8, 8]
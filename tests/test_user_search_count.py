@@ -0,0 +1,34 @@
+"""
+Filtered user list totals are counted only up to USER_SEARCH_COUNT_CAP.
+"""
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.config import settings
+from app.schemas.user import UserFilter
+from app.services.user import UserService
+
+@pytest.fixture
+def service(monkeypatch) -> UserService:
+    monkeypatch.setattr(settings, "USER_SEARCH_COUNT_CAP", 100)
+    service = UserService()
+    service.repository = MagicMock()
+    return service
+
+def test_filtered_total_is_capped(service):
+    service.repository.count_search.return_value = 101
+
+    assert service.get_total_users(MagicMock(), UserFilter(search="ali")) == (100, True)
+    assert service.repository.count_search.call_args.kwargs == {"cap": 100}
+
+def test_filtered_total_below_cap_is_exact(service):
+    service.repository.count_search.return_value = 100
+
+    assert service.get_total_users(MagicMock(), UserFilter(role_id=3)) == (100, False)
+
+def test_unfiltered_total_is_exact(service):
+    service.repository.count_search.return_value = 250_000
+
+    assert service.get_total_users(MagicMock(), UserFilter(sort="-created_at")) == (250_000, False)
+    assert service.repository.count_search.call_args.kwargs == {}